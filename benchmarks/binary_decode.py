@@ -0,0 +1,51 @@
+"""
+Benchmark the decoding of transactions from their binary encoding,
+comparing it to the decoding of the same transactions from their (JSON-encoded) raw JSON Tx,
+as the explorer returns them.
+
+Run from the root of the repository as:
+
+    python -m benchmarks.binary_decode
+"""
+
+import json
+import time
+
+from tfchain.TransactionFactory import TransactionFactory
+
+from benchmarks.fixtures import block_response_new
+
+
+def from_json(transactions, raw):
+    # the JSON parsing is part of the decoding of a raw JSON Tx
+    return transactions.from_json(json.loads(raw))
+
+
+def measure(func, inputs):
+    start = time.perf_counter()
+    for input in inputs:
+        func(input)
+    return time.perf_counter() - start
+
+
+def main():
+    transactions = TransactionFactory()
+    print("{:>8} {:>14} {:>14} {:>12} {:>12} {:>8}".format(
+        "outputs", "json (tx/s)", "binary (tx/s)", "json (B/tx)", "binary (B/tx)", "speedup"))
+    for nr_of_outputs in (1, 10, 100):
+        resp = block_response_new(nr_of_transactions=1000, nr_of_outputs=nr_of_outputs)
+        raw_transactions = [json.dumps(etxn['rawtransaction']) for etxn in resp['block']['transactions']]
+        encoded_transactions = [
+            bytes(from_json(transactions, raw).binary_encode()) for raw in raw_transactions]
+        json_duration = measure(lambda raw: from_json(transactions, raw), raw_transactions)
+        binary_duration = measure(transactions.from_binary, encoded_transactions)
+        count = len(raw_transactions)
+        print("{:>8} {:>14.0f} {:>14.0f} {:>12.0f} {:>12.0f} {:>7.1f}x".format(
+            nr_of_outputs, count/json_duration, count/binary_duration,
+            sum(len(raw) for raw in raw_transactions)/count,
+            sum(len(encoded) for encoded in encoded_transactions)/count,
+            json_duration/binary_duration))
+
+
+if __name__ == '__main__':
+    main()
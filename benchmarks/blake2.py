@@ -0,0 +1,58 @@
+"""
+Micro-benchmark the binary blake2 hashing functions,
+comparing them with the hex-encoded hashes that had to be decoded again.
+
+Run from the root of the repository as:
+
+    python -m benchmarks.blake2
+"""
+
+import timeit
+
+from tfchain.crypto.utils import blake2_string, blake2_hash
+from tfchain.encoders import encoder_sia_get
+from tfchain.types.CryptoTypes import PublicKey, PublicKeySpecifier
+
+
+def compare(name, hex_func, binary_func, number):
+    hex_time = timeit.timeit(hex_func, number=number) / number
+    binary_time = timeit.timeit(binary_func, number=number) / number
+    print("{:<24} {:>12.3f} {:>12.3f} {:>12.3f}".format(
+        name, hex_time*1e6, binary_time*1e6, (hex_time-binary_time)*1e6))
+
+
+def main():
+    print("{:<24} {:>12} {:>12} {:>12}".format("", "hex (us)", "binary (us)", "saved (us)"))
+    for size in (32, 256, 4096):
+        data = bytes(size)
+        compare(
+            "hash {} bytes".format(size),
+            lambda: bytearray.fromhex(blake2_string(data)),
+            lambda: blake2_hash(data),
+            number=100000)
+
+    # the hash of a public key's unlock hash,
+    # previously encoding the public key once as data and once more as a slice
+    pk = PublicKey(specifier=PublicKeySpecifier.ED25519, hash=bytes(32))
+
+    def unlockhash_hex():
+        e = encoder_sia_get()
+        pk.sia_binary_encode(e)
+        data = e.data
+        e = encoder_sia_get()
+        e.add_slice(data)
+        return bytearray.fromhex(blake2_string(e.data))
+
+    def unlockhash_binary():
+        e = encoder_sia_get()
+        pk.sia_binary_encode(e)
+        data = e.data
+        e = encoder_sia_get()
+        e.add_int(len(data))
+        return blake2_hash(e.data, data)
+
+    compare("public key unlockhash", unlockhash_hex, unlockhash_binary, number=20000)
+
+
+if __name__ == '__main__':
+    main()
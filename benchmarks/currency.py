@@ -0,0 +1,44 @@
+"""
+Benchmark the aggregation of the currency values of many outputs:
+decoding them from JSON, summing them using the + operator, using Currency.sum
+and using a CurrencyArray, as well as filtering them by value.
+
+Run from the root of the repository as:
+
+    python -m benchmarks.currency [nr_of_values]
+"""
+
+import sys
+import timeit
+
+from tfchain.types.PrimitiveTypes import Currency, CurrencyArray
+
+
+def main(nr_of_values=50000):
+    raw_values = [str(1000000000 + index * 7) for index in range(nr_of_values)]
+    values = [Currency.from_json(raw) for raw in raw_values]
+    array = CurrencyArray(values)
+    threshold = Currency(value=1000)
+
+    def sum_operator():
+        total = Currency()
+        for value in values:
+            total += value
+        return total
+
+    benchmarks = (
+        ("from_json", lambda: [Currency.from_json(raw) for raw in raw_values]),
+        ("sum (+ operator)", sum_operator),
+        ("Currency.sum", lambda: Currency.sum(values)),
+        ("CurrencyArray.sum", array.sum),
+        ("filter (>= operator)", lambda: [value for value in values if value >= threshold]),
+        ("CurrencyArray.filter", lambda: array.filter(array.mask(minimum=threshold))),
+    )
+    print("{} currency values".format(nr_of_values))
+    for (name, func) in benchmarks:
+        duration = min(timeit.repeat(func, number=1, repeat=5))
+        print("{:<24} {:>10.2f} ms".format(name, duration * 1000))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,76 @@
+"""
+Benchmark decoding a mixed-version stream of raw JSON Txs,
+decoding them one by one using TransactionFactory.from_json,
+and all at once using TransactionFactory.from_json_many.
+
+As the decoding of a transaction itself dominates, the dispatch overhead is measured
+as well, by decoding the same stream using decoders that do not decode anything.
+
+Run from the root of the repository as:
+
+    python -m benchmarks.dispatch [nr_of_transactions]
+"""
+
+import sys
+import timeit
+
+from benchmarks.fixtures import unlockhash_new
+from tfchain.TransactionFactory import TransactionFactory
+from tfchain.types.transactions import transaction_class_get, register_transaction_version
+
+
+def stream_new(nr_of_transactions):
+    """
+    Create a stream of raw JSON Txs, alternating between versions 0, 1, 129 and 209.
+    """
+    parentid = '11' * 32
+    publickey = 'ed25519:' + '22' * 32
+    signature = '33' * 64
+    templates = [
+        {'version': 0, 'data': {
+            'coininputs': [{'parentid': parentid, 'unlocker': {'type': 1, 'condition': {'publickey': publickey}, 'fulfillment': {'signature': signature}}}],
+            'coinoutputs': [{'value': '1000000000', 'unlockhash': unlockhash_new(0)}],
+            'minerfees': ['100000000']}},
+        {'version': 1, 'data': {
+            'coininputs': [{'parentid': parentid, 'fulfillment': {'type': 1, 'data': {'publickey': publickey, 'signature': signature}}}],
+            'coinoutputs': [{'value': '1000000000', 'condition': {'type': 1, 'data': {'unlockhash': unlockhash_new(1)}}}],
+            'minerfees': ['100000000']}},
+        {'version': 129, 'data': {
+            'nonce': 'FoAiO8vN2eU=',
+            'mintfulfillment': {'type': 1, 'data': {'publickey': publickey, 'signature': signature}},
+            'coinoutputs': [{'value': '1000000000', 'condition': {'type': 1, 'data': {'unlockhash': unlockhash_new(2)}}}],
+            'minerfees': ['100000000']}},
+        {'version': 209, 'data': {
+            'address': unlockhash_new(3), 'value': '100000000000', 'txfee': '1000000000',
+            'blockid': '0x' + '44' * 32, 'txid': '0x' + '55' * 32}},
+    ]
+    return [templates[index % len(templates)] for index in range(nr_of_transactions)]
+
+
+def main(nr_of_transactions=20000):
+    transactions = TransactionFactory()
+    stream = stream_new(nr_of_transactions)
+    print("{} transactions (versions 0, 1, 129 and 209)".format(nr_of_transactions))
+
+    durations = [
+        ("from_json", min(timeit.repeat(lambda: [transactions.from_json(obj) for obj in stream], number=1, repeat=5))),
+        ("from_json_many", min(timeit.repeat(lambda: transactions.from_json_many(stream), number=1, repeat=5))),
+    ]
+
+    # register decoders which return a prepared transaction, such that only the dispatch is measured
+    versions = sorted(set(obj['version'] for obj in stream))
+    classes = {version: transaction_class_get(version) for version in versions}
+    prepared = {version: classes[version]() for version in versions}
+    for version in versions:
+        register_transaction_version(version, classes[version], json_decoder=lambda obj: prepared[obj['version']], override=True)
+    durations += [
+        ("from_json (dispatch)", min(timeit.repeat(lambda: [transactions.from_json(obj) for obj in stream], number=1, repeat=5))),
+        ("from_json_many (dispatch)", min(timeit.repeat(lambda: transactions.from_json_many(stream), number=1, repeat=5))),
+    ]
+
+    for (name, duration) in durations:
+        print("{:<28} {:>10.2f} ms {:>8.2f} us/txn".format(name, duration * 1000, duration * 1e6 / nr_of_transactions))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,78 @@
+"""
+Benchmark the binary encoding of a v1 transaction with many coin outputs,
+comparing the encoding into a growing buffer (with the data encoded first, and then copied as a slice)
+with the two-phase encoding used by binary_encode, which computes the exact size first
+and encodes everything directly into a single pre-allocated buffer.
+
+Run from the root of the repository as:
+
+    python -m benchmarks.encoding
+"""
+
+import time
+import tracemalloc
+
+from tfchain.types.transactions.Base import TransactionVersion
+from tfchain.types.transactions.Standard import TransactionV1
+from tfchain.types.CryptoTypes import PublicKey, PublicKeySpecifier
+from tfchain.types.ConditionTypes import ConditionUnlockHash
+from tfchain.types.FulfillmentTypes import FulfillmentSingleSignature
+from tfchain.encoders import encoder_sia_get
+
+
+def transaction_new(nr_of_outputs):
+    txn = TransactionV1()
+    pk = PublicKey(specifier=PublicKeySpecifier.ED25519, hash=bytes(32))
+    txn.coin_input_add(
+        parentid=bytes(32), fulfillment=FulfillmentSingleSignature(pub_key=pk, signature=bytes(64)))
+    for index in range(nr_of_outputs):
+        pk = PublicKey(specifier=PublicKeySpecifier.ED25519, hash=index.to_bytes(32, byteorder='little'))
+        txn.coin_output_add(value=index+1, condition=ConditionUnlockHash(unlockhash=pk.unlockhash))
+    txn.miner_fee_add(1)
+    return txn
+
+
+def encode_growing(txn):
+    data = encoder_sia_get()
+    data.add_all(*txn._binary_encode_data_values())
+    encoder = encoder_sia_get()
+    encoder.add_array(bytearray([TransactionVersion.STANDARD]))
+    encoder.add_slice(data.data)
+    return encoder.data
+
+
+def encode_presized(txn):
+    return txn.binary_encode()
+
+
+def measure(func, txn, rounds):
+    # the best of all rounds, to reduce the noise of other processes
+    duration = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(txn)
+        elapsed = time.perf_counter() - start
+        if duration is None or elapsed < duration:
+            duration = elapsed
+    tracemalloc.start()
+    func(txn)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak
+
+
+def main():
+    print("{:>8} {:>8} {:>14} {:>14} {:>16} {:>16}".format(
+        "outputs", "size", "growing (ms)", "presized (ms)", "growing (peak)", "presized (peak)"))
+    for nr_of_outputs in (10, 1000, 10000):
+        txn = transaction_new(nr_of_outputs)
+        assert encode_growing(txn) == encode_presized(txn)
+        rounds = max(5, 10000 // nr_of_outputs)
+        growing, growing_peak = measure(encode_growing, txn, rounds)
+        presized, presized_peak = measure(encode_presized, txn, rounds)
+        print("{:>8} {:>8} {:>14.3f} {:>14.3f} {:>16} {:>16}".format(
+            nr_of_outputs, len(encode_presized(txn)), growing*1000, presized*1000, growing_peak, presized_peak))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Synthetic explorer responses shared by the benchmarks.
+
+The responses follow the format of the explorer's /explorer/blocks/<height> endpoint,
+as can be seen in the (much smaller) blocks used in tests/jstests.
+"""
+
+from tfchain.types.ConditionTypes import UnlockHash, UnlockHashType
+
+
+def _hex(index, size=32):
+    return index.to_bytes(size, byteorder='little').hex()
+
+
+def unlockhash_new(index):
+    """
+    Create a (valid) unlock hash string, unique for the given index.
+    """
+    return str(UnlockHash(type=UnlockHashType.PUBLIC_KEY, hash=index.to_bytes(32, byteorder='little')))
+
+
+def block_response_new(height=2662, nr_of_transactions=1000, nr_of_outputs=10, nr_of_addresses=1000):
+    """
+    Create an explorer block response, containing v1 transactions
+    with a single coin input and multiple coin outputs each,
+    paying out to a fixed set of addresses (as addresses are reused on a real chain).
+    """
+    addresses = [unlockhash_new(index) for index in range(nr_of_addresses)]
+    transactions = []
+    counter = 0
+    for txn_index in range(nr_of_transactions):
+        coinoutputs = []
+        coinoutputids = []
+        coinoutputunlockhashes = []
+        for _ in range(nr_of_outputs):
+            address = addresses[counter % nr_of_addresses]
+            coinoutputs.append({
+                'value': str(1000000000 + counter),
+                'condition': {'type': 1, 'data': {'unlockhash': address}},
+            })
+            coinoutputids.append(_hex(counter + 1))
+            coinoutputunlockhashes.append(address)
+            counter += 1
+        transactions.append({
+            'id': _hex(txn_index + 1, 32),
+            'height': height,
+            'parent': _hex(height),
+            'rawtransaction': {
+                'version': 1,
+                'data': {
+                    'coininputs': [{
+                        'parentid': _hex(txn_index + 1),
+                        'fulfillment': {
+                            'type': 1,
+                            'data': {
+                                'publickey': 'ed25519:' + _hex(txn_index % nr_of_addresses),
+                                'signature': _hex(txn_index, 64),
+                            },
+                        },
+                    }],
+                    'coinoutputs': coinoutputs,
+                    'minerfees': ['100000000'],
+                },
+            },
+            'coinoutputids': coinoutputids,
+            'coinoutputunlockhashes': coinoutputunlockhashes,
+            'unconfirmed': False,
+        })
+    return {
+        'block': {
+            'blockid': _hex(height),
+            'height': height,
+            'transactions': transactions,
+        },
+    }
@@ -0,0 +1,44 @@
+"""
+Benchmark the time it takes to import the tfchain types (in a fresh interpreter),
+as reported by python -X importtime, listing the modules which take the most time to import.
+
+Run from the root of the repository as:
+
+    python -m benchmarks.import_time [module ...]
+"""
+
+import os
+import subprocess
+import sys
+
+
+def importtime_get(module):
+    """
+    Import the given module in a new interpreter,
+    returning a list of (self, cumulative, name) tuples (in microseconds) for all imported modules.
+    """
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import {}'.format(module)],
+        stderr=subprocess.PIPE, check=True, cwd=os.getcwd()).stderr.decode('utf-8')
+    results = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        results.append((int(self_us), int(cumulative_us), name.strip()))
+    return results
+
+
+def main(*modules, repeat=5, top=10):
+    for module in (modules or ('tfchain.TFChainTypeFactory', 'tfchain.TransactionFactory', 'tfchain.types.PrimitiveTypes')):
+        # the first run compiles (and caches) the bytecode, if needed
+        importtime_get(module)
+        runs = [importtime_get(module) for _ in range(repeat)]
+        best = min(runs, key=lambda results: results[-1][1])
+        print("{}: {:.1f} ms, {} modules".format(module, best[-1][1] / 1000, len(best)))
+        for (self_us, cumulative_us, name) in sorted(best, key=lambda result: result[0], reverse=True)[:top]:
+            print("    {:<48} {:>8.1f} ms self {:>8.1f} ms cumulative".format(name, self_us / 1000, cumulative_us / 1000))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
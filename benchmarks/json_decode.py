@@ -0,0 +1,60 @@
+"""
+Benchmark scanning an explorer block response for the outputs paid to a handful of addresses,
+comparing the JSON backends used to decode the response,
+and fully decoding each transaction with scanning a lazy view on it.
+
+Run from the root of the repository as:
+
+    python -m benchmarks.json_decode [nr_of_transactions]
+"""
+
+import sys
+import timeit
+
+from benchmarks.fixtures import block_response_new, unlockhash_new
+from tfchain.jsutils import json_dumps, json_loads, json_backend_get, json_backend_set
+from tfchain.TransactionFactory import TransactionFactory
+
+
+def main(nr_of_transactions=1000):
+    response = json_dumps(block_response_new(
+        nr_of_transactions=nr_of_transactions, nr_of_addresses=nr_of_transactions*10)).encode('utf-8')
+    wanted = set(unlockhash_new(index) for index in range(5))
+    transactions = TransactionFactory()
+    print("{} transactions, {} bytes".format(nr_of_transactions, len(response)))
+
+    backend = json_backend_get()
+    for name in ('json', 'ujson', 'orjson'):
+        try:
+            json_backend_set(name)
+        except ImportError:
+            print("{:<24} {:>10}".format("json_loads ({})".format(name), "n/a"))
+            continue
+        duration = min(timeit.repeat(lambda: json_loads(response), number=1, repeat=5))
+        print("{:<24} {:>10.2f} ms".format("json_loads ({})".format(name), duration * 1000))
+    json_backend_set(backend)
+
+    etxns = json_loads(response)['block']['transactions']
+
+    def scan_eager():
+        return [
+            co for txn in (transactions.from_json(etxn['rawtransaction'], id=etxn['id']) for etxn in etxns)
+            for co in txn.coin_outputs if str(co.condition.unlockhash) in wanted]
+
+    def scan_lazy():
+        matches = []
+        for etxn in etxns:
+            txn = transactions.from_json_lazy(etxn['rawtransaction'], id=etxn['id'])
+            for (index, address) in enumerate(txn.coin_output_addresses):
+                if address in wanted:
+                    matches.append(txn.coin_outputs[index])
+        return matches
+
+    assert len(scan_eager()) == len(scan_lazy())
+    for (name, func) in (("scan (from_json)", scan_eager), ("scan (from_json_lazy)", scan_lazy)):
+        duration = min(timeit.repeat(func, number=1, repeat=3))
+        print("{:<24} {:>10.2f} ms".format(name, duration * 1000))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
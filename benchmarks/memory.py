@@ -0,0 +1,51 @@
+"""
+Measure the memory used to decode a large explorer block response,
+using tracemalloc: the peak memory during decoding and the memory retained
+by the decoded transactions, output ids and unlock hashes.
+
+Run from the root of the repository as:
+
+    python -m benchmarks.memory [nr_of_transactions [nr_of_outputs]]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from tfchain.TransactionFactory import TransactionFactory
+from tfchain.types.ConditionTypes import UnlockHash
+from tfchain.types.PrimitiveTypes import Hash
+
+from benchmarks.fixtures import block_response_new
+
+
+def block_decode(resp):
+    factory = TransactionFactory()
+    transactions = []
+    for etxn in resp['block']['transactions']:
+        txn = factory.from_json(etxn['rawtransaction'], id=etxn['id'])
+        for (co, id, uh) in zip(txn.coin_outputs, etxn['coinoutputids'], etxn['coinoutputunlockhashes']):
+            co.id = Hash.from_json(id)
+            UnlockHash.from_json(uh)
+        transactions.append(txn)
+    return transactions
+
+
+def main(nr_of_transactions=1000, nr_of_outputs=10):
+    resp = block_response_new(nr_of_transactions=nr_of_transactions, nr_of_outputs=nr_of_outputs)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    transactions = block_decode(resp)
+    duration = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print("decoded {} transactions with {} coin outputs each in {:.3f}s (traced)".format(
+        len(transactions), nr_of_outputs, duration))
+    print("retained: {:>10.1f} KiB".format(retained / 1024))
+    print("peak:     {:>10.1f} KiB".format(peak / 1024))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,50 @@
+"""
+Benchmark computing the Merkle root of many leaves, using the ported Tree
+(pushing one leaf at a time) and using a FullTree (hashing all leaves as one batch),
+as well as creating and verifying inclusion proofs using the FullTree.
+
+Run from the root of the repository as:
+
+    python -m benchmarks.merkletree [nr_of_leaves ...]
+"""
+
+import sys
+import timeit
+
+from tfchain.crypto.merkletree import Tree, FullTree, proof_verify
+from tfchain.crypto.utils import blake2_hash
+
+
+def tree_root(leaves):
+    tree = Tree(hash_func=blake2_hash)
+    for leaf in leaves:
+        tree.push(leaf)
+    return tree.root()
+
+
+def main(*sizes):
+    print("{:>8} {:>12} {:>16} {:>16} {:>16}".format(
+        "leaves", "Tree (ms)", "FullTree (ms)", "proofs (ms)", "verify (ms)"))
+    for nr_of_leaves in (sizes or (1000, 10000, 100000)):
+        leaves = [index.to_bytes(32, byteorder='little') for index in range(nr_of_leaves)]
+        assert tree_root(leaves) == FullTree(leaves=leaves).root()
+        tree = FullTree(leaves=leaves)
+        root = tree.root()
+        indices = range(0, nr_of_leaves, max(1, nr_of_leaves // 1000))
+        proofs = [tree.proof(index) for index in indices]
+        assert all(proof_verify(root, leaves[index], index, nr_of_leaves, proof) for (index, proof) in zip(indices, proofs))
+        durations = [
+            min(timeit.repeat(lambda: tree_root(leaves), number=1, repeat=3)),
+            min(timeit.repeat(lambda: FullTree(leaves=leaves).root(), number=1, repeat=3)),
+            min(timeit.repeat(lambda: [tree.proof(index) for index in indices], number=1, repeat=3)),
+            min(timeit.repeat(
+                lambda: [proof_verify(root, leaves[index], index, nr_of_leaves, proof) for (index, proof) in zip(indices, proofs)],
+                number=1, repeat=3)),
+        ]
+        print("{:>8} {:>12.2f} {:>16.2f} {:>16.2f} {:>16.2f}".format(
+            nr_of_leaves, *(duration * 1000 for duration in durations)))
+    print("(proofs are created and verified for up to 1000 leaves of each tree)")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
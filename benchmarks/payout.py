@@ -0,0 +1,73 @@
+"""
+Measure the peak memory used to compute the signature hash and an output ID
+of a v1 payout transaction with many coin outputs, comparing hashing
+the fully encoded input with streaming the encoded input into the hasher.
+
+The transaction itself is created before the measurement starts.
+
+Run from the root of the repository as:
+
+    python -m benchmarks.payout [nr_of_outputs ...]
+"""
+
+import sys
+import timeit
+import tracemalloc
+
+from tfchain.crypto.utils import blake2_hash
+from tfchain.types.transactions.Standard import TransactionV1
+from tfchain.types.CryptoTypes import PublicKey, PublicKeySpecifier
+from tfchain.types.ConditionTypes import ConditionUnlockHash
+from tfchain.types.IO import CoinOutput
+from tfchain.types.PrimitiveTypes import Hash
+
+
+def transaction_new(nr_of_outputs):
+    txn = TransactionV1()
+    pk = PublicKey(specifier=PublicKeySpecifier.ED25519, hash=bytes(32))
+    condition = ConditionUnlockHash(unlockhash=pk.unlockhash)
+    txn.coin_input_add(
+        parentid=bytes(32), fulfillment=None,
+        parent_output=CoinOutput(value=nr_of_outputs*1000000000+1, condition=condition))
+    for index in range(nr_of_outputs):
+        uh = PublicKey(specifier=PublicKeySpecifier.ED25519, hash=index.to_bytes(32, byteorder='little')).unlockhash
+        txn.coin_output_add(value=1000000000+index, condition=ConditionUnlockHash(unlockhash=uh))
+    txn.miner_fee_add(1)
+    return txn
+
+
+def hash_buffered(txn):
+    blake2_hash(txn._signature_hash_input_get(0))
+    Hash(value=blake2_hash(
+        txn._coin_outputid_specifier, txn._id_input_compute(), (0).to_bytes(8, byteorder='little')))
+
+
+def hash_streamed(txn):
+    txn.signature_hash_get(0)
+    txn.coin_outputid_new(0)
+
+
+def measure(func, txn, repeat=3):
+    # time without tracing, as tracemalloc slows down all allocations
+    duration = min(timeit.repeat(lambda: func(txn), number=1, repeat=repeat))
+    tracemalloc.start()
+    func(txn)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak
+
+
+def main(*sizes):
+    print("{:>8} {:>10} {:>14} {:>14} {:>16} {:>16}".format(
+        "outputs", "size", "buffered (s)", "streamed (s)", "buffered (peak)", "streamed (peak)"))
+    for nr_of_outputs in (sizes or (100, 10000, 100000)):
+        txn = transaction_new(nr_of_outputs)
+        size = len(txn.binary_encode())
+        buffered, buffered_peak = measure(hash_buffered, txn)
+        streamed, streamed_peak = measure(hash_streamed, txn)
+        print("{:>8} {:>10} {:>14.3f} {:>14.3f} {:>16} {:>16}".format(
+            nr_of_outputs, size, buffered, streamed, buffered_peak, streamed_peak))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
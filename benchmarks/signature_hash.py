@@ -0,0 +1,70 @@
+"""
+Benchmark the signing of a v1 transaction with many coin inputs,
+comparing the signature hashes computed one by one by the transaction
+with the signature requests, which share a single SignatureHashContext
+within a signature hash batch.
+
+Run from the root of the repository as:
+
+    python -m benchmarks.signature_hash
+"""
+
+import time
+
+from tfchain.types.transactions.Standard import TransactionV1
+from tfchain.types.CryptoTypes import PublicKey, PublicKeySpecifier
+from tfchain.types.ConditionTypes import ConditionUnlockHash
+from tfchain.types.IO import CoinOutput
+from tfchain.types.FulfillmentTypes import signature_hash_batch
+
+
+# no ed25519 signing is done, as only the signature hash computation is benchmarked
+_SIGNATURE = bytes(64)
+
+
+def transaction_new(nr_of_inputs):
+    txn = TransactionV1()
+    public_keys = []
+    for index in range(nr_of_inputs):
+        pk = PublicKey(specifier=PublicKeySpecifier.ED25519, hash=index.to_bytes(32, byteorder='little'))
+        public_keys.append(pk)
+        condition = ConditionUnlockHash(unlockhash=pk.unlockhash)
+        txn.coin_input_add(
+            parentid=(index+1).to_bytes(32, byteorder='little'), fulfillment=None,
+            parent_output=CoinOutput(value=1, condition=condition))
+    txn.coin_output_add(value=nr_of_inputs-1, condition=ConditionUnlockHash(unlockhash=public_keys[0].unlockhash))
+    txn.miner_fee_add(1)
+    return txn, public_keys
+
+
+def sign_sequential(txn, public_keys):
+    for (index, ci) in enumerate(txn.coin_inputs):
+        txn.signature_hash_get(index)
+        ci.fulfillment.signature_add(public_key=public_keys[index], signature=_SIGNATURE)
+
+
+def sign_requests(txn, public_keys):
+    with signature_hash_batch():
+        for (index, request) in enumerate(txn.signature_requests_new()):
+            request.input_hash_new(public_keys[index])
+            request.signature_fulfill(public_key=public_keys[index], signature=_SIGNATURE)
+
+
+def measure(func, nr_of_inputs):
+    txn, public_keys = transaction_new(nr_of_inputs)
+    start = time.perf_counter()
+    func(txn, public_keys)
+    return time.perf_counter() - start
+
+
+def main():
+    print("{:>8} {:>16} {:>16} {:>8}".format("inputs", "sequential (s)", "context (s)", "speedup"))
+    for nr_of_inputs in (1, 100, 1000):
+        sequential = measure(sign_sequential, nr_of_inputs)
+        context = measure(sign_requests, nr_of_inputs)
+        print("{:>8} {:>16.4f} {:>16.4f} {:>7.1f}x".format(
+            nr_of_inputs, sequential, context, sequential/context))
+
+
+if __name__ == '__main__':
+    main()
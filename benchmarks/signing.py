@@ -0,0 +1,181 @@
+"""
+Benchmark signing a batch of v1 payout transactions with many coin inputs each,
+signing one request at a time compared to signing all of them using
+TransactionFactory.sign_many, for an increasing amount of (process) workers.
+
+Signatures are created using PyNaCl or cryptography when installed,
+otherwise using the pure-Python ed25519 reference implementation of RFC 8032
+defined below (which is a lot slower, but scales the same way).
+
+Run from the root of the repository as:
+
+    python -m benchmarks.signing [nr_of_transactions] [nr_of_inputs] [max_workers ...]
+"""
+
+import hashlib
+import os
+import sys
+import time
+
+from tfchain.TransactionFactory import TransactionFactory
+from tfchain.types.CryptoTypes import PublicKey, PublicKeySpecifier
+from tfchain.types.ConditionTypes import ConditionUnlockHash
+from tfchain.types.IO import CoinOutput
+
+
+# ed25519 as defined in RFC 8032, section 6
+_P = 2**255 - 19
+_Q = 2**252 + 27742317777372353535851937790883648493
+_D = -121665 * pow(121666, _P - 2, _P) % _P
+_SQRT_M1 = pow(2, (_P - 1) // 4, _P)
+
+
+def _point_add(P, Q):
+    A, B = (P[1] - P[0]) * (Q[1] - Q[0]) % _P, (P[1] + P[0]) * (Q[1] + Q[0]) % _P
+    C, D = 2 * P[3] * Q[3] * _D % _P, 2 * P[2] * Q[2] % _P
+    E, F, G, H = B - A, D - C, D + C, B + A
+    return (E * F, G * H, F * G, E * H)
+
+
+def _point_mul(s, P):
+    Q = (0, 1, 1, 0)
+    while s > 0:
+        if s & 1:
+            Q = _point_add(Q, P)
+        P = _point_add(P, P)
+        s >>= 1
+    return Q
+
+
+def _point_compress(P):
+    zinv = pow(P[2], _P - 2, _P)
+    x, y = P[0] * zinv % _P, P[1] * zinv % _P
+    return (y | ((x & 1) << 255)).to_bytes(32, 'little')
+
+
+def _recover_x(y):
+    x2 = (y * y - 1) * pow(_D * y * y + 1, _P - 2, _P)
+    x = pow(x2, (_P + 3) // 8, _P)
+    if (x * x - x2) % _P != 0:
+        x = x * _SQRT_M1 % _P
+    return _P - x if x & 1 else x
+
+
+_G_Y = 4 * pow(5, _P - 2, _P) % _P
+_G_X = _recover_x(_G_Y)
+_G = (_G_X, _G_Y, 1, _G_X * _G_Y % _P)
+
+
+def _secret_expand(seed):
+    h = hashlib.sha512(seed).digest()
+    a = int.from_bytes(h[:32], 'little')
+    a &= (1 << 254) - 8
+    a |= (1 << 254)
+    return (a, h[32:])
+
+
+def _sha512_modq(data):
+    return int.from_bytes(hashlib.sha512(data).digest(), 'little') % _Q
+
+
+def _reference_public_key(seed):
+    a, _ = _secret_expand(seed)
+    return _point_compress(_point_mul(a, _G))
+
+
+def _reference_sign(seed, message):
+    a, prefix = _secret_expand(seed)
+    A = _point_compress(_point_mul(a, _G))
+    r = _sha512_modq(prefix + message)
+    R = _point_compress(_point_mul(r, _G))
+    s = (r + _sha512_modq(R + A + message) * a) % _Q
+    return R + s.to_bytes(32, 'little')
+
+
+def _nacl_sign(seed, message):
+    from nacl.signing import SigningKey
+    return SigningKey(seed).sign(message).signature
+
+
+def _nacl_public_key(seed):
+    from nacl.signing import SigningKey
+    return bytes(SigningKey(seed).verify_key)
+
+
+def _cryptography_sign(seed, message):
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+    return Ed25519PrivateKey.from_private_bytes(seed).sign(message)
+
+
+def _cryptography_public_key(seed):
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+    from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+    return Ed25519PrivateKey.from_private_bytes(seed).public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+
+
+def backend_get():
+    """
+    The name, sign and public key functions of the fastest ed25519 backend installed.
+    """
+    try:
+        import nacl.signing
+        return ("pynacl", _nacl_sign, _nacl_public_key)
+    except ImportError:
+        pass
+    try:
+        import cryptography.hazmat.primitives.asymmetric.ed25519
+        return ("cryptography", _cryptography_sign, _cryptography_public_key)
+    except ImportError:
+        pass
+    return ("rfc8032 reference (pure python)", _reference_sign, _reference_public_key)
+
+
+def transactions_new(keys, nr_of_transactions, nr_of_inputs):
+    transactions = TransactionFactory()
+    txns = []
+    pks = [pk for (pk, _) in keys.values()]
+    for txn_index in range(nr_of_transactions):
+        txn = transactions.new()
+        for index in range(nr_of_inputs):
+            pk = pks[index % len(pks)]
+            txn.coin_input_add(
+                parentid=(txn_index * nr_of_inputs + index).to_bytes(32, byteorder='little'), fulfillment=None,
+                parent_output=CoinOutput(value=2, condition=ConditionUnlockHash(unlockhash=pk.unlockhash)))
+        txn.coin_output_add(value=nr_of_inputs * 2 - 1, condition=ConditionUnlockHash(unlockhash=pks[0].unlockhash))
+        txn.miner_fee_add(1)
+        txns.append(txn)
+    return txns
+
+
+def main(nr_of_transactions=100, nr_of_inputs=10, *worker_counts):
+    name, sign, public_key_get = backend_get()
+    seeds = [bytes([index + 1]) * 32 for index in range(10)]
+    keys = {}
+    for seed in seeds:
+        pk = PublicKey(specifier=PublicKeySpecifier.ED25519, hash=public_key_get(seed))
+        keys[str(pk.unlockhash)] = (pk, seed)
+    transactions = TransactionFactory()
+    print("backend: {}, {} transactions with {} inputs each, {} CPUs".format(
+        name, nr_of_transactions, nr_of_inputs, os.cpu_count()))
+
+    txns = transactions_new(keys, nr_of_transactions, nr_of_inputs)
+    start = time.perf_counter()
+    for txn in txns:
+        for request in txn.signature_requests_new():
+            pk, seed = keys[request.wallet_address]
+            request.signature_fulfill(public_key=pk, signature=sign(seed, request.input_hash_new(pk).value))
+    sequential = time.perf_counter() - start
+    print("{:<24} {:>10.3f} s".format("one by one", sequential))
+
+    for max_workers in (worker_counts or (1, 2, 4, 8)):
+        txns = transactions_new(keys, nr_of_transactions, nr_of_inputs)
+        start = time.perf_counter()
+        transactions.sign_many(txns, keys, sign, max_workers=max_workers)
+        duration = time.perf_counter() - start
+        assert all(txn.is_fulfilled() for txn in txns)
+        print("{:<24} {:>10.3f} s {:>8.2f}x".format(
+            "sign_many ({} workers)".format(max_workers), duration, sequential / duration))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,46 @@
+"""
+Benchmark decoding the transactions of an explorer block response with many coin outputs,
+comparing the default decoding, which verifies the checksum of each unlock hash,
+with decoding the response as coming from a trusted source.
+
+Addresses are not reused within the block, such that each unlock hash is decoded
+(the decoded transactions are dropped between runs, so nothing remains interned).
+
+Run from the root of the repository as:
+
+    python -m benchmarks.trusted_decode [nr_of_transactions] [nr_of_outputs]
+"""
+
+import sys
+import timeit
+
+from benchmarks.fixtures import block_response_new
+from tfchain.TransactionFactory import TransactionFactory
+from tfchain.types.ConditionTypes import UnlockHash, trusted_json_decoding
+
+
+def main(nr_of_transactions=500, nr_of_outputs=20):
+    nr_of_addresses = nr_of_transactions * nr_of_outputs
+    etxns = block_response_new(
+        nr_of_transactions=nr_of_transactions, nr_of_outputs=nr_of_outputs,
+        nr_of_addresses=nr_of_addresses)['block']['transactions']
+    addresses = [co['condition']['data']['unlockhash'] for etxn in etxns for co in etxn['rawtransaction']['data']['coinoutputs']]
+    transactions = TransactionFactory()
+
+    def unlockhashes_decode(trusted):
+        with trusted_json_decoding(trusted):
+            return [UnlockHash.from_json(address) for address in addresses]
+
+    print("{} transactions, {} coin outputs".format(nr_of_transactions, nr_of_addresses))
+    for trusted in (False, True):
+        duration = min(timeit.repeat(lambda: unlockhashes_decode(trusted), number=1, repeat=10))
+        print("{:<32} {:>10.2f} ms".format("UnlockHash.from_json (trusted={})".format(trusted), duration * 1000))
+    for trusted in (False, True):
+        duration = min(timeit.repeat(
+            lambda: [transactions.from_json(etxn['rawtransaction'], id=etxn['id'], trusted=trusted) for etxn in etxns],
+            number=1, repeat=10))
+        print("{:<32} {:>10.2f} ms".format("from_json (trusted={})".format(trusted), duration * 1000))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
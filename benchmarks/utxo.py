@@ -0,0 +1,134 @@
+"""
+Benchmark replaying a synthetic chain into a UTXOIndex, and querying the balance
+and spendable outputs of addresses from the index compared to walking all transactions.
+
+The chain consists of v1 transactions which each spend an output of the previous block
+and create multiple outputs, paying out to a fixed set of addresses,
+with every 10th output locked until a later block height.
+
+Run from the root of the repository as:
+
+    python -m benchmarks.utxo [nr_of_outputs] [nr_of_addresses]
+"""
+
+import sys
+import time
+import timeit
+
+from benchmarks.fixtures import unlockhash_new
+from tfchain.TransactionFactory import TransactionFactory
+from tfchain.types.PrimitiveTypes import Currency
+from tfchain.utxo import UTXOIndex
+
+
+_OUTPUTS_PER_TRANSACTION = 10
+_TRANSACTIONS_PER_BLOCK = 100
+_LOCK_DURATION = 500
+
+
+def _hex(index):
+    return index.to_bytes(32, byteorder='little').hex()
+
+
+def chain_new(nr_of_outputs, nr_of_addresses):
+    """
+    Create the blocks of a synthetic chain, as (explorer block, decoded transactions) pairs,
+    the raw transactions are dropped from the explorer blocks once decoded.
+    """
+    transactions = TransactionFactory()
+    addresses = [unlockhash_new(index) for index in range(nr_of_addresses)]
+    fulfillment = {'type': 1, 'data': {'publickey': 'ed25519:' + '11' * 32, 'signature': '22' * 64}}
+    outputs_per_block = _OUTPUTS_PER_TRANSACTION * _TRANSACTIONS_PER_BLOCK
+    chain = []
+    counter = 0
+    for height in range((nr_of_outputs + outputs_per_block - 1) // outputs_per_block):
+        etxns = []
+        for txn_index in range(_TRANSACTIONS_PER_BLOCK):
+            coininputs = []
+            if height > 0:
+                # spend the first output of the transaction at the same position in the previous block
+                parent = counter - outputs_per_block - (counter % outputs_per_block) + txn_index * _OUTPUTS_PER_TRANSACTION
+                coininputs.append({'parentid': _hex(parent + 1), 'fulfillment': fulfillment})
+            coinoutputs = []
+            coinoutputids = []
+            for _ in range(_OUTPUTS_PER_TRANSACTION):
+                condition = {'type': 1, 'data': {'unlockhash': addresses[counter % nr_of_addresses]}}
+                if counter % 10 == 9:
+                    condition = {'type': 3, 'data': {'locktime': height + _LOCK_DURATION, 'condition': condition}}
+                coinoutputs.append({'value': str(1000000000 + counter), 'condition': condition})
+                coinoutputids.append(_hex(counter + 1))
+                counter += 1
+            etxns.append({
+                'id': _hex(nr_of_outputs + counter),
+                'rawtransaction': {'version': 1, 'data': {'coininputs': coininputs, 'coinoutputs': coinoutputs, 'minerfees': ['100000000']}},
+                'coinoutputids': coinoutputids,
+            })
+        txns = transactions.from_json_many(
+            (etxn['rawtransaction'] for etxn in etxns), ids=(etxn['id'] for etxn in etxns), trusted=True)
+        for etxn in etxns:
+            del etxn['rawtransaction']
+        block = {'blockid': _hex(height), 'height': height, 'rawblock': {'timestamp': 1550000000 + height * 120}, 'transactions': etxns}
+        chain.append((block, txns))
+    return (chain, addresses)
+
+
+def chain_replay(chain):
+    index = UTXOIndex()
+    for (block, txns) in chain:
+        index.block_add(block, transactions=txns)
+    return index
+
+
+def balance_scan(chain, address, height):
+    """
+    Compute the (spendable, locked) balance of an address by walking all transactions,
+    as has to be done with the transactions returned by the explorer for an address.
+    """
+    spent = set()
+    outputs = {}
+    for (block, txns) in chain:
+        for (etxn, txn) in zip(block['transactions'], txns):
+            for ci in txn.coin_inputs:
+                spent.add(ci.parentid.value)
+            for (id, co) in zip(etxn['coinoutputids'], txn.coin_outputs):
+                if str(co.condition.unlockhash) == address:
+                    outputs[bytes.fromhex(id)] = co
+    spendable, locked = [], []
+    for (id, co) in outputs.items():
+        if id in spent:
+            continue
+        if co.condition.lock.locked_check(height, 0):
+            locked.append(co.value)
+        else:
+            spendable.append(co.value)
+    return (Currency.sum(spendable), Currency.sum(locked))
+
+
+def main(nr_of_outputs=1000000, nr_of_addresses=10000):
+    start = time.perf_counter()
+    chain, addresses = chain_new(nr_of_outputs, nr_of_addresses)
+    print("{} blocks, {} outputs, {} addresses (created and decoded in {:.1f} s)".format(
+        len(chain), nr_of_outputs, nr_of_addresses, time.perf_counter() - start))
+
+    start = time.perf_counter()
+    index = chain_replay(chain)
+    duration = time.perf_counter() - start
+    print("{:<32} {:>10.2f} s {:>8.2f} us/output ({} unspent outputs)".format(
+        "replay", duration, duration * 1e6 / nr_of_outputs, len(index)))
+
+    queried = addresses[:1000]
+    for (name, func) in (
+            ("coin_balance_get", lambda: [index.coin_balance_get(address) for address in queried]),
+            ("coin_outputs_spendable_get", lambda: [index.coin_outputs_spendable_get(address) for address in queried])):
+        duration = min(timeit.repeat(func, number=1, repeat=3))
+        print("{:<32} {:>10.3f} ms/address".format(name, duration * 1000 / len(queried)))
+
+    address = addresses[9]
+    balance = index.coin_balance_get(address)
+    start = time.perf_counter()
+    assert balance_scan(chain, address, index.height) == (balance.spendable, balance.locked)
+    print("{:<32} {:>10.3f} ms/address".format("walking all transactions", (time.perf_counter() - start) * 1000))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -1,5 +1,5 @@
 from tfchain.crypto.merkletree import Tree
-from tfchain.crypto.utils import blake2_string
+from tfchain.crypto.utils import blake2_string, blake2_hash, blake2_hasher_new
 
 
 def test_basic_merkletree():
@@ -12,3 +12,62 @@ def test_basic_merkletree():
     root = tree.root().hex()
     assert root == '0002789a97a9feee38af3709f06377ef0ad7d91407cbcad1ccb8605556b6578e'
     print('Root is {}'.format(root))
+
+
+def test_binary_blake2():
+    # binary hashes equal the decoded hex hashes
+    assert blake2_hash(b'foo') == bytes.fromhex(blake2_string(b'foo'))
+    assert blake2_hash(b'foo', digest_size=16) == bytes.fromhex(blake2_string(b'foo', digest_size=16))
+    # multiple buffers are hashed as if they were one
+    assert blake2_hash(b'foo', bytearray(b'bar'), memoryview(b'baz')) == blake2_hash(b'foobarbaz')
+    assert blake2_hash() == blake2_hash(b'')
+    # streaming hashers can be fed with more data and copied
+    h = blake2_hasher_new(b'foo', b'bar')
+    c = h.copy()
+    h.update(b'baz')
+    assert h.digest() == blake2_hash(b'foobarbaz')
+    c.update(b'qux')
+    assert c.digest() == blake2_hash(b'foobarqux')
+
+
+def test_full_merkletree():
+    from tfchain.crypto.merkletree import FullTree, proof_verify
+
+    # the root equals the root of the ported tree, for any amount of leaves
+    for nr_of_leaves in range(0, 34):
+        leaves = [bytes([index])*(index % 5) for index in range(nr_of_leaves)]
+        tree = Tree(hash_func=blake2_hash)
+        for leaf in leaves:
+            tree.push(leaf)
+        full = FullTree(leaves=leaves)
+        assert len(full) == nr_of_leaves
+        assert full.root() == tree.root()
+
+        # every leaf can be proven to be part of the tree
+        root = full.root()
+        for index, leaf in enumerate(leaves):
+            proof = full.proof(index)
+            assert len(proof) <= nr_of_leaves.bit_length()
+            assert full.verify(leaf, index, proof)
+            assert proof_verify(root, leaf, index, nr_of_leaves, proof)
+            # but not as another leaf, or with another proof
+            assert not proof_verify(root, leaf + b'x', index, nr_of_leaves, proof)
+            if nr_of_leaves > 1:
+                assert not proof_verify(root, leaf, (index + 1) % nr_of_leaves, nr_of_leaves, proof)
+                assert not proof_verify(root, leaf, index, nr_of_leaves, proof[:-1])
+                assert not proof_verify(root, leaf, index, nr_of_leaves, proof + [root])
+
+    # leaves can be pushed one by one, or in batches
+    tree = FullTree()
+    tree.push(bytearray([1]))
+    tree.extend([bytearray([2]), bytearray([3]), bytearray([4])])
+    assert tree.root().hex() != FullTree(leaves=[bytearray([1])]).root().hex()
+    tree.push(memoryview(bytearray([5])))
+    assert tree.root().hex() == '0002789a97a9feee38af3709f06377ef0ad7d91407cbcad1ccb8605556b6578e'
+    assert tree.leaf_hash(0) == blake2_hash(b'\x00\x01')
+
+    try:
+        tree.proof(5)
+        raise Exception("proof of a leaf out of range cannot be created")
+    except IndexError:
+        pass
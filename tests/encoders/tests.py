@@ -1,6 +1,7 @@
 import pytest
-from tfchain.encoders import encoder_rivine_get, encoder_sia_get
-from tfchain.encoders.exceptions import IntegerOutOfRange, SliceLengthOutOfRange
+from tfchain.encoders import encoder_rivine_get, encoder_sia_get, decoder_rivine_get, decoder_sia_get, \
+    rivine_encoded_size, sia_encoded_size, rivine_encode, sia_encode
+from tfchain.encoders.exceptions import IntegerOutOfRange, SliceLengthOutOfRange, DecodeError
 from tfchain.encoders import BaseRivineObjectEncoder, BaseSiaObjectEncoder
 
 
@@ -186,3 +187,218 @@ def test_sia_custom():
     # integers have an upper bound
     with pytest.raises(IntegerOutOfRange):
         e.add(1 << 64)
+
+
+def test_rivine_decoding():
+    e = encoder_rivine_get()
+    e.add_int8(1)
+    e.add_int16(2)
+    e.add_int24(3)
+    e.add_int32(4)
+    e.add_int64(5)
+    e.add(True)
+    e.add_array(b'abc')
+    e.add_slice(b'foo')
+    e.add_slice(b'1' * 100)
+    e.add_slice(b'2' * (1 << 14))
+
+    # decoding is done in the same order as the encoding,
+    # arrays and slices are returned as memoryviews of the encoded data
+    d = decoder_rivine_get(e.data)
+    assert d.get_int8() == 1
+    assert d.get_int16() == 2
+    assert d.get_int24() == 3
+    assert d.get_int32() == 4
+    assert d.get_int64() == 5
+    assert d.get_bool() is True
+    assert isinstance(d.get_array(3), memoryview)
+    assert bytes(d.get_slice()) == b'foo'
+    assert bytes(d.get_slice()) == b'1' * 100
+    assert bytes(d.get_slice()) == b'2' * (1 << 14)
+    assert d.remaining == 0
+    d.end()
+
+    # decoding more data than available is an error
+    with pytest.raises(DecodeError):
+        decoder_rivine_get(b'\x06fo').get_slice()
+    # as is data that is not decoded
+    d = decoder_rivine_get(b'\x01\x02')
+    assert d.get_int8() == 1
+    with pytest.raises(DecodeError):
+        d.end()
+    # booleans are strict
+    with pytest.raises(DecodeError):
+        decoder_rivine_get(b'\x02').get_bool()
+
+
+def test_sia_decoding():
+    e = encoder_sia_get()
+    e.add(42)
+    e.add(False)
+    e.add_byte(6)
+    e.add_array(b'abc')
+    e.add_slice(b'foo')
+
+    d = decoder_sia_get(e.data)
+    assert d.get_int() == 42
+    assert d.get_bool() is False
+    assert d.get_byte() == 6
+    assert bytes(d.get_array(3)) == b'abc'
+    assert bytes(d.get_slice()) == b'foo'
+    d.end()
+
+    # decoding more data than available is an error
+    with pytest.raises(DecodeError):
+        decoder_sia_get(b'\x03\x00\x00\x00\x00\x00\x00\x00fo').get_slice()
+    with pytest.raises(DecodeError):
+        decoder_sia_get(b'\x01\x00').get_int()
+    # as is data that is not decoded
+    d = decoder_sia_get(b'\x01\x02')
+    assert d.get_byte() == 1
+    with pytest.raises(DecodeError):
+        d.end()
+
+
+def test_presized_encoding():
+    values = [42, True, "a", b"123", [1, "foo", b"bar"], b"2" * 200]
+
+    # the size of the encoding can be computed upfront,
+    # and used to encode all values in a pre-allocated buffer
+    for (size_get, encoder_get, encode) in (
+            (rivine_encoded_size, encoder_rivine_get, rivine_encode),
+            (sia_encoded_size, encoder_sia_get, sia_encode)):
+        e = encoder_get()
+        e.add_all(*values)
+        size = size_get(*values)
+        assert size == len(e.data)
+        presized = encoder_get(size=size)
+        presized.add_all(*values)
+        assert presized.data == e.data
+        assert encode(*values) == e.data
+
+        # a slice can be encoded directly from the function encoding its content
+        e = encoder_get()
+        e.add_slice(b"foo" * 50)
+        presized = encoder_get(size=len(e.data))
+        presized.add_slice_encoded(lambda encoder: encoder.add_array(b"foo" * 50))
+        assert presized.data == e.data
+
+
+def test_type_dispatch():
+    from tfchain.encoders import RivineBinaryEncoder, SiaBinaryEncoder
+
+    class Answer(BaseRivineObjectEncoder, BaseSiaObjectEncoder):
+        def __init__(self, number=0):
+            self._number = number
+
+        def rivine_binary_encode(self, encoder):
+            encoder.add_int8(self._number)
+
+        def sia_binary_encode(self, encoder):
+            encoder.add_int(self._number)
+
+    # subclasses of the encoder interfaces are matched as well
+    class SubAnswer(Answer):
+        pass
+
+    # as are subclasses of the python types
+    class Flag(int):
+        pass
+
+    class NoEncoding:
+        pass
+
+    for (encoder_get, expected) in (
+            (encoder_rivine_get, b'\x2a\x07\x01\x09\x00\x00\x00\x00\x00\x00\x00\x02\x01'),
+            (encoder_sia_get, b'\x2a\x00\x00\x00\x00\x00\x00\x00\x07\x00\x00\x00\x00\x00\x00\x00\x01'
+                              b'\x09\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x01')):
+        # the same types are dispatched again once resolved
+        for _ in range(2):
+            e = encoder_get()
+            e.add_all(Answer(42), SubAnswer(7), True, Flag(9), b'\x01')
+            assert e.data == expected
+
+        # values that cannot be encoded are still refused, each time
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                encoder_get().add(NoEncoding())
+            with pytest.raises(ValueError):
+                encoder_get().add(4.2)
+
+    # types can register a fast-path function, matched by their exact type only
+    class Point:
+        def __init__(self, x, y):
+            self.x = x
+            self.y = y
+
+    def point_encode(encoder, value):
+        encoder.add_array(bytes([value.x, value.y]))
+
+    class Point3D(Point):
+        pass
+
+    for (encoder_class, size_get, encoder_get) in (
+            (RivineBinaryEncoder, rivine_encoded_size, encoder_rivine_get),
+            (SiaBinaryEncoder, sia_encoded_size, encoder_sia_get)):
+        with pytest.raises(ValueError):
+            encoder_get().add(Point(1, 2))
+        encoder_class.type_register(Point, point_encode)
+        e = encoder_get()
+        e.add(Point(1, 2))
+        assert e.data == b'\x01\x02'
+        # the size encoders use the registered function as well
+        assert size_get(Point(1, 2), Point(3, 4)) == 4
+        with pytest.raises(ValueError):
+            encoder_get().add(Point3D(1, 2))
+        # only types and functions can be registered
+        with pytest.raises(TypeError):
+            encoder_class.type_register(Point(1, 2), point_encode)
+        with pytest.raises(TypeError):
+            encoder_class.type_register(Point, None)
+
+
+def test_stream_encoding():
+    import hashlib
+    import io
+    from tfchain.encoders import encoder_rivine_stream_get, encoder_sia_stream_get
+
+    values = [42, True, "a", b"123", [1, "foo", b"bar"], b"2" * 200]
+
+    for (encoder_get, stream_encoder_get) in (
+            (encoder_rivine_get, encoder_rivine_stream_get),
+            (encoder_sia_get, encoder_sia_stream_get)):
+        e = encoder_get()
+        e.add_all(*values)
+
+        # the encoded data can be written to a file (or socket),
+        # in chunks, a buffer size smaller than some values is written directly
+        for buffer_size in (1, 7, 65536):
+            f = io.BytesIO()
+            stream = stream_encoder_get(f.write, buffer_size=buffer_size)
+            stream.add_all(*values)
+            stream.flush()
+            assert f.getvalue() == e.data
+            assert stream.size == len(e.data)
+
+        # or fed to a hasher, without keeping the encoded data
+        hasher = hashlib.blake2b(digest_size=32)
+        stream = stream_encoder_get(hasher.update, buffer_size=16)
+        stream.add_all(*values)
+        stream.flush()
+        assert hasher.digest() == hashlib.blake2b(e.data, digest_size=32).digest()
+        with pytest.raises(TypeError):
+            stream.data
+
+        # data is only written once the buffer is full or when flushed
+        chunks = []
+        stream = stream_encoder_get(lambda chunk: chunks.append(bytes(chunk)), buffer_size=16)
+        stream.add(b"foo")
+        assert chunks == []
+        stream.flush()
+        stream.flush()
+        assert len(chunks) == 1
+
+        with pytest.raises(TypeError):
+            stream_encoder_get(None)
+        with pytest.raises(ValueError):
+            stream_encoder_get(chunks.append, buffer_size=0)
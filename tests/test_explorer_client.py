@@ -1,9 +1,599 @@
+import asyncio
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import tfchain.errors
 from tfchain.TFChainExplorerClient import TFChainExplorerClient
+from tfchain.transport import HTTPError, HttpTransport
 from tfchain.jsutils import json_loads
 
+
 def test_explorer_client():
     client = TFChainExplorerClient()
     resp = client.get(addresses=['https://explorer2.threefoldtoken.com'], endpoint='/explorer/constants')
     data = json_loads(resp)
     assert data['chaininfo']['Name'] == 'tfchain'
-    assert data['chaininfo']['CoinUnit'] == 'TFT'
\ No newline at end of file
+    assert data['chaininfo']['CoinUnit'] == 'TFT'
+
+
+class _ExplorerHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, code, body=b'', headers=None):
+        self.send_response(code)
+        for (key, value) in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.ports.add(self.client_address[1])
+        self.server.user_agents.add(self.headers.get('User-Agent'))
+        if self.path == '/explorer/constants':
+            self._respond(200, b'{"chaininfo":{"Name":"tfchain","CoinUnit":"TFT"}}')
+        elif self.path == '/explorer/gzip':
+            assert 'gzip' in self.headers.get('Accept-Encoding', '')
+            self._respond(200, gzip.compress(b'{"compressed":true}'), headers={'Content-Encoding': 'gzip'})
+        elif self.path == '/explorer/badgzip':
+            self._respond(200, b'{"compressed":false}', headers={'Content-Encoding': 'gzip'})
+        elif self.path == '/explorer/empty':
+            self._respond(204)
+        elif self.path == '/explorer/hashes/00':
+            self._respond(400, b'{"message":"unrecognized hash used as input to /explorer/hash"}')
+        elif self.path == '/explorer/close':
+            # close the connection without announcing it
+            self._respond(200, b'{}')
+            self.close_connection = True
+        elif self.path == '/explorer/slow':
+            time.sleep(0.5)
+            self._respond(200, b'{}')
+        else:
+            self._respond(500, b'{"message":"internal error"}')
+
+    def do_POST(self):
+        self.server.ports.add(self.client_address[1])
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.posts.append(body)
+        if self.path == '/transactionpool/transactions':
+            self._respond(200, b'{"transaction":' + body + b'}')
+        elif self.path == '/transactionpool/drop':
+            # receive the request, but close the connection without responding
+            self.close_connection = True
+        else:
+            self._respond(500, b'{"message":"internal error"}')
+
+
+@pytest.fixture
+def explorer_address():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _ExplorerHandler)
+    server.daemon_threads = True
+    server.ports = set()
+    server.user_agents = set()
+    server.posts = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield 'http://127.0.0.1:{}'.format(server.server_address[1]), server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_explorer_client_transport(explorer_address):
+    address, server = explorer_address
+    transport = HttpTransport(pool_size=2, connect_timeout=1.0, read_timeout=0.2)
+    client = TFChainExplorerClient(transport=transport)
+    assert client.transport is transport
+
+    # connections are kept alive and reused
+    for _ in range(10):
+        data = json_loads(client.get(addresses=[address], endpoint='/explorer/constants'))
+        assert data['chaininfo']['Name'] == 'tfchain'
+    assert transport.connections_created(address) == 1
+    assert len(server.ports) == 1
+    assert server.user_agents == {'Rivine-Agent'}
+
+    # gzip-encoded responses are decoded
+    assert json_loads(client.get(addresses=[address], endpoint='/explorer/gzip')) == {'compressed': True}
+
+    # posted data is JSON-encoded
+    data = json_loads(client.post(
+        addresses=[address], endpoint='/transactionpool/transactions', data={'id': 1}))
+    assert data['transaction'] == {'id': 1}
+
+    # explorer errors
+    with pytest.raises(tfchain.errors.ExplorerNoContent):
+        client.get(addresses=[address], endpoint='/explorer/empty')
+    with pytest.raises(tfchain.errors.ExplorerNoContent):
+        client.get(addresses=[address], endpoint='/explorer/hashes/00')
+    with pytest.raises(tfchain.errors.ExplorerServerError):
+        client.get(addresses=[address], endpoint='/explorer/unknown')
+    with pytest.raises(tfchain.errors.ExplorerServerPostError):
+        client.post(addresses=[address], endpoint='/explorer/unknown', data=b'{}')
+    assert transport.connections_created(address) == 1
+
+    # a read timeout makes the explorer unavailable, and its connection is not reused
+    with pytest.raises(tfchain.errors.ExplorerNotAvailable):
+        client.get(addresses=[address], endpoint='/explorer/slow')
+    client.get(addresses=[address], endpoint='/explorer/constants')
+    assert transport.connections_created(address) == 2
+
+    # a server closing an idle connection is handled transparently
+    client.get(addresses=[address], endpoint='/explorer/close')
+    time.sleep(0.05)
+    data = json_loads(client.get(addresses=[address], endpoint='/explorer/constants'))
+    assert data['chaininfo']['Name'] == 'tfchain'
+    assert transport.connections_created(address) == 3
+
+    # ... also for a POST, as long as it could not be sent over the closed connection
+    client.get(addresses=[address], endpoint='/explorer/close')
+    time.sleep(0.05)
+    del server.posts[:]
+    assert transport.post(address + '/transactionpool/transactions', b'{"id":2}').status_code == 200
+    assert server.posts == [b'{"id":2}']
+    assert transport.connections_created(address) == 4
+
+    # a POST sent over a reused connection is not sent again when no response is received,
+    # as the server might have processed it already
+    with pytest.raises(HTTPError) as excinfo:
+        transport.post(address + '/transactionpool/drop', b'{"id":3}')
+    assert excinfo.value.status_code is None
+    assert server.posts == [b'{"id":2}', b'{"id":3}']
+    assert transport.connections_created(address) == 4
+
+    # an invalid gzip-encoded body is an HTTP error as well
+    with pytest.raises(HTTPError) as excinfo:
+        transport.get(address + '/explorer/badgzip')
+    assert excinfo.value.status_code is None
+    transport.close()
+
+    # the connect timeout applies when no connection can be made
+    with pytest.raises(HTTPError) as excinfo:
+        HttpTransport(connect_timeout=0.2).get('http://127.0.0.1:1/explorer/constants')
+    assert excinfo.value.status_code is None
+
+
+def test_explorer_client_custom_transport():
+    class Response:
+        status_code = 200
+        body = b'{"height":42}'
+
+    class Transport:
+        def __init__(self):
+            self.urls = []
+
+        def get(self, url, headers=None):
+            self.urls.append(url)
+            return Response()
+
+    transport = Transport()
+    client = TFChainExplorerClient(transport=transport)
+    assert json_loads(client.get(addresses=['http://explorer'], endpoint='/explorer')) == {'height': 42}
+    assert transport.urls == ['http://explorer/explorer']
+
+
+async def _stub_explorer_serve(stub):
+    """
+    Serve the responses of a TFChainExplorerGetClientStub over HTTP/1.1, using asyncio streams.
+    """
+    async def handle(reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, path, _ = line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b''):
+                        break
+                    key, value = line.decode('latin-1').split(':', 1)
+                    headers[key.strip().lower()] = value.strip()
+                data = await reader.readexactly(int(headers.get('content-length', '0')))
+                try:
+                    if method == 'POST':
+                        body = stub.explorer_post(path, json_loads(data))
+                    else:
+                        body = stub.explorer_get(path)
+                    status = '200 OK'
+                except tfchain.errors.ExplorerNoContent:
+                    body, status = '{"message":"unrecognized hash used as input to /explorer/hash"}', '400 Bad Request'
+                body = body.encode('utf-8')
+                writer.write('HTTP/1.1 {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n\r\n'.format(
+                    status, len(body)).encode('latin-1') + body)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, '127.0.0.1', 0)
+
+
+def test_async_explorer_client():
+    from tfchain.TFChainExplorerClient import AsyncTFChainExplorerClient
+    from tfchain.stubs.ExplorerClientStub import TFChainExplorerGetClientStub
+    from tfchain.types.ConditionTypes import UnlockHash, UnlockHashType
+
+    stub = TFChainExplorerGetClientStub()
+    stub.chain_info = '{"blockid":"b69bc0a12308938cbc8207483f39df63a2295142875944d6a2db3930d5c2564f","height":2662}'
+    addresses = [
+        str(UnlockHash(type=UnlockHashType.PUBLIC_KEY, hash=index.to_bytes(32, byteorder='little')))
+        for index in range(50)]
+    for (index, address) in enumerate(addresses[:40]):
+        stub.hash_add(address, '{"hashtype":"unlockhash","index":%d}' % index)
+
+    async def run():
+        servers = [await _stub_explorer_serve(stub) for _ in range(2)]
+        explorers = ['http://127.0.0.1:{}'.format(server.sockets[0].getsockname()[1]) for server in servers]
+        client = AsyncTFChainExplorerClient(concurrency=4)
+        try:
+            data = json_loads(await client.get(explorers, '/explorer'))
+            assert data['height'] == 2662
+
+            # results are returned in order
+            endpoints = ['/explorer/hashes/' + address for address in addresses[:40]]
+            results = await client.get_many(explorers, endpoints)
+            assert [json_loads(result)['index'] for result in results] == list(range(40))
+            # connections were reused, bounded by the concurrency
+            for explorer in explorers:
+                assert client.transport.connections_created(explorer) <= client.concurrency
+
+            # errors are raised or returned in place
+            endpoints = ['/explorer/hashes/' + address for address in addresses[38:42]]
+            with pytest.raises(tfchain.errors.ExplorerNoContent):
+                await client.get_many(explorers, endpoints)
+            results = await client.get_many(explorers, endpoints, return_exceptions=True)
+            assert [json_loads(result)['index'] for result in results[:2]] == [38, 39]
+            assert all(isinstance(result, tfchain.errors.ExplorerNoContent) for result in results[2:])
+        finally:
+            # closes the connections of the transport created by the client as well
+            client.close()
+            assert all(not pool._idle for pool in client.transport._pools.values())
+            for server in servers:
+                server.close()
+                await server.wait_closed()
+
+    asyncio.run(run())
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+
+class _FakeTransport:
+    """
+    Transport with a fixed latency per explorer, advancing a fake clock,
+    and failing for all explorers listed in its down set.
+    """
+
+    def __init__(self, clock, latencies):
+        self.clock = clock
+        self.latencies = latencies
+        self.down = set()
+        self.requests = []
+
+    def get(self, url, headers=None):
+        address = url[:url.index('/', len('http://'))]
+        self.requests.append(address)
+        self.clock.now += self.latencies[address]
+        if address in self.down:
+            raise HTTPError("connection refused", url=url)
+        return _FakeResponse(200, address.encode('utf-8'))
+
+
+def test_async_explorer_client_get_many_distributed():
+    from tfchain.TFChainExplorerClient import AsyncTFChainExplorerClient
+    from tfchain.health import ExplorerHealthTracker
+
+    clock = _FakeClock()
+    transport = _FakeTransport(clock, {'http://fast': 0.01, 'http://medium': 0.1, 'http://slow': 1.0})
+    transport.closed = 0
+    def close():
+        transport.closed += 1
+    transport.close = close
+    health = ExplorerHealthTracker(clock=clock, failure_threshold=1)
+    explorers = ['http://slow', 'http://fast', 'http://medium']
+    client = AsyncTFChainExplorerClient(transport=transport, concurrency=2, health=health)
+
+    async def run():
+        endpoints = ['/explorer/hashes/{}'.format(index) for index in range(30)]
+        # the requests are spread over all explorers, also once their latencies are known
+        for _ in range(2):
+            transport.requests.clear()
+            results = await client.get_many(explorers, endpoints)
+            assert sorted(transport.requests) == sorted(result.decode('utf-8') for result in results)
+            assert {address: transport.requests.count(address) for address in explorers} == {
+                'http://fast': 10, 'http://medium': 10, 'http://slow': 10}
+        # tripped explorers are not part of the rotation
+        transport.down.add('http://slow')
+        with pytest.raises(tfchain.errors.ExplorerNotAvailable):
+            await client.get(['http://slow'], '/explorer')
+        transport.requests.clear()
+        results = await client.get_many(explorers, endpoints)
+        assert set(transport.requests) == {'http://fast', 'http://medium'}
+        assert set(result.decode('utf-8') for result in results) == {'http://fast', 'http://medium'}
+
+    try:
+        asyncio.run(run())
+    finally:
+        client.close()
+    # a transport which was not created by the client is not closed by it
+    assert transport.closed == 0
+
+
+def test_explorer_client_health():
+    from tfchain.health import ExplorerHealthTracker, ExplorerState
+
+    clock = _FakeClock()
+    explorers = ['http://fast', 'http://medium', 'http://slow']
+    transport = _FakeTransport(clock, {'http://fast': 0.01, 'http://medium': 0.1, 'http://slow': 1.0})
+    health = ExplorerHealthTracker(alpha=0.5, failure_threshold=2, probe_interval=10.0, clock=clock)
+    client = TFChainExplorerClient(transport=transport, health=health)
+
+    # each explorer is tried once, as no latencies are known yet,
+    # after which the fastest explorer is preferred
+    for address in explorers:
+        assert client.get(addresses=[address], endpoint='/explorer') == address.encode('utf-8')
+    for _ in range(5):
+        assert client.get(addresses=explorers, endpoint='/explorer') == b'http://fast'
+    snapshot = health.snapshot()
+    assert snapshot['http://fast']['requests'] == 6
+    assert snapshot['http://fast']['latency'] == pytest.approx(0.01)
+    assert snapshot['http://slow']['latency'] == pytest.approx(1.0)
+    assert health.order(explorers) == explorers
+
+    # a failing explorer is skipped and tripped after consecutive failures
+    transport.down.add('http://fast')
+    assert client.get(addresses=explorers, endpoint='/explorer') == b'http://medium'
+    assert health.snapshot()['http://fast']['state'] == ExplorerState.CLOSED
+    assert client.get(addresses=explorers, endpoint='/explorer') == b'http://medium'
+    snapshot = health.snapshot()
+    assert snapshot['http://fast']['state'] == ExplorerState.OPEN
+    assert snapshot['http://fast']['failures'] == 2
+    assert snapshot['http://fast']['trips'] == 1
+    assert 'connection refused' in snapshot['http://fast']['last_error']
+    # a tripped explorer is no longer tried, but is kept as a last resort
+    transport.requests.clear()
+    assert client.get(addresses=explorers, endpoint='/explorer') == b'http://medium'
+    assert transport.requests == ['http://medium']
+    assert health.order(explorers) == ['http://medium', 'http://slow', 'http://fast']
+
+    # a tripped explorer is probed once the probe interval passed,
+    # a failed probe trips it again
+    clock.now += 10.0
+    transport.requests.clear()
+    assert client.get(addresses=explorers, endpoint='/explorer') == b'http://medium'
+    assert transport.requests == ['http://fast', 'http://medium']
+    assert health.snapshot()['http://fast']['trips'] == 2
+    # a successful probe closes it again
+    transport.down.clear()
+    clock.now += 10.0
+    assert client.get(addresses=explorers, endpoint='/explorer') == b'http://fast'
+    assert health.snapshot()['http://fast']['state'] == ExplorerState.CLOSED
+    assert client.get(addresses=explorers, endpoint='/explorer') == b'http://fast'
+
+    # when all explorers are down, all are tried before giving up
+    transport.down.update(explorers)
+    transport.requests.clear()
+    with pytest.raises(tfchain.errors.ExplorerNotAvailable):
+        client.get(addresses=explorers, endpoint='/explorer')
+    assert sorted(transport.requests) == sorted(explorers)
+
+
+class _SleepingTransport:
+    """
+    Transport with a fixed (real) latency per explorer.
+    """
+
+    def __init__(self, latencies):
+        self.latencies = latencies
+        self.down = set()
+
+    def get(self, url, headers=None):
+        address = url[:url.index('/', len('http://'))]
+        time.sleep(self.latencies[address])
+        if address in self.down:
+            raise HTTPError("connection refused", url=url)
+        return _FakeResponse(200, address.encode('utf-8'))
+
+
+def test_explorer_client_hedging():
+    from tfchain.health import ExplorerHealthTracker, ExplorerHedgingPolicy
+
+    explorers = ['http://fast', 'http://slow']
+    transport = _SleepingTransport({'http://fast': 0.01, 'http://slow': 0.01})
+    health = ExplorerHealthTracker()
+    hedging = ExplorerHedgingPolicy(percentile=90, min_delay=0.1, max_delay=0.2)
+    client = TFChainExplorerClient(transport=transport, health=health, hedging=hedging)
+    assert client.hedging is hedging
+
+    # requests answered in time are not hedged
+    for _ in range(5):
+        assert client.get(addresses=explorers, endpoint='/explorer') in (b'http://fast', b'http://slow')
+    address = health.order(explorers)[0]
+    assert hedging.delay(health, address) == 0.1
+    assert hedging.snapshot() == {'fired': 0, 'won': 0}
+
+    # the slow explorer becomes (much) slower
+    transport.latencies['http://slow'] = 0.5
+    transport.latencies['http://fast'] = 0.05
+
+    # while it is still preferred, the hedge fires and wins
+    client = TFChainExplorerClient(transport=transport, health=ExplorerHealthTracker(), hedging=hedging)
+    client.health.success('http://slow', 0.01)
+    client.health.success('http://fast', 0.02)
+    start = time.monotonic()
+    assert client.get(addresses=explorers, endpoint='/explorer') == b'http://fast'
+    assert time.monotonic() - start < 0.4
+    assert hedging.snapshot() == {'fired': 1, 'won': 1}
+
+    # an unavailable first explorer does not hedge, the second one is used directly
+    transport.down.add('http://slow')
+    transport.latencies['http://slow'] = 0.0
+    client.health.success('http://slow', 0.001)
+    assert client.get(addresses=explorers, endpoint='/explorer') == b'http://fast'
+    assert hedging.snapshot() == {'fired': 1, 'won': 1}
+
+
+class _ExplorerStubTransport:
+    """
+    Transport serving fixed responses per endpoint, counting the requests per endpoint.
+    """
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = {}
+
+    def get(self, url, headers=None):
+        endpoint = url[url.index('/', len('http://')):]
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        return _FakeResponse(200, self.responses[endpoint])
+
+
+def test_explorer_client_cache(tmp_path):
+    from tfchain.cache import ExplorerResponseCache, ExplorerResponseDiskStore, EndpointClass, endpoint_class_get
+
+    assert endpoint_class_get('/explorer') == EndpointClass.CHAIN
+    assert endpoint_class_get('/explorer/blocks/42') == EndpointClass.BLOCK
+    assert endpoint_class_get('/explorer/hashes/0123') == EndpointClass.HASH
+    assert endpoint_class_get('/explorer/mintcondition') == EndpointClass.MINT_CONDITION
+    assert endpoint_class_get('/explorer/mintcondition/42') == EndpointClass.MINT_CONDITION
+    assert endpoint_class_get('/explorer/3bot/1') == EndpointClass.OTHER
+
+    responses = {
+        '/explorer': b'{"height":100}',
+        '/explorer/blocks/90': b'{"block":{"height":90}}',
+        '/explorer/blocks/99': b'{"block":{"height":99}}',
+        '/explorer/hashes/01': b'{"hashtype":"unlockhash","transactions":[]}',
+        '/explorer/hashes/02': b'{"hashtype":"transactionid","transaction":{"height":50,"unconfirmed":false}}',
+        '/explorer/hashes/03': b'{"hashtype":"transactionid","transaction":{"height":0,"unconfirmed":true}}',
+        '/explorer/mintcondition': b'{"mintcondition":{"type":0}}',
+    }
+    clock = _FakeClock()
+    transport = _ExplorerStubTransport(responses)
+    cache = ExplorerResponseCache(
+        max_entries=5, ttls={EndpointClass.HASH: 5.0}, confirmation_depth=6,
+        store=ExplorerResponseDiskStore(str(tmp_path / 'responses')), clock=clock)
+    client = TFChainExplorerClient(transport=transport, cache=cache)
+    assert client.cache is cache
+
+    def get(endpoint):
+        assert client.get(addresses=['http://explorer'], endpoint=endpoint) == responses[endpoint]
+
+    # the chain height is observed from the chain info
+    get('/explorer')
+    assert cache.height == 100
+    for endpoint in responses:
+        get(endpoint)
+        get(endpoint)
+    assert transport.requests == {endpoint: 1 for endpoint in responses}
+    snapshot = cache.snapshot()
+    # the two least recently used responses were evicted
+    assert snapshot['entries'] == 5
+    assert snapshot['immutable'] == 1
+
+    # mutable responses expire
+    clock.now += 5.0
+    get('/explorer/hashes/01')
+    assert transport.requests['/explorer/hashes/01'] == 2
+    # and are invalidated when the chain height advances, unlike immutable responses
+    cache.height_observe(101)
+    for endpoint in ['/explorer/hashes/01', '/explorer/blocks/99', '/explorer/blocks/90', '/explorer/hashes/02']:
+        get(endpoint)
+    assert transport.requests['/explorer/hashes/01'] == 3
+    assert transport.requests['/explorer/blocks/99'] == 2
+    assert transport.requests['/explorer/blocks/90'] == 1
+    assert transport.requests['/explorer/hashes/02'] == 1
+    # a lower height is ignored
+    cache.height_observe(99)
+    assert cache.height == 101
+
+    # least recently used responses are evicted,
+    # immutable responses remain available from the disk store
+    cache.clear()
+    get('/explorer/blocks/90')
+    assert transport.requests['/explorer/blocks/90'] == 1
+    cache = ExplorerResponseCache(store=ExplorerResponseDiskStore(str(tmp_path / 'responses')))
+    client = TFChainExplorerClient(transport=transport, cache=cache)
+    get('/explorer/hashes/02')
+    assert transport.requests['/explorer/hashes/02'] == 1
+    get('/explorer/hashes/03')
+    assert transport.requests['/explorer/hashes/03'] == 2
+
+
+def test_explorer_client_store(tmp_path):
+    import os
+    from tfchain.chainstore import ChainStore
+
+    # bulk import the captured explorer responses of the jstests
+    path = str(tmp_path / 'chain.db')
+    store = ChainStore(path)
+    jstests = os.path.join(os.path.dirname(__file__), 'jstests')
+    assert store.import_directory(jstests) > 0
+    block = store.block_get(2662)
+    assert block['blockid'] == 'b69bc0a12308938cbc8207483f39df63a2295142875944d6a2db3930d5c2564f'
+    assert store.block_get_by_id(block['blockid']) == block
+    etxn = store.transaction_get('96df1e34533ffcd42ee1db995e165538edd275ba0c065ef9293ead84ff923eec')
+    assert etxn['height'] == 2662
+    assert etxn['coinoutputids'][0] == '90513506d1216f89e73a361b6306d8543c81aff092e376ee8d8bb9b7ea024de6'
+    assert store.transaction_get('00' * 32) is None
+    # importing again adds nothing
+    assert store.import_directory(jstests) == 0
+    height = store.height
+    store.close()
+
+    # the store is persistent, and is consulted before the explorers
+    store = ChainStore(path)
+    assert store.height == height
+    transport = _ExplorerStubTransport({
+        '/explorer': b'{"height":3010}',
+        '/explorer/blocks/3000': b'{"block":{"blockid":"' + b'01' * 32 + b'","height":3000,"rawblock":{"parentid":""},"transactions":[{"id":"' + b'02' * 32 + b'","height":3000}]}}',
+        '/explorer/blocks/3008': b'{"block":{"blockid":"' + b'04' * 32 + b'","height":3008,"rawblock":{"parentid":""},"transactions":[]}}',
+        '/explorer/hashes/' + '03' * 32: b'{"hashtype":"unlockhash","transactions":[]}',
+    })
+    client = TFChainExplorerClient(transport=transport, store=store)
+    assert client.store is store
+    for endpoint in ['/explorer/blocks/2662', '/explorer/hashes/' + block['blockid'], '/explorer/hashes/' + etxn['id']]:
+        resp = json_loads(client.get(addresses=['http://explorer'], endpoint=endpoint))
+        assert resp['block'] == block
+        if endpoint.endswith(etxn['id']):
+            assert resp['hashtype'] == 'transactionid'
+            assert resp['transaction'] == etxn
+            assert resp['unconfirmed'] is False
+    assert transport.requests == {}
+
+    # no block is stored as long as the chain height is unknown
+    client.get(addresses=['http://explorer'], endpoint='/explorer/blocks/3000')
+    assert store.block_get(3000) is None
+    # received blocks are stored once confirmed deep enough, other responses are not
+    client.get(addresses=['http://explorer'], endpoint='/explorer')
+    assert store.chain_height == 3010
+    for _ in range(2):
+        resp = json_loads(client.get(addresses=['http://explorer'], endpoint='/explorer/blocks/3000'))
+        assert resp['block']['height'] == 3000
+        resp = json_loads(client.get(addresses=['http://explorer'], endpoint='/explorer/blocks/3008'))
+        assert resp['block']['height'] == 3008
+        client.get(addresses=['http://explorer'], endpoint='/explorer/hashes/' + '03' * 32)
+    assert transport.requests == {
+        '/explorer': 1, '/explorer/blocks/3000': 2, '/explorer/blocks/3008': 2, '/explorer/hashes/' + '03' * 32: 2}
+    assert store.transaction_get('02' * 32)['height'] == 3000
+    assert store.block_get(3000)['blockid'] == '01' * 32
+    assert store.block_get(3008) is None
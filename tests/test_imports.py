@@ -0,0 +1,56 @@
+import json
+import os
+import subprocess
+import sys
+
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules which are not needed to create, encode or decode types,
+# and which are only to be imported when used (if at all)
+_UNEXPECTED_MODULES = (
+    'Jumpscale', 'nacl', 'aiohttp', 'asyncio', 'sqlite3', 'multiprocessing', 'concurrent.futures.process',
+    'orjson', 'ujson', 'http', 'email', 'ssl', 'socket', 'logging', 'subprocess', 'traceback',
+)
+# max amount of modules imported by importing the types factory (55 at the time of writing),
+# on top of the modules imported by the interpreter itself
+_MAX_NEW_MODULES = 80
+
+
+def _modules_imported(statement):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(path for path in (_ROOT, env.get('PYTHONPATH')) if path)
+    code = 'import json, sys; before = set(sys.modules); {}; print(json.dumps(sorted(set(sys.modules) - before)))'.format(statement)
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=_ROOT, env=env)
+    return json.loads(output)
+
+
+def test_import_types_factory():
+    modules = _modules_imported('import tfchain.TFChainTypeFactory')
+    assert 'tfchain.TFChainTypeFactory' in modules
+    for name in _UNEXPECTED_MODULES:
+        assert not any(module == name or module.startswith(name + '.') for module in modules), \
+            "module {} is imported by importing the types factory".format(name)
+    assert len(modules) <= _MAX_NEW_MODULES, \
+        "importing the types factory imports {} modules: {}".format(len(modules), modules)
+
+
+def test_standard_transactions_only():
+    # decoding and encoding v1 transactions does not import the other transaction families
+    txn_json = {"version": 1, "data": {"coininputs": [{"parentid": "5b907d6e4d34cdd825484d2f9f14445377fb8b4f8cab356a390a7fe4833a3085", "fulfillment": {"type": 1, "data": {"publickey": "ed25519:bd5e0e345d5939f5f9eb330084c7f0ffb8fc7fc5bdb07a94c304620eb4e2d99a", "signature": "55dace7ccbc9cdd23220a8ef3ec09e84ce5c5acc202c5f270ea0948743ebf52135f3936ef7477170b4f9e0fe141a61d8312ab31afbf926a162982247e5d2720a"}}}], "coinoutputs": [{"value": "1000000000", "condition": {"type": 1, "data": {"unlockhash": "010009a2b6a482da73204ccc586f6fab5504a1a69c0d316cdf828a476ae7c91c9137fd6f1b62bb"}}}], "minerfees": ["100000000"]}}
+    modules = _modules_imported(
+        'from tfchain.TFChainTypeFactory import TFChainTypeFactory; '
+        'txn = TFChainTypeFactory().transactions.from_json({!r}); txn.json(); txn.binary_encode(); txn.id'.format(txn_json))
+    assert 'tfchain.types.transactions.Standard' in modules
+    for name in ('tfchain.types.transactions.Minting', 'tfchain.types.transactions.ThreeBot', 'tfchain.types.transactions.ERC20',
+                 'tfchain.types.ThreeBot', 'tfchain.types.ERC20', 'ipaddress'):
+        assert name not in modules, "module {} is imported by decoding a v1 transaction".format(name)
+
+
+def test_lazy_packages():
+    modules = _modules_imported('import tfchain, tfchain.types')
+    assert not any(module.startswith('tfchain.') and module != 'tfchain.types' for module in modules), modules
+    modules = _modules_imported('import tfchain; tfchain.types.Currency(1); tfchain.errors.ExplorerError')
+    assert 'tfchain.types.PrimitiveTypes' in modules
+    assert 'tfchain.errors' in modules
+    assert 'tfchain.types.ThreeBot' not in modules
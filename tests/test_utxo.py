@@ -0,0 +1,138 @@
+from tfchain.types.ConditionTypes import UnlockHash, UnlockHashType, ConditionUnlockHash
+from tfchain.types.PrimitiveTypes import Currency, Hash
+from tfchain.TransactionFactory import TransactionFactory
+from tfchain.utxo import UTXOIndex
+from tfchain.jsutils import json_dumps
+from tfchain.crypto.utils import blake2_hash
+import pytest
+
+
+def _address(index):
+    return str(UnlockHash(type=UnlockHashType.PUBLIC_KEY, hash=bytes([index]) * 32))
+
+
+def _id(index):
+    return bytes([index]) * 32
+
+
+def _fulfillment():
+    return {'type': 1, 'data': {'publickey': 'ed25519:' + '11' * 32, 'signature': '22' * 64}}
+
+
+def test_utxo_index():
+    a, b, c = _address(1), _address(2), _address(3)
+    index = UTXOIndex()
+    assert len(index) == 0
+    assert index.height == -1
+    assert index.coin_outputs_get(a) == []
+    assert index.coin_balance_get(a).total == 0
+
+    block = {'block': {
+        'blockid': _id(100).hex(),
+        'height': 10,
+        'rawblock': {
+            'timestamp': 1550000000,
+            'minerpayouts': [{'value': '10000000000', 'unlockhash': c}],
+        },
+        'minerpayoutids': [_id(1).hex()],
+        'transactions': [{
+            'id': _id(200).hex(),
+            'rawtransaction': {'version': 1, 'data': {
+                'coininputs': [{'parentid': _id(99).hex(), 'fulfillment': _fulfillment()}],
+                'coinoutputs': [
+                    {'value': '1000000000', 'condition': {'type': 1, 'data': {'unlockhash': a}}},
+                    # locked until block height 20
+                    {'value': '2000000000', 'condition': {'type': 3, 'data': {'locktime': 20, 'condition': {'type': 1, 'data': {'unlockhash': a}}}}},
+                    # locked until a timestamp
+                    {'value': '4000000000', 'condition': {'type': 3, 'data': {'locktime': 1560000000, 'condition': {'type': 1, 'data': {'unlockhash': b}}}}},
+                ],
+                'blockstakeoutputs': [{'value': '42', 'condition': {'type': 1, 'data': {'unlockhash': b}}}],
+                'minerfees': ['100000000'],
+            }},
+            'coinoutputids': [_id(2).hex(), _id(3).hex(), _id(4).hex()],
+            'blockstakeoutputids': [_id(5).hex()],
+        }],
+    }}
+    index.block_add(json_dumps(block))
+    assert len(index) == 5
+    assert (index.height, index.timestamp) == (10, 1550000000)
+
+    balance = index.coin_balance_get(a)
+    assert (balance.spendable, balance.locked, balance.total) == (Currency(1), Currency(2), Currency(3))
+    assert index.coin_balance_get(UnlockHash.from_json(a)).total == 3
+    assert index.coin_balance_get(a, height=20).spendable == 3
+    assert index.coin_balance_get(b).locked == 4
+    assert index.coin_balance_get(b, time=1560000000).spendable == 4
+    assert index.coin_balance_get(c).spendable == 10
+    assert index.coin_balance_get(_address(4)).total == 0
+
+    assert sorted(str(co.id) for co in index.coin_outputs_get(a)) == [_id(2).hex(), _id(3).hex()]
+    assert [str(co.id) for co in index.coin_outputs_spendable_get(a)] == [_id(2).hex()]
+    assert [str(co.id) for co in index.coin_outputs_locked_get(a)] == [_id(3).hex()]
+    assert index.coin_outputs_locked_get(a, height=20) == []
+    assert index.coin_output_get(_id(2).hex()).value == 1
+    assert index.coin_output_get(Hash(value=_id(3))).value == 2
+    assert index.coin_output_get(_id(99)) is None
+
+    balance = index.blockstake_balance_get(b)
+    assert (int(balance.spendable), int(balance.locked), int(balance.total)) == (42, 0, 42)
+    assert [str(bso.id) for bso in index.blockstake_outputs_spendable_get(b)] == [_id(5).hex()]
+    assert index.blockstake_outputs_locked_get(b) == []
+    assert index.blockstake_output_get(_id(5)).value.value == 42
+
+    # the output IDs are computed when they are not part of the explorer block
+    txn = TransactionFactory().new()
+    txn.coin_input_add(parentid=_id(2), fulfillment=None)
+    txn.coin_input_add(parentid=_id(1), fulfillment=None)
+    txn.coin_output_add(value='10.9', condition=ConditionUnlockHash(unlockhash=b))
+    txn.miner_fee_add('0.1')
+    block = {'blockid': _id(101).hex(), 'height': 11, 'rawblock': {'timestamp': 1550000600},
+             'transactions': [{'id': txn.id, 'rawtransaction': txn.json()}]}
+    index.block_add(block, transactions=[txn])
+    assert (index.height, index.timestamp) == (11, 1550000600)
+    assert index.coin_output_get(_id(2)) is None
+    assert index.coin_output_get(_id(1)) is None
+    assert index.coin_outputs_get(c) == []
+    assert index.coin_balance_get(a).total == 2
+    balance = index.coin_balance_get(b)
+    assert (balance.spendable, balance.locked) == (Currency('10.9'), Currency(4))
+    assert str(index.coin_outputs_spendable_get(b)[0].id) == str(txn.coin_outputid_new(0))
+    assert len(index) == 4
+
+    # transactions can be added directly as well, spending unknown outputs is ignored
+    txn = TransactionFactory().new()
+    txn.coin_input_add(parentid=_id(3), fulfillment=None)
+    txn.coin_input_add(parentid=_id(98), fulfillment=None)
+    txn.coin_output_add(value=2, condition=ConditionUnlockHash(unlockhash=c))
+    index.transaction_add(txn)
+    assert index.coin_outputs_get(a) == []
+    assert index.coin_balance_get(c).spendable == 2
+    assert index.height == 11
+
+
+def test_utxo_index_miner_payouts():
+    a = _address(1)
+    index = UTXOIndex()
+    # the IDs of miner payouts are computed from the block ID when not part of the explorer block
+    blockid = _id(100)
+    block = {'blockid': blockid.hex(), 'height': 1, 'rawblock': {'timestamp': 1550000000, 'minerpayouts': [
+        {'value': '10000000000', 'unlockhash': a}, {'value': '100000000', 'unlockhash': a}]}, 'transactions': []}
+    index.block_add(block)
+    assert len(index) == 2
+    assert index.coin_balance_get(a).spendable == Currency('10.1')
+    assert index.coin_output_get(blake2_hash(blockid + (1).to_bytes(8, byteorder='little'))).value == Currency('0.1')
+    # and cannot be indexed without the block ID
+    del block['blockid']
+    with pytest.raises(ValueError):
+        index.block_add({'block': block})
+    assert len(index) == 2
+
+
+def test_utxo_index_output_ids():
+    # output IDs are assigned when the outputs are added, not when they are queried
+    txn = TransactionFactory().new()
+    txn.coin_output_add(value=1, condition=ConditionUnlockHash(unlockhash=_address(1)))
+    index = UTXOIndex()
+    index.transaction_add(txn)
+    assert str(txn.coin_outputs[0].id) == str(txn.coin_outputid_new(0))
+    assert index.coin_outputs_get(_address(1)) == [txn.coin_outputs[0]]
@@ -1,6 +1,5 @@
-from Jumpscale import j
-
 import hashlib
+import pytest
 from datetime import datetime, timedelta
 from tfchain.encoders import encoder_rivine_get, encoder_sia_get
 from tfchain.crypto.utils import blake2_string
@@ -119,3 +118,182 @@ def test_conditiontypes_factory():
     assert OutputLock(value='30/11/2020 23:59:59').value == 1606777199
     # seconds is optional
     assert OutputLock(value='30/11/2020 23:59').value == 1606777140
+
+
+def test_unlockhash_caching():
+    from tfchain.types.ConditionTypes import UnlockHash, UnlockHashType
+
+    s = '01e89843e4b8231a01ba18b254d530110364432aafab8206bea72e5a20eaa55f70b1ccc65e2105'
+    uh = UnlockHash.from_json(s)
+    assert str(uh) == s
+    # decoding the same string again returns the same interned instance
+    assert UnlockHash.from_json(s) is uh
+    assert uh.frozen
+    try:
+        uh.type = UnlockHashType.NIL
+        raise Exception("an interned unlock hash cannot be modified")
+    except TypeError:
+        pass
+    # neither through its hash, which is returned as a copy
+    uh.hash.value = b'\0'*32
+    assert str(uh) == s
+    assert uh.hash.value != b'\0'*32
+    assert str(UnlockHash.from_json(s).hash) == s[2:66]
+
+    # unlock hashes compare by value, with other unlock hashes and strings
+    other = UnlockHash(type=UnlockHashType.PUBLIC_KEY, hash=uh.hash.value)
+    assert not other.frozen
+    assert other == uh
+    assert other == s
+    assert hash(other) == hash(uh)
+    assert len({uh, other, s}) == 1
+
+    # modifying an unlock hash invalidates its cached string and checksum
+    other.hash = b'\x01'*32
+    assert other != uh
+    assert str(other) == '01010101010101010101010101010101010101010101010101010101010101010136f299a63a9d'
+    assert UnlockHash.from_json(str(other)) == other
+    other.type = UnlockHashType.NIL
+    other.hash = None
+    assert str(other) == '0'*78
+
+
+def test_trusted_json_decoding():
+    from tfchain.types.ConditionTypes import UnlockHash, trusted_json_decoding
+    from tfchain.types.IO import CoinOutput
+
+    conditions = ConditionFactory()
+
+    # the checksum is verified by default
+    s = '01e89843e4b8231a01ba18b254d530110364432aafab8206bea72e5a20eaa55f70b1ccc65e2105'
+    bad = s[:-12] + '000000000000'
+    with pytest.raises(ValueError):
+        UnlockHash.from_json(bad)
+    with pytest.raises(ValueError):
+        conditions.from_json({'type': 1, 'data': {'unlockhash': bad}})
+
+    # but not when decoding from a trusted source
+    with trusted_json_decoding():
+        uh = UnlockHash.from_json(bad)
+        assert UnlockHash.from_json(bad) is uh
+        assert uh.hash == UnlockHash.from_json(s).hash
+        uh.hash.value = b'\0'*32
+        assert UnlockHash.from_json(bad).hash == UnlockHash.from_json(s).hash
+    condition = conditions.from_json({'type': 3, 'data': {'locktime': 42, 'condition': {'type': 1, 'data': {'unlockhash': bad}}}}, trusted=True)
+    assert condition.unlockhash is uh
+    co = CoinOutput.from_json({'value': '1', 'condition': {'type': 1, 'data': {'unlockhash': bad}}}, trusted=True)
+    assert co.condition.unlockhash is uh
+
+    # the context only applies to what is decoded within it,
+    # and an unverified unlock hash is never returned outside of it
+    with pytest.raises(ValueError):
+        UnlockHash.from_json(bad)
+    with pytest.raises(ValueError):
+        CoinOutput.from_json({'value': '1', 'condition': {'type': 1, 'data': {'unlockhash': bad}}})
+    with trusted_json_decoding():
+        with trusted_json_decoding(False):
+            with pytest.raises(ValueError):
+                UnlockHash.from_json(bad)
+        assert UnlockHash.from_json(bad) is uh
+
+    # verified unlock hashes are used within a trusted context as well
+    verified = UnlockHash.from_json(s)
+    with trusted_json_decoding():
+        assert UnlockHash.from_json(s) is verified
+
+
+def test_binary_data():
+    # binary data is slotted and stores its value as immutable bytes
+    h = Hash(value=bytearray(32))
+    assert not hasattr(h, '__dict__')
+    assert isinstance(h.value, bytes)
+    assert isinstance(BinaryData(memoryview(b'\x01\x02')).value, bytes)
+    assert BinaryData().value == b''
+
+    # all string encodings round trip
+    for (strencoding, s) in [
+            (None, '0102ff'),
+            ('hex', '0102ff'),
+            ('hexprefix', '0x0102ff'),
+            ('base64', 'AQL/')]:
+        bd = BinaryData(b'\x01\x02\xff', strencoding=strencoding)
+        assert str(bd) == s
+        assert BinaryData.from_json(bd.json(), strencoding=strencoding) == bd
+    assert BinaryData.from_json('0X0102FF', strencoding='hexprefix').value == b'\x01\x02\xff'
+    try:
+        BinaryData(strencoding='base32')
+        raise Exception("base32 is not a supported string encoding")
+    except TypeError:
+        pass
+
+
+def test_currency():
+    from decimal import Decimal
+    from tfchain.types.PrimitiveTypes import Currency, CurrencyArray
+    from tfchain.errors import CurrencyPrecisionOverflow, CurrencyNegativeValue
+
+    # values are expressed in TFT, and stored as (integer) base units
+    for (value, units, s) in (
+            (None, 0, '0'), (0, 0, '0'), (123, 123000000000, '123'), ('1 TFT', 1000000000, '1'),
+            ('0.123456789', 123456789, '0.123456789'), ('1234.34', 1234340000000, '1234.34'),
+            ('1.0 tft', 1000000000, '1'), (Decimal('9.5'), 9500000000, '9.5')):
+        c = Currency(value=value)
+        assert int(c) == units
+        assert str(c) == s
+        assert c.value == Decimal(s)
+        assert c.json() == str(units)
+        assert Currency.from_json(c.json()) == c
+    assert repr(Currency(value='2.5')) == '2.5 TFT'
+    for value in ('0.0000000001', '-1', -1, Decimal('-0.5')):
+        with pytest.raises((CurrencyPrecisionOverflow, CurrencyNegativeValue)):
+            Currency(value=value)
+    with pytest.raises(CurrencyNegativeValue):
+        Currency.from_json('-1')
+    with pytest.raises(CurrencyPrecisionOverflow):
+        Currency.from_json('1.5')
+    with pytest.raises(TypeError):
+        Currency(value=1.5)
+
+    # arithmetic and comparisons work on the base units
+    a = Currency(value='1.5')
+    b = Currency.from_json('500000000')
+    assert a + b == 2
+    assert a - b == 1
+    assert a * 2 == 3
+    assert Currency(value=3) * Currency(value='0.000000001') == Currency.from_json('3')
+    with pytest.raises(CurrencyPrecisionOverflow):
+        Currency(value='0.00001') * Currency(value='0.00001')
+    with pytest.raises(CurrencyNegativeValue):
+        b - a
+    assert b < a and b <= a and a > b and a >= b and a != b
+    assert a == '1.5' and a == 1.5
+    c = Currency(value=1)
+    c += a
+    c -= '0.5'
+    c *= 3
+    assert c == 6
+
+    # many values can be summed at once
+    values = [Currency.from_json(str(units)) for units in range(1000)]
+    assert Currency.sum(values) == Currency.from_json(str(sum(range(1000))))
+    assert Currency.sum(['1', 2, Currency(value=3)]) == 6
+    assert Currency.sum([]) == 0
+
+    # or stored in an array, to sum, filter and compare them in bulk
+    array = CurrencyArray(values)
+    assert len(array) == 1000
+    assert Currency.sum(array) == array.sum() == Currency.sum(values)
+    assert array[10] == Currency.from_json('10')
+    assert list(array[:3]) == values[:3]
+    assert array.min() == 0 and array.max() == Currency.from_json('999')
+    mask = array.mask(minimum=Currency.from_json('10'), maximum=Currency.from_json('19'))
+    assert mask.count(True) == 10
+    assert array.filter(mask).sum() == Currency.from_json(str(sum(range(10, 20))))
+    assert array.mask(minimum=Currency.from_json('990')).count(True) == 10
+    assert array.mask(maximum=Currency.from_json('9')).count(True) == 10
+    assert CurrencyArray.from_base_units(range(5)).sum() == Currency.from_json('10')
+    array.append('1')
+    array.extend(CurrencyArray(['2']))
+    assert array[-2:].sum() == 3
+    with pytest.raises(ValueError):
+        CurrencyArray().max()
@@ -60,3 +60,104 @@ def test_fulfillments():
     test_rivine_encoded(msf, '0315030401ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff80abcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefab01ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff80abcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefab')
     assert msf.is_fulfilled(ConditionMultiSignature(min_nr_sig=1))
     assert msf.is_fulfilled(ConditionMultiSignature(min_nr_sig=2))
+
+
+def test_binary_round_trip():
+    import random
+    import pytest
+    from tfchain.types.CryptoTypes import PublicKeySpecifier
+    from tfchain.types.PrimitiveTypes import Currency, Blockstake
+    from tfchain.types.ConditionTypes import ConditionLockTime, ConditionFactory
+    from tfchain.types.FulfillmentTypes import ED25519Signature, FulfillmentSingleSignature, \
+        FulfillmentAtomicSwap, FulfillmentMultiSignature
+    from tfchain.types.IO import CoinInput, CoinOutput, BlockstakeInput, BlockstakeOutput
+    from tfchain.encoders.exceptions import DecodeError
+
+    # seeded, such that a failure can be reproduced
+    rng = random.Random(42)
+
+    def random_bytes(n):
+        return bytes(rng.getrandbits(8) for _ in range(n))
+
+    def random_unlockhash(type=None):
+        if type is None:
+            type = rng.choice([UnlockHashType.PUBLIC_KEY, UnlockHashType.ATOMIC_SWAP, UnlockHashType.MULTI_SIG])
+        return UnlockHash(type=type, hash=random_bytes(32))
+
+    def random_public_key():
+        return PublicKey(specifier=PublicKeySpecifier.ED25519, hash=random_bytes(32))
+
+    def random_condition(nested=True):
+        choices = ['nil', 'uh', 'multisig']
+        if nested:
+            choices += ['atomicswap', 'locktime']
+        choice = rng.choice(choices)
+        if choice == 'nil':
+            return ConditionNil()
+        if choice == 'uh':
+            return ConditionUnlockHash(unlockhash=random_unlockhash())
+        if choice == 'multisig':
+            n = rng.randint(1, 5)
+            return ConditionMultiSignature(
+                unlockhashes=[random_unlockhash(UnlockHashType.PUBLIC_KEY) for _ in range(n)], min_nr_sig=rng.randint(1, n))
+        if choice == 'atomicswap':
+            return ConditionAtomicSwap(sender=random_unlockhash(UnlockHashType.PUBLIC_KEY),
+                                       receiver=random_unlockhash(UnlockHashType.PUBLIC_KEY),
+                                       hashed_secret=random_bytes(32), lock_time=rng.randint(500 * 1000 * 1000, 1 << 32))
+        return ConditionLockTime(condition=random_condition(nested=False), lock=rng.randint(1, 1 << 32))
+
+    def random_fulfillment():
+        choice = rng.choice(['singlesig', 'atomicswap', 'multisig'])
+        if choice == 'singlesig':
+            return FulfillmentSingleSignature(pub_key=random_public_key(), signature=random_bytes(64))
+        if choice == 'atomicswap':
+            secret = random_bytes(32) if rng.getrandbits(1) else None
+            return FulfillmentAtomicSwap(pub_key=random_public_key(), signature=random_bytes(64), secret=secret)
+        return FulfillmentMultiSignature(pairs=[
+            (random_public_key(), random_bytes(64)) for _ in range(rng.randint(1, 5))])
+
+    def random_currency():
+        return Currency(value=rng.randint(0, 1 << 80)) * Currency(value='0.000000001')
+
+    def assert_round_trip(obj, encoding, equal=lambda a, b: a.json() == b.json()):
+        encoder = encoder_sia_get() if encoding == 'sia' else encoder_rivine_get()
+        encoder.add(obj)
+        # the encoded size is known without encoding
+        assert obj.encoded_size(encoding) == len(encoder.data)
+        decoded = type(obj).from_binary(encoder.data, encoding=encoding)
+        assert equal(decoded, obj)
+        # decoding works from a view as well, encoding the decoded object gives the same result
+        encoder_decoded = encoder_sia_get() if encoding == 'sia' else encoder_rivine_get()
+        encoder_decoded.add(type(obj).from_binary(memoryview(encoder.data), encoding=encoding))
+        assert encoder_decoded.data == encoder.data
+        # any truncation or additional data is detected
+        with pytest.raises(DecodeError):
+            type(obj).from_binary(encoder.data[:-1], encoding=encoding)
+        with pytest.raises(DecodeError):
+            type(obj).from_binary(encoder.data + b'\0', encoding=encoding)
+
+    for _ in range(100):
+        for encoding in ('sia', 'rivine'):
+            assert_round_trip(Hash(value=random_bytes(32)), encoding)
+            assert_round_trip(BinaryData(value=random_bytes(rng.randint(1, 100))), encoding)
+            assert_round_trip(ED25519Signature(value=random_bytes(64)), encoding)
+            assert_round_trip(random_currency(), encoding)
+            assert_round_trip(Blockstake(value=rng.randint(1, 1 << 64)), encoding)
+            assert_round_trip(random_unlockhash(), encoding, equal=lambda a, b: a == b)
+            assert_round_trip(random_public_key(), encoding)
+            assert_round_trip(random_condition(), encoding)
+            assert_round_trip(random_fulfillment(), encoding)
+            assert_round_trip(CoinInput(parentid=random_bytes(32), fulfillment=random_fulfillment()), encoding)
+            assert_round_trip(CoinOutput(value=random_currency(), condition=random_condition()), encoding)
+            assert_round_trip(BlockstakeInput(parentid=random_bytes(32), fulfillment=random_fulfillment()), encoding)
+            assert_round_trip(BlockstakeOutput(value=Blockstake(value=rng.randint(1, 1000)), condition=random_condition()), encoding)
+
+    # conditions and fulfillments can be decoded by their factory as well
+    condition = random_condition()
+    e = encoder_rivine_get()
+    e.add(condition)
+    assert ConditionFactory().from_binary(e.data, encoding='rivine').json() == condition.json()
+    fulfillment = random_fulfillment()
+    e = encoder_sia_get()
+    e.add(fulfillment)
+    assert FulfillmentFactory().from_binary(e.data).json() == fulfillment.json()
@@ -5,6 +5,25 @@ from tfchain.types.transactions.ThreeBot import BotTransactionBaseClass, Transac
 from tfchain.types.transactions.ERC20 import TransactionV208, TransactionV209, TransactionV210
 import tfchain.errors
 from tfchain.TransactionFactory import TransactionFactory
+from tfchain.encoders.exceptions import DecodeError
+import pytest
+
+
+def _assert_binary_round_trip(transactions, txn):
+    encoded = txn.binary_encode()
+    decoded = transactions.from_binary(encoded)
+    assert type(decoded) == type(txn)
+    assert decoded.binary_encode() == encoded
+    assert decoded.json() == txn.json()
+    assert decoded.signature_hash_get(0) == txn.signature_hash_get(0)
+    # decoding works directly on (a view of) the encoded data
+    assert type(txn).from_binary(memoryview(encoded)).binary_encode() == encoded
+    # truncated data or trailing bytes are detected
+    with pytest.raises(DecodeError):
+        transactions.from_binary(encoded[:-1])
+    with pytest.raises(DecodeError):
+        transactions.from_binary(encoded + b'\0')
+
 
 def test_transactions():
     transactions = TransactionFactory()
@@ -15,6 +34,7 @@ def test_transactions():
     # assert v1_txn.json() == v1_txn_json
     assert v1_txn.signature_hash_get(0).hex() == '8a4f0c8e4c01940f0dcc14cc8d96487fcdc1a07e6abf000a156c11fc6fd3a8d2'
     assert v1_txn.binary_encode().hex() == '01320200000000000001000000000000005b907d6e4d34cdd825484d2f9f14445377fb8b4f8cab356a390a7fe4833a3085018000000000000000656432353531390000000000000000002000000000000000bd5e0e345d5939f5f9eb330084c7f0ffb8fc7fc5bdb07a94c304620eb4e2d99a400000000000000055dace7ccbc9cdd23220a8ef3ec09e84ce5c5acc202c5f270ea0948743ebf52135f3936ef7477170b4f9e0fe141a61d8312ab31afbf926a162982247e5d2720a020000000000000004000000000000003b9aca00012100000000000000010009a2b6a482da73204ccc586f6fab5504a1a69c0d316cdf828a476ae7c91c91050000000000000002127b390001210000000000000001b81f9e02d6be3a7de8440365a7c799e07dedf2ccba26fd5476c304e036b87c1a0100000000000000782e4819d6e199856ba1bff3def5d7cc37ae2a0dabecb05359d6072156190d6801800000000000000065643235353139000000000000000000200000000000000095990ca3774de81309932302f74dfe9e540d6c29ca5cb9ee06e999ad46586737400000000000000070be2115b82a54170c94bf4788e2a6dd154a081f61e97999c2d9fcc64c41e7df2e8a8d4f82a57a04a1247b9badcb6bffbd238e9a6761dd59e5fef7ff6df0fc01010000000000000001000000000000006301210000000000000001fdf10836c119186f1d21666ae2f7dc62d6ecc46b5f41449c3ee68aea62337dad0100000000000000040000000000000005f5e100040000000000000064617461'
+    _assert_binary_round_trip(transactions, v1_txn)
     assert str(v1_txn.coin_outputid_new(0)) == '865594096bbaa36753b9ee8ca404d75bbe9563855c684e8bba827ce5eef246c4'
     assert str(v1_txn.blockstake_outputid_new(0)) == 'd471d525ce9a063e1c15998a1ab877e9682e0c822eccaf1dbd61b95d592e4a29'
 
@@ -24,6 +44,7 @@ def test_transactions():
     # assert v1_txn.json() == v1_txn_json
     assert v1_txn.signature_hash_get(0).hex() == 'ff0daecf468e009bebb87fd1eb8e9bf00573e5f20c97572d080a1b0e5b09939b'
     assert v1_txn.binary_encode().hex() == '01560100000000000001000000000000005b907d6e4d34cdd825484d2f9f14445377fb8b4f8cab356a390a7fe4833a3085018000000000000000656432353531390000000000000000002000000000000000bd5e0e345d5939f5f9eb330084c7f0ffb8fc7fc5bdb07a94c304620eb4e2d99a400000000000000055dace7ccbc9cdd23220a8ef3ec09e84ce5c5acc202c5f270ea0948743ebf52135f3936ef7477170b4f9e0fe141a61d8312ab31afbf926a162982247e5d2720a020000000000000004000000000000003b9aca00012100000000000000010009a2b6a482da73204ccc586f6fab5504a1a69c0d316cdf828a476ae7c91c91050000000000000002127b390001210000000000000001b81f9e02d6be3a7de8440365a7c799e07dedf2ccba26fd5476c304e036b87c1a000000000000000000000000000000000100000000000000040000000000000005f5e100040000000000000064617461'
+    _assert_binary_round_trip(transactions, v1_txn)
     assert str(v1_txn.coin_outputid_new(0)) == 'c60952beb5d6213f29e4af96bceed28197d00b9dcaebbd185a498ad407b489c3'
 
     # v0 Transactions are supported, but are not recommend or created by this client
@@ -33,6 +54,7 @@ def test_transactions():
     # assert v0_txn.json() == expected_v0_txn_json_as_v1
     assert v0_txn.signature_hash_get(0).hex() == 'a9115e430d3d0bbec178091abc5db00a146fe0a4e18c9c10f3f4f4e9e415be4d'
     assert v0_txn.binary_encode().hex() == '000100000000000000abcdef012345abcdef012345abcdef012345abcdef012345abcdef012345abcd013800000000000000656432353531390000000000000000002000000000000000ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff4000000000000000abcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefab02000000000000000100000000000000030142e9458e348598111b0bc19bda18e45835605db9f4620616d752220ae8605ce001000000000000000501a6a6c5584b2bfbd08738996cd7930831f958b9a5ed1595525236e861c1a0dc350100000000000000dfd23dfd23dfd23dfd23dfd23dfd23dfd23dfd23dfd23dfd23dfd23dfd23dfde013800000000000000656432353531390000000000000000002000000000000000ef1234ef1234ef1234ef1234ef1234ef1234ef1234ef1234ef1234ef1234ef12400000000000000001234def01234def01234def01234def01234def01234def01234def01234def01234def01234def01234def01234def01234def01234def01234def01234def02000000000000000100000000000000040142e9458e348598111b0bc19bda18e45835605db9f4620616d752220ae8605ce001000000000000000201a6a6c5584b2bfbd08738996cd7930831f958b9a5ed1595525236e861c1a0dc350300000000000000010000000000000001010000000000000002010000000000000003040000000000000064617461'
+    _assert_binary_round_trip(transactions, v0_txn)
     assert str(v0_txn.coin_outputid_new(0)) == 'c527714a30000defabad230e81109ec1826aca3868092cc49164f31f0c7baf12'
     assert str(v0_txn.blockstake_outputid_new(0)) == 'b4c7dbb77034cfd91c3ec9bbc9b38c8ff4f31d72aee93118496a66e910e54358'
 
@@ -43,6 +65,7 @@ def test_transactions():
     # assert v0_txn.json() == expected_v0_txn_json_as_v1
     assert v0_txn.signature_hash_get(0).hex() == 'e913e88d7c698ccc27ba130cf702cdb153e3088f403f8448cd16d121661942e5'
     assert v0_txn.binary_encode().hex() == '000100000000000000abcdef012345abcdef012345abcdef012345abcdef012345abcdef012345abcd013800000000000000656432353531390000000000000000002000000000000000ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff4000000000000000abcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefab02000000000000000100000000000000030142e9458e348598111b0bc19bda18e45835605db9f4620616d752220ae8605ce001000000000000000501a6a6c5584b2bfbd08738996cd7930831f958b9a5ed1595525236e861c1a0dc35000000000000000000000000000000000300000000000000010000000000000001010000000000000002010000000000000003040000000000000064617461'
+    _assert_binary_round_trip(transactions, v0_txn)
     assert str(v0_txn.coin_outputid_new(0)) == 'bf7706e06fcbace4d2c2b69015619094009aa2bf722e7db3cb3187e499f0f951'
 
     # Coin Creation Transactions
@@ -53,6 +76,7 @@ def test_transactions():
     # assert v128_txn.json() == v128_txn_json
     assert v128_txn.signature_hash_get(0).hex() == 'c0b865dd6980f377c9bc6fb195bca3cf169ea06e6bc658b29639bdb6fc387f8d'
     assert v128_txn.binary_encode().hex() == '801680223bcbcdd9e5018000000000000000656432353531390000000000000000002000000000000000d285f92d6d449d9abb27f4c6cf82713cec0696d62b8c123f1627e054dc6d77804000000000000000bdf023fbe7e0efec584d254b111655e1c2f81b9488943c3a712b91d9ad3a140cb0949a8868c5f72e08ccded337b79479114bdb4ed05f94dfddb359e1a612460201210000000000000001e78fd5af261e49643dba489b29566db53fa6e195fa0e6aad4430d4f06ce88b73010000000000000004000000000000003b9aca00180000000000000061206d696e74657220646566696e6974696f6e2074657374'
+    _assert_binary_round_trip(transactions, v128_txn)
 
     # v129 Transactions are supported
     v129_txn_json = {"version":129,"data":{"nonce":"1oQFzIwsLs8=","mintfulfillment":{"type":1,"data":{"publickey":"ed25519:d285f92d6d449d9abb27f4c6cf82713cec0696d62b8c123f1627e054dc6d7780","signature":"ad59389329ed01c5ee14ce25ae38634c2b3ef694a2bdfa714f73b175f979ba6613025f9123d68c0f11e8f0a7114833c0aab4c8596d4c31671ec8a73923f02305"}},"coinoutputs":[{"value":"500000000000000","condition":{"type":1,"data":{"unlockhash":"01e3cbc41bd3cdfec9e01a6be46a35099ba0e1e1b793904fce6aa5a444496c6d815f5e3e981ccf"}}}],"minerfees":["1000000000"],"arbitrarydata":"dGVzdC4uLiAxLCAyLi4uIDM="}}
@@ -60,6 +84,7 @@ def test_transactions():
     # assert v129_txn.json() == v129_txn_json
     assert v129_txn.signature_hash_get(0).hex() == '984ccc3da2107e86f67ef618886f9144040d84d9f65f617c64fa34de68c0018b'
     assert v129_txn.binary_encode().hex() == '81d68405cc8c2c2ecf018000000000000000656432353531390000000000000000002000000000000000d285f92d6d449d9abb27f4c6cf82713cec0696d62b8c123f1627e054dc6d77804000000000000000ad59389329ed01c5ee14ce25ae38634c2b3ef694a2bdfa714f73b175f979ba6613025f9123d68c0f11e8f0a7114833c0aab4c8596d4c31671ec8a73923f023050100000000000000070000000000000001c6bf5263400001210000000000000001e3cbc41bd3cdfec9e01a6be46a35099ba0e1e1b793904fce6aa5a444496c6d81010000000000000004000000000000003b9aca001100000000000000746573742e2e2e20312c20322e2e2e2033'
+    _assert_binary_round_trip(transactions, v129_txn)
     assert str(v129_txn.coin_outputid_new(0)) == 'f4b8569f430a29af187a8b97e78167b63895c51339255ea5198a35f4b162b4c6'
 
     # 3Bot Transactions
@@ -70,6 +95,7 @@ def test_transactions():
     # assert v144_txn.json() == v144_txn_json
     assert v144_txn.signature_hash_get(BotTransactionBaseClass.SPECIFIER_SENDER).hex() == 'f9204641c6a945af6d262154f3d1dfa82aa291c4fc4000936ee72fc3506cfd2c'
     assert v144_txn.binary_encode().hex() == '90e112115bc6aec02c6578616d706c652e6f72671e63686174626f742e6578616d706c65083b9aca0002a3c8f44d64c0636018a929d2caeec09fb9698bfdcbfa3a8225585a51e09ee56301c401d285f92d6d449d9abb27f4c6cf82713cec0696d62b8c123f1627e054dc6d778080909a7df820ec3cee1c99bd2c297b938f830da891439ef7d78452e29efb0c7e593683274c356f72d3b627c2954a24b2bc2276fed47b24cd62816c540c88f13d051001634560d9784e00014201b49da2ff193f46ee0fc684d7a6121a8b8e324144dffc7327471a4da79f1730960100bde9571b30e1742c41fcca8c730183402d967df5b17b5f4ced22c67780661498e71668dfe7726a357039d7c0e871b6c0ca8fa49dc1fcdccb5f23f5f0a5cab95cfcfd72a9fd2c5045ba899ecb0207ff01125a0151f3e35e3c6e13a7538b340a'
+    _assert_binary_round_trip(transactions, v144_txn)
     # ensure no constants are mutated
     assert BotTransactionBaseClass.BOT_FEE_REGISTRATION == 90
     assert v144_txn.required_bot_fees == '100 TFT'
@@ -81,6 +107,7 @@ def test_transactions():
     # assert v145_txn.json() == v145_txn_json
     assert v145_txn.signature_hash_get(BotTransactionBaseClass.SPECIFIER_SENDER).hex() == '3d86ed117c97718a9d0d644188e019b4fa55ec22f2c32c187d223d4e73a1ab72'
     assert v145_txn.binary_encode().hex() == '9103000000e4122c6578616d706c652e636f6d117f0000012c6578616d706c652e6f72671226676976656d652e796f7572666565646261636b207468697369732e616e6578616d706c651e63686174626f742e6578616d706c65083b9aca000281a0c1f3094b99b0858da8ebc95b52f2c3593ea399d7b72a66a930521aae61bb01c401880ee50bd7efa4c8b2b5949688a09818a652727fd3c0cb406013be442df68b3480d612b679377298e6ccb8a877f7a129d34c65b8850cff1806b9f62d392b6ab173020c3698658275c748047642f8012a4ac75ea23e319bcc405c9d7f2b462b6a0b10016344524cdf6a00014201972837ee396f22f96846a0c700f9cf7c8fa83ab4110da91a1c7d02f94f28ff0380f76e7ed808a9efe405804109d5e3c8695daf8b9bc7abf1e471fef94b3c4d36789b460f9e45cdf27d83d270b0836fef56bd499e1be8e1f279d367e961bbe62f03'
+    _assert_binary_round_trip(transactions, v145_txn)
     # ensure no constants are mutated
     assert BotTransactionBaseClass.BOT_FEE_NETWORK_ADDRESS_UPDATE == 20
     assert BotTransactionBaseClass.BOT_FEE_ADDITIONAL_NAME == 50
@@ -98,6 +125,7 @@ def test_transactions():
     assert v146_txn.signature_hash_get(BotTransactionBaseClass.SPECIFIER_SENDER).hex() == 'ade263bfbc693e95463f19c201dd672bbd2616412362217c70317dfb42ab73cb'
     assert v146_txn.signature_hash_get(BotTransactionBaseClass.SPECIFIER_RECEIVER).hex() == '36445975184c68e13f8b74e2e87dd72f23cb47ff3bd4f22e80c4654ec63015d9'
     assert v146_txn.binary_encode().hex() == '920100000080f1c6109c685c7452efaf20cec6b170817f1faeb6f0a4ff49a7a0872343e62810f51dee051d8eb7883fb0ad7a848aa5bf18b8bd30fe109daa04f13e7d76af750a0200000080ae9dc9fa308e76de123b5f889fed93d6d9a701dc8d5369787dc25095f3d6eb833f6d47302697d2da22e05854d08f26d723463f328cc6ec445529cff583903308111c68656c6c6f2e7468726565626f74083b9aca0002572635ceed12c61cd78e97391c75fefb01cc969211aa827de4c44eb66285a37c01c4013079d97d169f96b996ff87677483bb601150c1bae8b1061ecbb137b9597d7cb98088e8c0d168ac60c1c6b47caad1bf660192064f2cd74ea38def15ff91d50e50b9bf2046c70c363d2ba152c51fcdaa017a27ab26a75bca76252df852785dd470071001633fdc441710000142014195d5ada0434d0766bf9e3d9b87d2f63ef7b1820739cff88335d45cbae2dac5'
+    _assert_binary_round_trip(transactions, v146_txn)
     # ensure no constants are mutated
     assert BotTransactionBaseClass.BOT_FEE_ADDITIONAL_NAME == 50
     assert v146_txn.required_bot_fees == '50 TFT'
@@ -129,6 +157,7 @@ def test_transactions():
     assert v208_txn.signature_hash_get(0).hex() == 'c7b48b96e24b73a341903b1bb2e838ae7abb969ec645e55241e51d6379da3763'
     assert v208_txn.signature_hash_get(1).hex() == '09dd543df119633addb9ed6753924b451dc498d2ad958476eeae9c70841b2839'
     assert v208_txn.binary_encode().hex() == 'd01255abe9f2bf09f8e6c748e3819ac9f2dbf843c40a2e90edd000083b9aca00029c61ec964105ec48bc95ffc0ac820ada600a2914a8dd4ef511ed7f218a3bf46901c4017469d51063cdb690cc8025db7d28faadc71ff69f7c372779bf3a1e801a923e0280a0c683e8728710b4d3cd7eed4e1bd38a4be8145a2cf91b875986870aa98c6265d76cbb637d78500010e3ab1b651e31ab26b05de79938d7d0aee01f8566d08b090110016344fe5cb488000142011c17aaf2d54f63644f9ce91c06ff984182483d1b943e96b5e77cc36fdb887c84'
+    _assert_binary_round_trip(transactions, v208_txn)
     # the coin outputs contains the refund coin output
     assert len(v208_txn.coin_outputs) == 1
     assert v208_txn.coin_outputs[0].condition.unlockhash == '011c17aaf2d54f63644f9ce91c06ff984182483d1b943e96b5e77cc36fdb887c846b60460bceb0'
@@ -140,6 +169,7 @@ def test_transactions():
     assert v209_txn.json() == v209_txn_json
     assert v209_txn.signature_hash_get(42).hex() == 'dacb89c4b44d542e415d517f745ce51f56dab76d1062fa6da691b9a9fa8efa11'
     assert v209_txn.binary_encode().hex() == 'd101f68299b26a89efdb4351a61c3a062321d23edbc1399c8499947c1313375609ad0a174876e800083b9aca00f3c001075d527bea48f087cbfaa7c4950beaf9a2ad66bf787760d751c7bcf6bd3322e1d8cc985cc4f26ace9e4468612c50a05516161a3362c941955d34f91c85'
+    _assert_binary_round_trip(transactions, v209_txn)
     # the coin outputs contains the received value
     assert len(v209_txn.coin_outputs) == 1
     assert v209_txn.coin_outputs[0].condition.unlockhash == '01f68299b26a89efdb4351a61c3a062321d23edbc1399c8499947c1313375609adbbcd3977363c'
@@ -152,7 +182,536 @@ def test_transactions():
     assert v210_txn.signature_hash_get(0).hex() == 'd6ccdb92956034f981182f5a311c84b45b01c30967327aaf9847b6fc04ba5e14'
     assert v210_txn.signature_hash_get(1).hex() == 'd7172f55e756232bb38b11a47466062f3b26330d87d291c7049658fedb819cca'
     assert v210_txn.binary_encode().hex() == 'd201a271b9d4c1258f070e1e8d95250e6d29f683649829c2227564edd5ddeb75819d80fe13823a96928a573f20a63f3b8d3cde08c506fa535d458120fdaa5f1c78f6939c81bf91e53393130fbfee32ff4e9cb6022f14ae7750d126a7b6c0202c674b020a02540be400083b9aca0002a3c8f44d64c0636018a929d2caeec09fb9698bfdcbfa3a8225585a51e09ee56301c401d285f92d6d449d9abb27f4c6cf82713cec0696d62b8c123f1627e054dc6d7780804fe14adcbded85476680bfd4fa8ff35d51ac34bb8a9b3f4904eac6eee4f53e19b6a39c698463499b9961524f026db2fb5c8173307f483c6458d401ecec2e7a0c01100163457821ef3600014201370af706b547dd4e562a047e6265d7e7750771f9bff633b1a12dbd59b11712c6'
+    _assert_binary_round_trip(transactions, v210_txn)
     # the coin outputs contains the refund coin output
     assert len(v210_txn.coin_outputs) == 1
     assert v210_txn.coin_outputs[0].condition.unlockhash == '01370af706b547dd4e562a047e6265d7e7750771f9bff633b1a12dbd59b11712c6ef65edb1690d'
     assert v210_txn.coin_outputs[0].value == 99999999
+
+
+def test_signature_hash_context():
+    from tfchain.types.transactions.Base import SignatureHashContext, InputSignatureHashFactory
+    from tfchain.types.FulfillmentTypes import signature_hash_batch
+    import contextlib
+    from tfchain.types.CryptoTypes import PublicKey, PublicKeySpecifier
+    from tfchain.types.ConditionTypes import ConditionUnlockHash
+    from tfchain.types.IO import CoinOutput
+
+    transactions = TransactionFactory()
+
+    # create a v1 transaction with multiple inputs, each owned by a different wallet
+    txn = transactions.new()
+    public_keys = []
+    for index in range(5):
+        pk = PublicKey(specifier=PublicKeySpecifier.ED25519, hash=bytes([index+1])*32)
+        public_keys.append(pk)
+        parent_output = CoinOutput(value=index+1, condition=ConditionUnlockHash(unlockhash=pk.unlockhash))
+        txn.coin_input_add(parentid=bytes([index])*32, fulfillment=None, parent_output=parent_output)
+    txn.coin_output_add(value=14, condition=ConditionUnlockHash(unlockhash=public_keys[0].unlockhash))
+    txn.miner_fee_add(1)
+    txn.data = b'consolidation'
+
+    # the context produces the same signature hashes as the transaction itself, within a batch or not
+    context = SignatureHashContext(txn)
+    for batch in (False, True):
+        with signature_hash_batch() if batch else contextlib.nullcontext():
+            for index in range(5):
+                assert context.signature_hash_get(index) == txn.signature_hash_get(index)
+                assert InputSignatureHashFactory(txn, index, context=context).signature_hash_new() == txn.signature_hash_get(index)
+            assert context.signature_hash_get(1, public_keys[1]) == txn.signature_hash_get(1, public_keys[1])
+
+    # signature requests use a shared context automatically
+    requests = txn.signature_requests_new()
+    assert len(requests) == 5
+    for index, request in enumerate(requests):
+        assert request.input_hash_new(public_keys[index]).value == txn.signature_hash_get(index)
+
+    # within a batch the data shared by the signature hashes is encoded only once
+    parts_get = txn._signature_hash_input_parts_get
+    prepared = []
+    def counting_parts_get():
+        prepared.append(True)
+        return parts_get()
+    txn._signature_hash_input_parts_get = counting_parts_get
+    with signature_hash_batch():
+        with signature_hash_batch():
+            for index, request in enumerate(requests):
+                request.input_hash_new(public_keys[index])
+        assert len(prepared) == 1
+        # ... unless the transaction is modified using its attributes or methods
+        txn.miner_fee_add(2)
+        assert context.signature_hash_get(0) == txn.signature_hash_get(0)
+        assert len(prepared) == 2
+    # ... and encoded again for every new batch
+    with signature_hash_batch():
+        assert context.signature_hash_get(0) == txn.signature_hash_get(0)
+    assert len(prepared) == 3
+    del txn._signature_hash_input_parts_get
+
+    # adding a signature does not modify the signature hash input
+    count = txn._modification_count
+    requests[0].signature_fulfill(public_key=public_keys[0], signature=bytes(64))
+    assert txn._modification_count == count
+
+    # outside of a batch nested objects modified in place are taken into account as well,
+    # also by the signature requests created before the transaction was modified
+    with signature_hash_batch():
+        assert context.signature_hash_get(0) == txn.signature_hash_get(0)
+    txn.coin_outputs[0].value = 13
+    assert context.signature_hash_get(0) == txn.signature_hash_get(0)
+    for index, request in enumerate(requests):
+        assert request.input_hash_new(public_keys[index]).value == txn.signature_hash_get(index)
+
+    # legacy transactions are supported as well
+    v0_txn_json = {"version":0,"data":{"coininputs":[{"parentid":"abcdef012345abcdef012345abcdef012345abcdef012345abcdef012345abcd","unlocker":{"type":1,"condition":{"publickey":"ed25519:ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff"},"fulfillment":{"signature":"abcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefab"}}}],"coinoutputs":[{"value":"3","unlockhash":"0142e9458e348598111b0bc19bda18e45835605db9f4620616d752220ae8605ce0df815fd7570e"},{"value":"5","unlockhash":"01a6a6c5584b2bfbd08738996cd7930831f958b9a5ed1595525236e861c1a0dc353bdcf54be7d8"}],"minerfees":["1","2","3"],"arbitrarydata":"ZGF0YQ=="}}
+    v0_txn = transactions.from_json(v0_txn_json)
+    assert SignatureHashContext(v0_txn).signature_hash_get(0).hex() == 'e913e88d7c698ccc27ba130cf702cdb153e3088f403f8448cd16d121661942e5'
+
+    # transactions that do not split their signature hash input fall back to the full encoding
+    v128_txn = transactions.mint_definition_new()
+    assert SignatureHashContext(v128_txn).signature_hash_get(0) == v128_txn.signature_hash_get(0)
+
+
+def test_streamed_hashes():
+    from tfchain.crypto.utils import blake2_hash
+    from tfchain.types.CryptoTypes import PublicKey, PublicKeySpecifier
+    from tfchain.types.ConditionTypes import ConditionUnlockHash
+    from tfchain.types.IO import CoinOutput
+
+    transactions = TransactionFactory()
+
+    def outputid_compute(txn, index):
+        # output IDs are computed from the entire binary encoding
+        return blake2_hash(txn._coin_outputid_specifier, txn._id_input_compute(), index.to_bytes(8, byteorder='little'))
+
+    # a payout, of which the encoding is written in multiple chunks to the hasher
+    txn = transactions.new()
+    pk = PublicKey(specifier=PublicKeySpecifier.ED25519, hash=bytes(32))
+    txn.coin_input_add(
+        parentid=bytes(32), fulfillment=None,
+        parent_output=CoinOutput(value=2000*42+1, condition=ConditionUnlockHash(unlockhash=pk.unlockhash)))
+    for index in range(2000):
+        uh = PublicKey(specifier=PublicKeySpecifier.ED25519, hash=index.to_bytes(32, byteorder='little')).unlockhash
+        txn.coin_output_add(value=42, condition=ConditionUnlockHash(unlockhash=uh))
+    txn.miner_fee_add(1)
+    assert len(txn.binary_encode()) > 65536
+    assert txn.signature_hash_get(0) == blake2_hash(txn._signature_hash_input_get(0))
+    for index in (0, 1999):
+        assert txn.coin_outputid_new(index).value == outputid_compute(txn, index)
+
+    # legacy transactions, and transactions hashing their ID input as a whole, are supported as well
+    v0_txn_json = {"version":0,"data":{"coininputs":[{"parentid":"abcdef012345abcdef012345abcdef012345abcdef012345abcdef012345abcd","unlocker":{"type":1,"condition":{"publickey":"ed25519:ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff"},"fulfillment":{"signature":"abcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefab"}}}],"coinoutputs":[{"value":"3","unlockhash":"0142e9458e348598111b0bc19bda18e45835605db9f4620616d752220ae8605ce0df815fd7570e"},{"value":"5","unlockhash":"01a6a6c5584b2bfbd08738996cd7930831f958b9a5ed1595525236e861c1a0dc353bdcf54be7d8"}],"minerfees":["1","2","3"],"arbitrarydata":"ZGF0YQ=="}}
+    v0_txn = transactions.from_json(v0_txn_json)
+    v129_txn = transactions.mint_coin_creation_new()
+    v129_txn.coin_output_add(value=3, condition=ConditionUnlockHash(unlockhash=pk.unlockhash))
+    for txn in (v0_txn, v129_txn):
+        assert txn.signature_hash_get(0) == blake2_hash(txn._signature_hash_input_get(0))
+        assert txn.coin_outputid_new(0).value == outputid_compute(txn, 0)
+
+
+def test_outputids():
+    from tfchain.crypto.utils import blake2_hash
+    from tfchain.types.CryptoTypes import PublicKey, PublicKeySpecifier
+    from tfchain.types.ConditionTypes import ConditionUnlockHash
+    from tfchain.types.IO import CoinOutput
+
+    transactions = TransactionFactory()
+
+    def outputid_compute(txn, specifier, index):
+        return blake2_hash(specifier, txn.binary_encode(), index.to_bytes(8, byteorder='little'))
+
+    def assert_outputids(txn):
+        coin_outputids = txn.coin_outputids()
+        assert len(coin_outputids) == len(txn.coin_outputs)
+        for (index, id) in enumerate(coin_outputids):
+            assert id.value == outputid_compute(txn, txn._coin_outputid_specifier, index)
+            assert txn.coin_outputid_new(index) == id
+        blockstake_outputids = txn.blockstake_outputids()
+        assert len(blockstake_outputids) == len(txn.blockstake_outputs)
+        for (index, id) in enumerate(blockstake_outputids):
+            assert id.value == outputid_compute(txn, txn._blockstake_outputid_specifier, index)
+            assert txn.blockstake_outputid_new(index) == id
+
+    pk = PublicKey(specifier=PublicKeySpecifier.ED25519, hash=bytes(32))
+    condition = ConditionUnlockHash(unlockhash=pk.unlockhash)
+    txn = transactions.new()
+    txn.coin_input_add(parentid=bytes(32), fulfillment=None, parent_output=CoinOutput(value=100, condition=condition))
+    for value in range(1, 4):
+        txn.coin_output_add(value=value, condition=condition)
+    txn.blockstake_output_add(value=1, condition=condition)
+    txn.miner_fee_add(1)
+    assert_outputids(txn)
+
+    # the IDs are cached, until the transaction is modified
+    ids = txn.coin_outputids()
+    assert txn.coin_outputids() == ids
+    txn.coin_output_add(value=4, condition=condition)
+    assert_outputids(txn)
+    assert txn.coin_outputids()[:3] != ids
+    ids = txn.coin_outputids()
+    txn.data = b'payout'
+    assert txn.coin_outputids() != ids
+    assert_outputids(txn)
+    ids = txn.coin_outputids()
+    txn.miner_fee_add(2)
+    assert txn.coin_outputids() != ids
+    assert_outputids(txn)
+
+    # signatures are part of the encoding as well
+    ids = txn.coin_outputids()
+    requests = txn.signature_requests_new()
+    assert len(requests) == 1
+    requests[0].signature_fulfill(public_key=pk, signature=bytes(range(64)))
+    assert txn.coin_outputids() != ids
+    assert_outputids(txn)
+
+    # the (binary) height or status of a transaction are not part of its encoding
+    ids = txn.coin_outputids()
+    txn.height = 42
+    txn.unconfirmed = True
+    assert txn.coin_outputids() == ids
+
+    # out of range indices are refused
+    with pytest.raises(ValueError):
+        txn.coin_outputid_new(4)
+    with pytest.raises(ValueError):
+        txn.blockstake_outputid_new(1)
+
+    # other versions, including legacy transactions, use their own ID input
+    v0_txn_json = {"version":0,"data":{"coininputs":[{"parentid":"abcdef012345abcdef012345abcdef012345abcdef012345abcdef012345abcd","unlocker":{"type":1,"condition":{"publickey":"ed25519:ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff"},"fulfillment":{"signature":"abcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefabcdefab"}}}],"coinoutputs":[{"value":"3","unlockhash":"0142e9458e348598111b0bc19bda18e45835605db9f4620616d752220ae8605ce0df815fd7570e"},{"value":"5","unlockhash":"01a6a6c5584b2bfbd08738996cd7930831f958b9a5ed1595525236e861c1a0dc353bdcf54be7d8"}],"minerfees":["1","2","3"],"arbitrarydata":"ZGF0YQ=="}}
+    assert_outputids(transactions.from_json(v0_txn_json))
+    v129_txn = transactions.mint_coin_creation_new()
+    v129_txn.coin_output_add(value=3, condition=condition)
+    v129_txn.coin_output_add(value=5, condition=condition)
+    ids = v129_txn.coin_outputids()
+    assert [id.value for id in ids] == [
+        blake2_hash(v129_txn._coin_outputid_specifier, v129_txn._id_input_compute(), index.to_bytes(8, byteorder='little'))
+        for index in range(2)]
+
+
+def test_transaction_id():
+    from tfchain.types.CryptoTypes import PublicKey, PublicKeySpecifier
+    from tfchain.types.ConditionTypes import ConditionUnlockHash
+    from tfchain.types.IO import CoinOutput
+
+    transactions = TransactionFactory()
+
+    # the ID is computed from the encoding, as done by the network (IDs as reported by the explorer)
+    v0_txn_json = {"version":0,"data":{"coininputs":[{"parentid":"c1df239aba64ca0c6a241ddf18f3dd18b75e2c650874dd4c8c7dbbb56bd73683","unlocker":{"type":1,"condition":{"publickey":"ed25519:25b6aae78d545d64746f4a7310230e7b7bce263dcaa9dd5b3b6dd614d0f46413"},"fulfillment":{"signature":"7453f27cca1381f0cc05a6142b8d4ded5c1f84132742ba359df99ea7c17b2f304f8b9c8f3722da9ceb632fb7f526c8022c71e385bb75df9542cf94a7f3f3cc06"}}}],"coinoutputs":[{"value":"1000000000000000","unlockhash":"0199f4f21fc13ceb22da91d4b1701e67556a7c23f118bc5b1b15b132433d07b2496e093c4f4cd6"},{"value":"88839999200000000","unlockhash":"0175c11c8124e325cdba4f6843e917ba90519e9580adde5b10de5a7cabcc3251292194c5a0e6d2"}],"minerfees":["100000000"]}}
+    assert transactions.from_json(v0_txn_json).id == '96df1e34533ffcd42ee1db995e165538edd275ba0c065ef9293ead84ff923eec'
+    v1_txn_json = {"version":1,"data":{"coininputs":[{"parentid":"0846ce4e40bd153f4b24c1131908ba87e2c99d78615c16eaac846cb3ca033562","fulfillment":{"type":1,"data":{"publickey":"ed25519:89ba466d80af1b453a435175dbba6da7718e9cb19c64c0ed41fca3e6982e3636","signature":"90e6d2c8bb8d5ba7d5edcf38cf87d7ce1ec9d936b6939c05571f5317fd83ba495f895adc8695eedd35087c08f780eff05a74240bf1245eac920971c604892802"}}}],"coinoutputs":[{"value":"1000000000","condition":{}}],"minerfees":["1000000000"]}}
+    txn = transactions.from_json(v1_txn_json)
+    assert txn.id == '040e33a58c70e3f912b0851650ba6708c6e167b05bbe1f15fc5e870e46de435a'
+    # the ID is computed only once
+    assert txn._id_cache['transaction'] is not None
+    assert txn.id == '040e33a58c70e3f912b0851650ba6708c6e167b05bbe1f15fc5e870e46de435a'
+
+    # an assigned ID is used as is
+    txn.id = '11' * 32
+    assert txn.id == '11' * 32
+    txn.id = None
+    assert txn.id == '040e33a58c70e3f912b0851650ba6708c6e167b05bbe1f15fc5e870e46de435a'
+
+    # the (computed or assigned) ID is reset when the transaction is modified
+    pk = PublicKey(specifier=PublicKeySpecifier.ED25519, hash=bytes(32))
+    condition = ConditionUnlockHash(unlockhash=pk.unlockhash)
+    txn.id = '11' * 32
+    txn.height = 42
+    txn.unconfirmed = True
+    assert txn.id == '11' * 32
+    ids = set()
+    for modify in (
+            lambda txn: txn.coin_output_add(value=1, condition=condition),
+            lambda txn: txn.coin_input_add(parentid=bytes(32), fulfillment=None, parent_output=CoinOutput(value=1, condition=condition)),
+            lambda txn: txn.blockstake_output_add(value=1, condition=condition),
+            lambda txn: txn.miner_fee_add(1),
+            lambda txn: setattr(txn, 'data', b'data'),
+            lambda txn: setattr(txn, 'coin_outputs', [])):
+        id = txn.id
+        modify(txn)
+        assert txn.id != id
+        assert txn.id == str(txn._id_compute())
+        ids.add(txn.id)
+    assert len(ids) == 6
+
+    # including signing through its signature requests
+    id = txn.id
+    request = [request for request in txn.signature_requests_new() if request.wallet_address == str(pk.unlockhash)][0]
+    request.signature_fulfill(public_key=pk, signature=bytes(range(64)))
+    assert txn.id != id
+
+    # transactions are hashed and compared by their ID
+    other = transactions.from_json(txn.json())
+    assert other.id == txn.id
+    assert hash(other) == hash(txn)
+    assert other == txn
+    assert other != transactions.from_json(v1_txn_json)
+
+    # only an assigned ID is part of the string representation
+    txn = transactions.from_json(v1_txn_json)
+    assert str(txn) == "transaction v1"
+    txn.id = '11' * 32
+    assert str(txn) == "transaction v1 {}".format('11' * 32)
+
+    # nested objects modified in place do not reset the cached ID,
+    # assigning the modified attribute to the transaction again does
+    txn = transactions.from_json(v1_txn_json)
+    original = transactions.from_json(v1_txn_json)
+    id = txn.id
+    assert txn == original
+    txn.coin_outputs[0].value = 2
+    assert txn.id == id
+    assert txn.id != str(txn._id_compute())
+    # ... while hashing and comparing use the current content
+    assert hash(txn) == hash(transactions.from_json(txn.json()))
+    assert txn != original
+    assert txn not in {original}
+    txn.coin_outputs = txn.coin_outputs
+    assert txn.id != id
+    assert txn.id == str(txn._id_compute())
+    assert hash(txn) == hash(txn.id)
+
+
+def test_lazy_transaction():
+    from tfchain.jsutils import json_dumps, json_loads, json_backend_get, json_backend_set
+    from tfchain.types.PrimitiveTypes import Currency
+
+    transactions = TransactionFactory()
+
+    # JSON can be decoded using any of the supported backends
+    backend = json_backend_get()
+    try:
+        for name in ('json', None):
+            json_backend_set(name)
+            assert json_loads('{"value":"1"}') == {'value': '1'}
+            assert json_loads(b'{"value":18446744073709551616}') == {'value': 18446744073709551616}
+            with pytest.raises(ValueError):
+                json_loads('{"value":')
+        with pytest.raises(ValueError):
+            json_backend_set('simplejson')
+    finally:
+        json_backend_set(backend)
+
+    v1_txn_json = {"version":1,"data":{"coininputs":[{"parentid":"0846ce4e40bd153f4b24c1131908ba87e2c99d78615c16eaac846cb3ca033562","fulfillment":{"type":1,"data":{"publickey":"ed25519:89ba466d80af1b453a435175dbba6da7718e9cb19c64c0ed41fca3e6982e3636","signature":"90e6d2c8bb8d5ba7d5edcf38cf87d7ce1ec9d936b6939c05571f5317fd83ba495f895adc8695eedd35087c08f780eff05a74240bf1245eac920971c604892802"}}}],"coinoutputs":[{"value":"1000000000","condition":{}},{"value":"2000000000","condition":{"type":1,"data":{"unlockhash":"010009a2b6a482da73204ccc586f6fab5504a1a69c0d316cdf828a476ae7c91c9137fd6f1b62bb"}}},{"value":"3000000000","condition":{"type":3,"data":{"locktime":42,"condition":{"type":1,"data":{"unlockhash":"01b81f9e02d6be3a7de8440365a7c799e07dedf2ccba26fd5476c304e036b87c1ab716558ce816"}}}}}],"minerfees":["1000000000"]}}
+    addresses = [
+        '000000000000000000000000000000000000000000000000000000000000000000000000000000',
+        '010009a2b6a482da73204ccc586f6fab5504a1a69c0d316cdf828a476ae7c91c9137fd6f1b62bb',
+        '01b81f9e02d6be3a7de8440365a7c799e07dedf2ccba26fd5476c304e036b87c1ab716558ce816',
+    ]
+
+    # outputs and fees are read without decoding the transaction
+    lazy = transactions.from_json_lazy(json_dumps(v1_txn_json))
+    assert lazy.version == TransactionVersion.STANDARD
+    assert lazy.coin_output_addresses == addresses
+    assert list(lazy.coin_output_values) == [Currency(value=1), Currency(value=2), Currency(value=3)]
+    assert lazy.coin_output_values.sum() == Currency(value=6)
+    assert lazy.miner_fees == [Currency(value=1)]
+    assert [str(co.condition.unlockhash) for co in lazy.coin_outputs] == addresses
+    assert not lazy.decoded
+    assert lazy.json() == v1_txn_json
+
+    # the transaction is decoded (only once) when required
+    txn = transactions.from_json(v1_txn_json)
+    assert lazy.id == txn.id
+    assert lazy.decoded
+    assert lazy.transaction is lazy.transaction
+    assert lazy.signature_hash_get(0) == txn.signature_hash_get(0)
+    assert lazy.coin_output_addresses == addresses
+
+    # an assigned ID does not require decoding
+    lazy = transactions.from_json_lazy(v1_txn_json, id='11' * 32)
+    assert lazy.id == '11' * 32
+    assert not lazy.decoded
+    assert lazy.transaction.id == '11' * 32
+
+    # legacy transactions are supported as well
+    v0_txn_json = {"version":0,"data":{"coininputs":[{"parentid":"c1df239aba64ca0c6a241ddf18f3dd18b75e2c650874dd4c8c7dbbb56bd73683","unlocker":{"type":1,"condition":{"publickey":"ed25519:25b6aae78d545d64746f4a7310230e7b7bce263dcaa9dd5b3b6dd614d0f46413"},"fulfillment":{"signature":"7453f27cca1381f0cc05a6142b8d4ded5c1f84132742ba359df99ea7c17b2f304f8b9c8f3722da9ceb632fb7f526c8022c71e385bb75df9542cf94a7f3f3cc06"}}}],"coinoutputs":[{"value":"1000000000000000","unlockhash":"0199f4f21fc13ceb22da91d4b1701e67556a7c23f118bc5b1b15b132433d07b2496e093c4f4cd6"},{"value":"88839999200000000","unlockhash":"0175c11c8124e325cdba4f6843e917ba90519e9580adde5b10de5a7cabcc3251292194c5a0e6d2"}],"minerfees":["100000000"]}}
+    lazy = transactions.from_json_lazy(v0_txn_json)
+    assert lazy.version == TransactionVersion.LEGACY
+    assert lazy.coin_output_addresses == [
+        '0199f4f21fc13ceb22da91d4b1701e67556a7c23f118bc5b1b15b132433d07b2496e093c4f4cd6',
+        '0175c11c8124e325cdba4f6843e917ba90519e9580adde5b10de5a7cabcc3251292194c5a0e6d2',
+    ]
+    assert lazy.coin_output_values.sum() == Currency(value='89839999.2')
+    assert not lazy.decoded
+    assert lazy.id == '96df1e34533ffcd42ee1db995e165538edd275ba0c065ef9293ead84ff923eec'
+
+    # other versions are read from the decoded transaction
+    lazy = transactions.from_json_lazy({"version":208,"data":{"address":"0x1255abe9f2bf09f8e6c748e3819ac9f2dbf843c4","value":"200000000000","txfee":"1000000000","coininputs":[{"parentid":"9c61ec964105ec48bc95ffc0ac820ada600a2914a8dd4ef511ed7f218a3bf469","fulfillment":{"type":1,"data":{"publickey":"ed25519:7469d51063cdb690cc8025db7d28faadc71ff69f7c372779bf3a1e801a923e02","signature":"a0c683e8728710b4d3cd7eed4e1bd38a4be8145a2cf91b875986870aa98c6265d76cbb637d78500010e3ab1b651e31ab26b05de79938d7d0aee01f8566d08b09"}}}],"refundcoinoutput":{"value":"99999476000000000","condition":{"type":1,"data":{"unlockhash":"011c17aaf2d54f63644f9ce91c06ff984182483d1b943e96b5e77cc36fdb887c846b60460bceb0"}}}}})
+    assert lazy.version == TransactionVersion.ERC20_CONVERT
+    assert lazy.coin_output_values.sum() == lazy.transaction.coin_outputs[0].value
+    assert lazy.decoded
+
+
+def test_trusted_from_json():
+    transactions = TransactionFactory()
+
+    s = '010009a2b6a482da73204ccc586f6fab5504a1a69c0d316cdf828a476ae7c91c9137fd6f1b62bb'
+    bad = s[:-12] + '000000000000'
+    v1_txn_json = {"version":1,"data":{"coininputs":[{"parentid":"0846ce4e40bd153f4b24c1131908ba87e2c99d78615c16eaac846cb3ca033562","fulfillment":{"type":1,"data":{"publickey":"ed25519:89ba466d80af1b453a435175dbba6da7718e9cb19c64c0ed41fca3e6982e3636","signature":"90e6d2c8bb8d5ba7d5edcf38cf87d7ce1ec9d936b6939c05571f5317fd83ba495f895adc8695eedd35087c08f780eff05a74240bf1245eac920971c604892802"}}}],"coinoutputs":[{"value":"1000000000","condition":{"type":1,"data":{"unlockhash":bad}}}],"minerfees":["1000000000"]}}
+
+    # checksums are verified by default
+    with pytest.raises(ValueError):
+        transactions.from_json(v1_txn_json)
+    with pytest.raises(ValueError):
+        transactions.from_json_lazy(v1_txn_json).coin_outputs
+
+    # but not for JSON from a trusted source, which decodes to the same transaction
+    txn = transactions.from_json(v1_txn_json, trusted=True)
+    assert txn.coin_outputs[0].condition.unlockhash == s
+    v1_txn_json['data']['coinoutputs'][0]['condition']['data']['unlockhash'] = s
+    assert txn.binary_encode() == transactions.from_json(v1_txn_json).binary_encode()
+    v1_txn_json['data']['coinoutputs'][0]['condition']['data']['unlockhash'] = bad
+    lazy = transactions.from_json_lazy(v1_txn_json, trusted=True)
+    assert lazy.coin_outputs[0].condition.unlockhash == s
+    assert lazy.id == txn.id
+
+
+def _test_sign(private_key, message):
+    # deterministic stand-in for an ed25519 signer, as no such backend is a dependency
+    from tfchain.crypto.utils import blake2_hash
+    return blake2_hash(private_key, message, digest_size=64)
+
+
+def test_sign_many():
+    from concurrent.futures import ThreadPoolExecutor
+    from tfchain.types.CryptoTypes import PublicKey, PublicKeySpecifier
+    from tfchain.types.ConditionTypes import ConditionUnlockHash
+    from tfchain.types.FulfillmentTypes import signature_requests_sign
+    from tfchain.types.IO import CoinOutput
+
+    transactions = TransactionFactory()
+    public_keys = [PublicKey(specifier=PublicKeySpecifier.ED25519, hash=bytes([index])*32) for index in range(3)]
+    keys = {str(pk.unlockhash): (pk, bytes([index])*32) for (index, pk) in enumerate(public_keys[:2])}
+
+    def transactions_new(count):
+        txns = []
+        for index in range(count):
+            txn = transactions.new()
+            for pk in public_keys:
+                txn.coin_input_add(
+                    parentid=index.to_bytes(32, byteorder='little'), fulfillment=None,
+                    parent_output=CoinOutput(value=1, condition=ConditionUnlockHash(unlockhash=pk.unlockhash)))
+            txn.miner_fee_add(3)
+            txns.append(txn)
+        return txns
+
+    def expected_signatures(txn):
+        return [_test_sign(keys[str(pk.unlockhash)][1], txn.signature_hash_get(index)) for (index, pk) in enumerate(public_keys[:2])]
+
+    for (max_workers, executor) in ((1, 'process'), (2, 'thread'), (2, 'process'), (None, ThreadPoolExecutor(max_workers=2))):
+        txns = transactions_new(5)
+        # the input hashes are computed before any signature is added
+        expected = [expected_signatures(txn) for txn in txns]
+        requests = transactions.sign_many(txns, keys, _test_sign, max_workers=max_workers, executor=executor)
+        # only requests for the given keys are signed
+        assert len(requests) == 10
+        for (txn, signatures) in zip(txns, expected):
+            assert [ci.fulfillment.signature.value for ci in txn.coin_inputs[:2]] == signatures
+            assert [str(ci.fulfillment.public_key) for ci in txn.coin_inputs[:2]] == [str(pk) for pk in public_keys[:2]]
+            assert not txn.coin_inputs[2].is_fulfilled()
+    executor.shutdown()
+
+    # requests are never signed twice
+    txns = transactions_new(1)
+    requests = txns[0].signature_requests_new()
+    assert len(signature_requests_sign(requests, keys, _test_sign, max_workers=1)) == 2
+    assert signature_requests_sign(requests, keys, _test_sign, max_workers=1) == []
+    requests = transactions_new(1)[0].signature_requests_new()
+    with pytest.raises(tfchain.errors.DoubleSignError):
+        signature_requests_sign(requests + requests, keys, _test_sign, max_workers=1)
+    with pytest.raises(ValueError):
+        signature_requests_sign(requests, keys, _test_sign, executor='fiber')
+
+
+class _TransactionV250(TransactionV1):
+    # a custom transaction version, encoded as a v1 transaction
+    @property
+    def version(self):
+        return 250
+
+
+def test_register_transaction_version():
+    transactions = TransactionFactory()
+
+    v1_txn_json = {"version":1,"data":{"coininputs":[{"parentid":"5b907d6e4d34cdd825484d2f9f14445377fb8b4f8cab356a390a7fe4833a3085","fulfillment":{"type":1,"data":{"publickey":"ed25519:bd5e0e345d5939f5f9eb330084c7f0ffb8fc7fc5bdb07a94c304620eb4e2d99a","signature":"55dace7ccbc9cdd23220a8ef3ec09e84ce5c5acc202c5f270ea0948743ebf52135f3936ef7477170b4f9e0fe141a61d8312ab31afbf926a162982247e5d2720a"}}}],"coinoutputs":[{"value":"1000000000","condition":{"type":1,"data":{"unlockhash":"010009a2b6a482da73204ccc586f6fab5504a1a69c0d316cdf828a476ae7c91c9137fd6f1b62bb"}}}],"minerfees":["100000000"]}}
+    v250_txn_json = dict(v1_txn_json, version=250)
+
+    # unknown versions cannot be decoded or created
+    with pytest.raises(tfchain.errors.UnknownTransansactionVersion):
+        transactions.from_json({"version":251,"data":{}})
+    with pytest.raises(tfchain.errors.UnknownTransansactionVersion):
+        transactions.transaction_new(251)
+
+    # custom versions can be registered, known versions cannot be replaced unless explicitly requested
+    transactions.register_transaction_version(250, _TransactionV250)
+    try:
+        with pytest.raises(ValueError):
+            transactions.register_transaction_version(250, _TransactionV250)
+        with pytest.raises(ValueError):
+            transactions.register_transaction_version(TransactionVersion.STANDARD, _TransactionV250)
+        with pytest.raises(ValueError):
+            transactions.register_transaction_version(256, _TransactionV250)
+        with pytest.raises(TypeError):
+            transactions.register_transaction_version(252, dict)
+        with pytest.raises(TypeError):
+            transactions.register_transaction_version('252', _TransactionV250)
+
+        txn = transactions.from_json(v250_txn_json)
+        assert isinstance(txn, _TransactionV250)
+        assert txn.json() == v250_txn_json
+        assert isinstance(transactions.transaction_new(250), _TransactionV250)
+        assert transactions.from_json_lazy(v250_txn_json).version == 250
+
+        # a custom decoder can be registered as well
+        decoded = []
+        def decode(obj):
+            decoded.append(obj)
+            return _TransactionV250.from_json(obj)
+        transactions.register_transaction_version(250, _TransactionV250, json_decoder=decode, override=True)
+        assert isinstance(transactions.from_json(v250_txn_json), _TransactionV250)
+        assert decoded == [v250_txn_json]
+    finally:
+        transactions.unregister_transaction_version(250)
+
+    # unregistered versions are unknown again
+    with pytest.raises(tfchain.errors.UnknownTransansactionVersion):
+        transactions.from_json(v250_txn_json)
+    with pytest.raises(ValueError):
+        transactions.unregister_transaction_version(250)
+
+    # overriding a known version can be undone as well
+    class CustomTransactionV1(TransactionV1):
+        pass
+    transactions.register_transaction_version(TransactionVersion.STANDARD, CustomTransactionV1, override=True)
+    try:
+        assert type(transactions.from_json(v1_txn_json)) is CustomTransactionV1
+    finally:
+        transactions.unregister_transaction_version(TransactionVersion.STANDARD)
+    assert type(transactions.from_json(v1_txn_json)) is TransactionV1
+
+
+def test_from_json_many():
+    from tfchain.jsutils import json_dumps
+
+    transactions = TransactionFactory()
+
+    v0_txn_json = {"version":0,"data":{"coininputs":[{"parentid":"c1df239aba64ca0c6a241ddf18f3dd18b75e2c650874dd4c8c7dbbb56bd73683","unlocker":{"type":1,"condition":{"publickey":"ed25519:25b6aae78d545d64746f4a7310230e7b7bce263dcaa9dd5b3b6dd614d0f46413"},"fulfillment":{"signature":"7453f27cca1381f0cc05a6142b8d4ded5c1f84132742ba359df99ea7c17b2f304f8b9c8f3722da9ceb632fb7f526c8022c71e385bb75df9542cf94a7f3f3cc06"}}}],"coinoutputs":[{"value":"1000000000000000","unlockhash":"0199f4f21fc13ceb22da91d4b1701e67556a7c23f118bc5b1b15b132433d07b2496e093c4f4cd6"},{"value":"88839999200000000","unlockhash":"0175c11c8124e325cdba4f6843e917ba90519e9580adde5b10de5a7cabcc3251292194c5a0e6d2"}],"minerfees":["100000000"]}}
+    v1_txn_json = {"version":1,"data":{"coininputs":[{"parentid":"5b907d6e4d34cdd825484d2f9f14445377fb8b4f8cab356a390a7fe4833a3085","fulfillment":{"type":1,"data":{"publickey":"ed25519:bd5e0e345d5939f5f9eb330084c7f0ffb8fc7fc5bdb07a94c304620eb4e2d99a","signature":"55dace7ccbc9cdd23220a8ef3ec09e84ce5c5acc202c5f270ea0948743ebf52135f3936ef7477170b4f9e0fe141a61d8312ab31afbf926a162982247e5d2720a"}}}],"coinoutputs":[{"value":"1000000000","condition":{"type":1,"data":{"unlockhash":"010009a2b6a482da73204ccc586f6fab5504a1a69c0d316cdf828a476ae7c91c9137fd6f1b62bb"}}}],"minerfees":["100000000"]}}
+    v209_txn_json = {"version":209,"data":{"address":"01f68299b26a89efdb4351a61c3a062321d23edbc1399c8499947c1313375609adbbcd3977363c","value":"100000000000","txfee":"1000000000","blockid":"0xf3c001075d527bea48f087cbfaa7c4950beaf9a2ad66bf787760d751c7bcf6bd","txid":"0x3322e1d8cc985cc4f26ace9e4468612c50a05516161a3362c941955d34f91c85"}}
+
+    objs = [v0_txn_json, v1_txn_json, v209_txn_json, v1_txn_json, json_dumps(v209_txn_json)]
+    txns = transactions.from_json_many(objs)
+    assert [type(txn) for txn in txns] == [TransactionV1, TransactionV1, TransactionV209, TransactionV1, TransactionV209]
+    assert [txn.id for txn in txns] == [transactions.from_json(obj).id for obj in objs]
+    assert [txn.json() for txn in txns] == [transactions.from_json(obj).json() for obj in objs]
+
+    ids = [bytes([index]).hex() * 32 for index in range(len(objs))]
+    txns = transactions.from_json_many(iter(objs), ids=ids, trusted=True)
+    assert [txn.id for txn in txns] == ids
+
+    assert transactions.from_json_many([]) == []
+    with pytest.raises(tfchain.errors.UnknownTransansactionVersion):
+        transactions.from_json_many([v1_txn_json, {"version":251,"data":{}}])
+    with pytest.raises(TypeError):
+        transactions.from_json_many([v1_txn_json, 1])
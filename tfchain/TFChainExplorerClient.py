@@ -2,95 +2,378 @@
 Tfchain Client
 """
 import tfchain
-from tfchain.jsutils import HTTPError, HttpClient, json_dumps, json_loads
-import random
+from tfchain.jsutils import json_dumps
+from tfchain.transport import HTTPError, HttpTransport
+from tfchain.health import ExplorerHealthTracker, ExplorerHedgingPolicy
+import asyncio
+import threading
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
+
+# shared by all explorer clients which do not define their own transport,
+# such that connections are reused across clients
+_default_transport = HttpTransport()
 
-http = HttpClient()
 
 class TFChainExplorerClient:
     """
     Client to get data from a tfchain explorer.
     """
 
+    def __init__(self, transport=None, health=None, hedging=None, cache=None, store=None):
+        """
+        @param transport: optional transport used to do the HTTP requests,
+                          any object with an HttpTransport-compatible get and post method,
+                          a shared HttpTransport is used by default
+        @param health: optional ExplorerHealthTracker used to order and track the explorers,
+                       a new tracker (owned by this client) is used by default
+        @param hedging: optional ExplorerHedgingPolicy, GET requests are not hedged by default
+        @param cache: optional ExplorerResponseCache, GET responses are not cached by default
+        @param store: optional ChainStore, consulted before the cache and explorers,
+                      and in which received blocks are stored once they are confirmed deep enough
+        """
+        self._transport = _default_transport if transport is None else transport
+        self._health = ExplorerHealthTracker() if health is None else health
+        if hedging is not None and not isinstance(hedging, ExplorerHedgingPolicy):
+            raise TypeError("hedging has to be None or an ExplorerHedgingPolicy, not {}".format(type(hedging)))
+        self._hedging = hedging
+        self._hedging_executor = None
+        self._hedging_lock = threading.Lock()
+        self._cache = cache
+        self._store = store
+
+    @property
+    def transport(self):
+        """
+        The transport used to do the HTTP requests.
+        """
+        return self._transport
+
+    @property
+    def health(self):
+        """
+        The ExplorerHealthTracker used to order and track the explorers,
+        its snapshot method returns the stats of all explorers used so far.
+        """
+        return self._health
+
+    @property
+    def hedging(self):
+        """
+        The ExplorerHedgingPolicy used to hedge GET requests, None if requests are not hedged,
+        its snapshot method returns how often hedge requests were fired and won.
+        """
+        return self._hedging
+
+    @property
+    def cache(self):
+        """
+        The ExplorerResponseCache used to cache GET responses, None if responses are not cached.
+        """
+        return self._cache
+
+    @property
+    def store(self):
+        """
+        The ChainStore consulted before the cache and explorers, None if there is no store.
+        """
+        return self._store
+
     def get(self, addresses, endpoint):
         """
         get data from an explorer at the endpoint from any explorer that is available
-        on one of the given urls. The list of urls is traversed in random order until
+        on one of the given urls. The list of urls is traversed from the fastest
+        to the slowest healthy explorer (see ExplorerHealthTracker.order) until
         an explorer returns with a 200 OK status.
 
+        If this client has a hedging policy, the request is also sent to the second explorer
+        should the first explorer not have answered within the hedge delay.
+
+        If this client has a store, blocks and transactions are returned from the store if available,
+        and received blocks are stored once they are confirmed deep enough (see ChainStore.explorer_put). If this client has a cache,
+        a cached response is returned if available, and any received response is cached.
+
         @param urls: the list of urls of all available explorers
         @param endpoint: the endpoint to get the data from
         """
-        if not isinstance(addresses, list) or len(addresses) == 0:
-            raise TypeError("addresses expected to be a non-empty list of string-formatted explorer addresses, not {}".format(type(addresses)))
-        indices = list(range(len(addresses)))
-        random.shuffle(indices)
-        for idx in indices:
-            try:
-                address = addresses[idx]
-                if not isinstance(address, str):
-                    raise TypeError("explorer address expected to be a string, not {}".format(type(address)))
-                # this is required in order to be able to talk directly a daemon
-                headers = {'User-Agent': 'Rivine-Agent'}
-                # do the request and check the response
-                resp = http.get(url=address+endpoint, headers=headers)
-                if resp.getcode() == 200:
-                    return resp.readline()
-                if resp.getcode() == 204:
-                    raise tfchain.errors.ExplorerNoContent("GET: no content available (code: 204)", endpoint)
-                raise tfchain.errors.ExplorerServerError("error (code: {})".format(resp.getcode()), endpoint)
-            except HTTPError as e:
-                if e.status_code == 400:
-                    msg = e.msg
-                    if isinstance(msg, (bytes, bytearray)):
-                        msg = msg.decode('utf-8')
-                    if isinstance(msg, str) and (('unrecognized hash' in msg) or ('not found' in msg)):
-                        raise tfchain.errors.ExplorerNoContent("GET: no content available for specified hash (code: 400)", endpoint)
-                if e.status_code:
-                    raise tfchain.errors.ExplorerServerError("GET: error (code: {}): {}".format(e.status_code, e.msg), endpoint)
-                print("tfchain explorer get exception at endpoint {} on {}: {}".format(endpoint, address, e))
+        return self._get(addresses, endpoint)
+
+    def _get(self, addresses, endpoint, preferred=None):
+        """
+        get data as for the get method, trying the preferred explorer first if it is healthy.
+        """
+        self._addresses_validate(addresses)
+        if self._store is not None:
+            result = self._store.explorer_get(endpoint)
+            if result is not None:
+                return result
+        if self._cache is not None:
+            result = self._cache.get(endpoint)
+            if result is not None:
+                return result
+        result = self._get_uncached(addresses, endpoint, preferred=preferred)
+        if self._cache is not None:
+            self._cache.put(endpoint, result)
+        if self._store is not None:
+            if self._cache is not None and self._cache.height is not None:
+                self._store.height_observe(self._cache.height)
+            self._store.explorer_put(endpoint, result)
+        return result
+
+    def _get_uncached(self, addresses, endpoint, preferred=None):
+        addresses_ordered = self._health.order(addresses)
+        if preferred is not None and preferred in addresses_ordered and self._health.healthy([preferred]):
+            addresses_ordered.remove(preferred)
+            addresses_ordered.insert(0, preferred)
+        if self._hedging is not None and len(addresses_ordered) > 1:
+            result = self._get_hedged(addresses_ordered[0], addresses_ordered[1], endpoint)
+            addresses_ordered = addresses_ordered[2:]
+            if result is not None:
+                return result
+        for address in addresses_ordered:
+            result = self._get_from(address, endpoint)
+            if result is not None:
+                return result
         raise tfchain.errors.ExplorerNotAvailable("no explorer was available", endpoint=endpoint, addresses=addresses)
 
+    def _get_from(self, address, endpoint):
+        """
+        get data from a single explorer, returning None if the explorer is not available.
+        """
+        # this is required in order to be able to talk directly a daemon
+        headers = {'User-Agent': 'Rivine-Agent'}
+        try:
+            # do the request and check the response
+            resp = self._request(address, self._transport.get, url=address+endpoint, headers=headers)
+        except HTTPError as e:
+            if e.status_code == 400:
+                msg = e.msg
+                if isinstance(msg, (bytes, bytearray)):
+                    msg = msg.decode('utf-8')
+                if isinstance(msg, str) and (('unrecognized hash' in msg) or ('not found' in msg)):
+                    raise tfchain.errors.ExplorerNoContent("GET: no content available for specified hash (code: 400)", endpoint)
+            if e.status_code:
+                raise tfchain.errors.ExplorerServerError("GET: error (code: {}): {}".format(e.status_code, e.msg), endpoint)
+            # explorer is not available (recorded by the health tracker)
+            return None
+        if resp.status_code == 200:
+            return resp.body
+        if resp.status_code == 204:
+            raise tfchain.errors.ExplorerNoContent("GET: no content available (code: 204)", endpoint)
+        raise tfchain.errors.ExplorerServerError("error (code: {})".format(resp.status_code), endpoint)
+
+    def _get_hedged(self, address, hedge_address, endpoint):
+        """
+        get data from an explorer, hedging the request with a second explorer
+        if the first one does not answer in time. The first answer wins,
+        and the request which lost is cancelled if it did not start yet,
+        or its response is ignored otherwise.
+
+        Returns None if neither explorer is available.
+        """
+        executor = self._hedging_executor_get()
+        future = executor.submit(self._get_from, address, endpoint)
+        done, _ = futures.wait([future], timeout=self._hedging.delay(self._health, address))
+        if done:
+            result = future.result()
+            if result is not None:
+                return result
+            # first explorer failed fast, no need to hedge
+            return self._get_from(hedge_address, endpoint)
+        self._hedging.fired()
+        hedge = executor.submit(self._get_from, hedge_address, endpoint)
+        pending = {future, hedge}
+        while pending:
+            done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for winner in done:
+                if winner.exception() is None and winner.result() is None:
+                    # explorer not available, wait for the other request
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                if winner is hedge:
+                    self._hedging.won()
+                return winner.result()
+        return None
+
+    def _hedging_executor_get(self):
+        with self._hedging_lock:
+            if self._hedging_executor is None:
+                self._hedging_executor = ThreadPoolExecutor(
+                    max_workers=self._hedging.max_workers, thread_name_prefix='tfchain-explorer-hedge')
+            return self._hedging_executor
+
     def post(self, addresses, endpoint, data):
         """
         put data to an explorer at the endpoint from any explorer that is available
-        on one of the given urls. The list of urls is traversed in random order until
+        on one of the given urls. The list of urls is traversed from the fastest
+        to the slowest healthy explorer (see ExplorerHealthTracker.order) until
         an explorer returns with a 200 OK status.
 
         @param urls: the list of urls of all available explorers
         @param endpoint: the endpoint to geyot the data from
         """
-        if not isinstance(addresses, list) or len(addresses) == 0:
-            raise TypeError("addresses expected to be a non-empty list of string-formatted explorer addresses, not {}".format(type(addresses)))
-        indices = list(range(len(addresses)))
-        random.shuffle(indices)
-        for idx in indices:
+        self._addresses_validate(addresses)
+        # ensure the data is already JSON encoded and bytes
+        if isinstance(data, dict):
+            data = json_dumps(data)
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if not isinstance(data, bytes):
+            raise TypeError("expected post data to be bytes, not {}".format(type(data)))
+        for address in self._health.order(addresses):
+            # this is required in order to be able to talk directly a daemon,
+            # and to specify the data format correctly
+            headers = {
+                'User-Agent': 'Rivine-Agent',
+                'content-type': 'application/json',
+            }
             try:
-                address = addresses[idx]
-                if not isinstance(address, str):
-                    raise TypeError("explorer address expected to be a string, not {}".format(type(address)))
-                # this is required in order to be able to talk directly a daemon,
-                # and to specify the data format correctly
-                headers = {
-                    'User-Agent': 'Rivine-Agent',
-                    'content-type': 'application/json',
-                }
-                # ensure the data is already JSON encoded and bytes
-                if isinstance(data, dict):
-                    data = json_dumps(data)
-                if isinstance(data, str):
-                    data = data.encode('utf-8')
-                if not isinstance(data, bytes):
-                    raise TypeError("expected post data to be bytes, not {}".format(type(data)))
                 # do the request and check the response
-                resp = http.post(url=address+endpoint, data=data, headers=headers)
-                if resp.getcode() == 200:
-                    return resp.readline()
-                raise tfchain.errors.ExplorerServerPostError("POST: unexpected error (code: {})".format(resp.getcode()), endpoint, data=data)
+                resp = self._request(address, self._transport.post, url=address+endpoint, data=data, headers=headers)
             except HTTPError as e:
                 if e.status_code:
                     raise tfchain.errors.ExplorerServerPostError("POST: error (code: {}): {}".format(e.status_code, e.msg), endpoint, data=data)
-                print("tfchain explorer get exception at endpoint {} on {}: {}".format(endpoint, address, e))
-                pass
+                # explorer is not available (recorded by the health tracker), try the next one
+                continue
+            if resp.status_code == 200:
+                return resp.body
+            raise tfchain.errors.ExplorerServerPostError("POST: unexpected error (code: {})".format(resp.status_code), endpoint, data=data)
         raise tfchain.errors.ExplorerNotAvailable("no explorer was available", endpoint=endpoint, addresses=addresses)
 
+    def _request(self, address, method, **kwargs):
+        """
+        Do a request using the given transport method,
+        recording the outcome and latency in the health tracker.
+        """
+        start = self._health.clock()
+        try:
+            resp = method(**kwargs)
+        except HTTPError as e:
+            if e.status_code is None or e.status_code >= 500:
+                self._health.failure(address, error=e)
+            else:
+                # the explorer is healthy, it answered our (invalid) request
+                self._health.success(address, self._health.clock() - start)
+            raise
+        self._health.success(address, self._health.clock() - start)
+        return resp
+
+    @staticmethod
+    def _addresses_validate(addresses):
+        if not isinstance(addresses, list) or len(addresses) == 0:
+            raise TypeError("addresses expected to be a non-empty list of string-formatted explorer addresses, not {}".format(type(addresses)))
+        for address in addresses:
+            if not isinstance(address, str):
+                raise TypeError("explorer address expected to be a string, not {}".format(type(address)))
+
+
+class AsyncTFChainExplorerClient:
+    """
+    Asyncio client to get data from a tfchain explorer,
+    able to fan out many requests concurrently over all available explorers.
+
+    The requests are done by a TFChainExplorerClient, using a pooled keep-alive transport,
+    within a bounded thread pool, such that no asyncio HTTP library is required.
+    """
+
+    def __init__(self, transport=None, concurrency=8, health=None, hedging=None, cache=None, store=None):
+        """
+        @param transport: optional transport used to do the HTTP requests,
+                          by default an HttpTransport with a connection pool per address
+                          as big as the concurrency is used (and closed when this client is closed)
+        @param concurrency: maximum amount of requests in flight at any given time
+        @param health: optional ExplorerHealthTracker used to order and track the explorers
+        @param hedging: optional ExplorerHedgingPolicy used to hedge GET requests
+        @param cache: optional ExplorerResponseCache used to cache GET responses
+        @param store: optional ChainStore consulted before the cache and explorers
+        """
+        if not isinstance(concurrency, int) or concurrency < 1:
+            raise ValueError("concurrency has to be a positive integer, not {}".format(concurrency))
+        # a transport created by this client is closed by this client
+        self._transport_owned = transport is None
+        if transport is None:
+            transport = HttpTransport(pool_size=concurrency)
+        self._client = TFChainExplorerClient(
+            transport=transport, health=health, hedging=hedging, cache=cache, store=store)
+        self._concurrency = concurrency
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='tfchain-explorer')
+
+    @property
+    def transport(self):
+        """
+        The transport used to do the HTTP requests.
+        """
+        return self._client.transport
+
+    @property
+    def health(self):
+        """
+        The ExplorerHealthTracker used to order and track the explorers.
+        """
+        return self._client.health
+
+    @property
+    def concurrency(self):
+        """
+        Maximum amount of requests in flight at any given time.
+        """
+        return self._concurrency
+
+    async def get(self, addresses, endpoint):
+        """
+        get data from an explorer at the endpoint from any explorer that is available
+        on one of the given urls, see TFChainExplorerClient.get.
+
+        @param addresses: the list of urls of all available explorers
+        @param endpoint: the endpoint to get the data from
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._client.get, addresses, endpoint)
+
+    async def post(self, addresses, endpoint, data):
+        """
+        put data to an explorer at the endpoint from any explorer that is available
+        on one of the given urls, see TFChainExplorerClient.post.
+
+        @param addresses: the list of urls of all available explorers
+        @param endpoint: the endpoint to post the data to
+        @param data: the data to post, a dict, JSON-encoded str or bytes
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._client.post, addresses, endpoint, data)
+
+    async def get_many(self, addresses, endpoints, return_exceptions=False):
+        """
+        get data from the explorers at all given endpoints, with at most
+        as many requests in flight as the concurrency of this client.
+        The requests are distributed round-robin over the healthy explorers
+        (see ExplorerHealthTracker.healthy), from fastest to slowest,
+        with the other explorers tried next as for the get method.
+
+        Returns the results in the order of the given endpoints.
+
+        @param addresses: the list of urls of all available explorers
+        @param endpoints: the endpoints to get the data from
+        @param return_exceptions: if True, an error for one endpoint is returned
+                                  as its result rather than raised
+        """
+        if not isinstance(addresses, list) or len(addresses) == 0:
+            raise TypeError("addresses expected to be a non-empty list of string-formatted explorer addresses, not {}".format(type(addresses)))
+        healthy = self._client.health.healthy(addresses)
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(
+            *[loop.run_in_executor(
+                self._executor, self._client._get, addresses, endpoint,
+                healthy[index % len(healthy)] if healthy else None)
+              for (index, endpoint) in enumerate(endpoints)],
+            return_exceptions=return_exceptions)
+
+    def close(self):
+        """
+        Stop the worker threads of this client, once all pending requests are finished,
+        and close the connections of its transport if it was created by this client.
+        """
+        self._executor.shutdown(wait=True)
+        if self._transport_owned:
+            self._client.transport.close()
@@ -1,11 +1,11 @@
 
-from .PrimitiveTypes import BinaryData, Hash, Currency, Blockstake
-from .FulfillmentTypes import FulfillmentFactory
-from .ConditionTypes import ConditionFactory
-from .ThreeBot import ThreeBotTypesFactory
-from .CryptoTypes import PublicKey, PublicKeySpecifier
-from .TransactionFactory import TransactionFactory
-from tfchain.crypto import MerkleTree
+from tfchain.types.PrimitiveTypes import BinaryData, Hash, Currency, CurrencyArray, Blockstake
+from tfchain.types.FulfillmentTypes import FulfillmentFactory
+from tfchain.types.ConditionTypes import ConditionFactory
+from tfchain.types.CryptoTypes import PublicKey, PublicKeySpecifier
+from tfchain.TransactionFactory import TransactionFactory
+from tfchain.crypto import MerkleTree, FullMerkleTree
+from tfchain.crypto.utils import blake2_hash
 
 
 class TFChainTypeFactory:
@@ -17,7 +17,7 @@ class TFChainTypeFactory:
         self._transaction_factory = TransactionFactory()
         self._fulfillment_factory = FulfillmentFactory()
         self._condition_factory = ConditionFactory()
-        self._threebot_types_factory = ThreeBotTypesFactory()
+        self._threebot_types_factory = None
 
     @property
     def transactions(self):
@@ -42,6 +42,10 @@ class TFChainTypeFactory:
         """
         ThreeBot types.
         """
+        if self._threebot_types_factory is None:
+            # imported here, as the 3Bot types are only needed by 3Bot transactions
+            from tfchain.types.ThreeBot import ThreeBotTypesFactory
+            self._threebot_types_factory = ThreeBotTypesFactory()
         return self._threebot_types_factory
 
     def currency_new(self, value=0):
@@ -52,6 +56,14 @@ class TFChainTypeFactory:
         """
         return Currency(value=value)
 
+    def currency_array_new(self, values=None):
+        """
+        Create a new currency array, used to sum, filter and compare many currency values at once.
+
+        @param values: optional iterable of currency values (Currency, str or int)
+        """
+        return CurrencyArray(values=values)
+
     def blockstake_new(self, value=0):
         """
         Create a new block stake value.
@@ -94,8 +106,16 @@ class TFChainTypeFactory:
         """
         return PublicKey.from_json(obj)
 
-    def merkle_tree_new(self):
+    def merkle_tree_new(self, leaves=None, full=False):
         """
-        Create a new MerkleTree
+        Create a new MerkleTree, only keeping what is required to compute its root.
+
+        A full MerkleTree, which retains all leaves and can create inclusion proofs
+        for any of them (see FullMerkleTree), is created instead if full is True or if leaves are given.
+
+        @param leaves: optional iterable of leaves (bytes-like) to add to a full MerkleTree
+        @param full: create a full MerkleTree
         """
-        return Tree(hash_func=lambda o: bytes.fromhex(blake2_string(o)))
+        if full or leaves is not None:
+            return FullMerkleTree(leaves=leaves)
+        return MerkleTree(hash_func=blake2_hash)
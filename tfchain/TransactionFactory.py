@@ -1,15 +1,19 @@
+from tfchain.types.transactions import transaction_class_get, transaction_json_decoder_get, register_transaction_version, \
+    unregister_transaction_version
 from tfchain.types.transactions.Base import TransactionBaseClass, TransactionVersion
-from tfchain.types.transactions.Standard import TransactionV1
-from tfchain.types.transactions.Minting import TransactionV128, TransactionV129
-from tfchain.types.transactions.ThreeBot import BotTransactionBaseClass, TransactionV144, TransactionV145, TransactionV146
-from tfchain.types.transactions.ERC20 import TransactionV208, TransactionV209, TransactionV210
+from tfchain.types.transactions.Lazy import LazyTransaction
+from tfchain.types.ConditionTypes import trusted_json_decoding
+from tfchain.types.FulfillmentTypes import signature_requests_sign
+from tfchain.jsutils import json_loads
 import tfchain.errors
-import json
 
 
 class TransactionFactory:
     """
     TFChain Transaction Factory class
+
+    Transaction families (e.g. the 3Bot or ERC20 transactions) are only imported
+    once one of their versions is created or decoded.
     """
 
     @property
@@ -23,62 +27,67 @@ class TransactionFactory:
         """
         Creates and returns a default transaction.
         """
-        return TransactionV1()
+        return transaction_class_get(TransactionVersion.STANDARD)()
 
     def mint_definition_new(self):
         """
         Creates and returns an empty Mint Definition transaction.
         """
-        return TransactionV128()
+        return transaction_class_get(TransactionVersion.MINTER_DEFINITION)()
 
     def mint_coin_creation_new(self):
         """
         Creates and returns an empty Mint CoinCreation transaction.
         """
-        return TransactionV129()
+        return transaction_class_get(TransactionVersion.MINTER_COIN_CREATION)()
 
     def threebot_registration_new(self):
         """
         Creates and returns an empty 3Bot Registration transaction.
         """
-        return TransactionV144()
+        return transaction_class_get(TransactionVersion.THREEBOT_REGISTRATION)()
 
     def threebot_record_update_new(self):
         """
         Creates and returns an empty 3Bot Record Update transaction.
         """
-        return TransactionV145()
+        return transaction_class_get(TransactionVersion.THREEBOT_RECORD_UPDATE)()
 
     def threebot_name_transfer_new(self):
         """
         Creates and returns an empty 3Bot Name Transfer transaction.
         """
-        return TransactionV146()
+        return transaction_class_get(TransactionVersion.THREEBOT_NAME_TRANSFER)()
 
     def erc20_convert_new(self):
         """
         Creates and returns an empty ERC20 Convert transaction.
         """
-        return TransactionV208()
+        return transaction_class_get(TransactionVersion.ERC20_CONVERT)()
 
     def erc20_coin_creation_new(self):
         """
         Creates and returns an empty ERC20 Coin Creation transaction.
         """
-        return TransactionV209()
+        return transaction_class_get(TransactionVersion.ERC20_COIN_CREATION)()
 
     def erc20_address_registration_new(self):
         """
         Creates and returns an empty ERC20 Address Registration transaction.
         """
-        return TransactionV210()
+        return transaction_class_get(TransactionVersion.ERC20_ADDRESS_REGISTRATION)()
 
-    def from_json(self, obj, id=None):
+    def from_json(self, obj, id=None, trusted=False):
         """
         Create a TFChain transaction from a JSON string or dictionary.
 
         @param obj: JSON-encoded str, bytes, bytearray or JSON-decoded dict that contains a raw JSON Tx.
+        @param trusted: if True the JSON comes from a trusted source (e.g. your own explorer node),
+                        and the checksum of the unlock hashes it contains is not verified (see trusted_json_decoding)
         """
+        if trusted:
+            with trusted_json_decoding():
+                return self.from_json(obj, id=id)
         if isinstance(obj, (str, bytes, bytearray)):
             obj = json_loads(obj)
         if not isinstance(obj, dict):
@@ -86,27 +95,140 @@ class TransactionFactory:
                 "only a dictionary or JSON-encoded dictionary is supported as input: type {} is not supported", type(obj))
         tt = obj.get('version', -1)
 
+        decoder = transaction_json_decoder_get(tt)
+        txn = None if decoder is None else decoder(obj)
+
+        if isinstance(txn, TransactionBaseClass):
+            txn.id = id
+            return txn
+
+        raise tfchain.errors.UnknownTransansactionVersion(
+            "transaction version {} is unknown".format(tt))
+
+    def from_json_many(self, objs, ids=None, trusted=False):
+        """
+        Create many TFChain transactions from JSON strings or dictionaries,
+        e.g. all transactions of a (mixed-version) stream of raw JSON Txs,
+        resolving the decoder of each version only once.
+
+        @param objs: iterable of JSON-encoded str, bytes, bytearray or JSON-decoded dicts that contain a raw JSON Tx
+        @param ids: optional iterable of the IDs of these transactions (e.g. as assigned by the explorer),
+                    in the same order as the raw JSON Txs
+        @param trusted: if True the JSON comes from a trusted source (e.g. your own explorer node),
+                        and the checksum of the unlock hashes it contains is not verified (see trusted_json_decoding)
+
+        @returns: the list of decoded transactions, in the order of the raw JSON Txs
+        """
+        if trusted:
+            with trusted_json_decoding():
+                return self.from_json_many(objs, ids=ids)
+        decoders = {}
+        txns = []
+        ids = iter(ids) if ids is not None else None
+        for obj in objs:
+            id = next(ids, None) if ids is not None else None
+            if isinstance(obj, (str, bytes, bytearray)):
+                obj = json_loads(obj)
+            if not isinstance(obj, dict):
+                raise TypeError(
+                    "only a dictionary or JSON-encoded dictionary is supported as input: type {} is not supported".format(type(obj)))
+            tt = obj.get('version', -1)
+            try:
+                decoder = decoders[tt]
+            except (KeyError, TypeError):
+                decoder = transaction_json_decoder_get(tt)
+                if decoder is None:
+                    raise tfchain.errors.UnknownTransansactionVersion(
+                        "transaction version {} is unknown".format(tt))
+                decoders[tt] = decoder
+            txn = decoder(obj)
+            if not isinstance(txn, TransactionBaseClass):
+                raise tfchain.errors.UnknownTransansactionVersion(
+                    "transaction version {} is unknown".format(tt))
+            txn.id = id
+            txns.append(txn)
+        return txns
+
+    def register_transaction_version(self, version, cls, json_decoder=None, override=False):
+        """
+        Register the transaction class of a custom (out-of-tree) transaction version,
+        such that transactions of that version can be decoded by this factory.
+
+        @param version: the version of the transaction, an int in the range [0, 255]
+        @param cls: the transaction class, a subclass of TransactionBaseClass
+        @param json_decoder: optional function which decodes a raw JSON Tx (dict) of this version into a transaction,
+                             cls.from_json by default
+        @param override: if True an already known version is replaced, otherwise registering it raises a ValueError
+        """
+        register_transaction_version(version, cls, json_decoder=json_decoder, override=override)
+
+    def unregister_transaction_version(self, version):
+        """
+        Unregister a transaction version registered using register_transaction_version,
+        restoring the original class of a known version that was overridden.
+
+        @param version: the (int) version of the transaction
+        """
+        unregister_transaction_version(version)
+
+    def transaction_new(self, version):
+        """
+        Creates and returns an empty transaction of the given (known or registered) version.
+
+        @param version: the (int) version of the transaction
+        """
+        cls = transaction_class_get(version)
+        if cls is None:
+            raise tfchain.errors.UnknownTransansactionVersion(
+                "transaction version {} is unknown".format(version))
+        return cls()
+
+    def from_json_lazy(self, obj, id=None, trusted=False):
+        """
+        Create a read-only view on a TFChain transaction from a JSON string or dictionary,
+        which only decodes the properties that are used (see LazyTransaction).
+
+        @param obj: JSON-encoded str, bytes, bytearray or JSON-decoded dict that contains a raw JSON Tx.
+        @param trusted: if True the JSON comes from a trusted source (e.g. your own explorer node),
+                        and the checksum of the unlock hashes it contains is not verified (see trusted_json_decoding)
+        """
+        return LazyTransaction(obj, id=id, decode=self.from_json, trusted=trusted)
+
+    def sign_many(self, transactions, keys, sign, max_workers=None, executor='process'):
+        """
+        Sign many transactions at once, signing all their open signature requests in parallel
+        (see tfchain.types.FulfillmentTypes.signature_requests_sign).
+
+        @param transactions: iterable of transactions to sign
+        @param keys: dict mapping a wallet address (str) to a (PublicKey, private key) pair
+        @param sign: picklable function sign(private_key, message) -> signature
+        @param max_workers: the max amount of workers used to sign, the amount of CPUs by default
+        @param executor: 'process', 'thread' or a concurrent.futures.Executor to sign with
+
+        @returns: the list of signature requests that were fulfilled
+        """
+        requests = []
+        for txn in transactions:
+            requests += txn.signature_requests_new()
+        return signature_requests_sign(requests, keys, sign, max_workers=max_workers, executor=executor)
+
+    def from_binary(self, data, id=None):
+        """
+        Create a TFChain transaction from its binary encoding.
+
+        @param data: bytes, bytearray or memoryview that contains a binary-encoded Tx,
+                     as returned by the binary_encode method of a transaction
+        """
+        data = memoryview(data).cast('B')
+        if len(data) == 0:
+            raise ValueError("binary-encoded transaction cannot be empty")
+        tt = data[0]
+
         txn = None
-        if tt == TransactionVersion.STANDARD:
-            txn = TransactionV1.from_json(obj)
-        elif tt == TransactionVersion.THREEBOT_REGISTRATION:
-            txn = TransactionV144.from_json(obj)
-        elif tt == TransactionVersion.THREEBOT_RECORD_UPDATE:
-            txn = TransactionV145.from_json(obj)
-        elif tt == TransactionVersion.THREEBOT_NAME_TRANSFER:
-            txn = TransactionV146.from_json(obj)
-        elif tt == TransactionVersion.ERC20_CONVERT:
-            txn = TransactionV208.from_json(obj)
-        elif tt == TransactionVersion.ERC20_COIN_CREATION:
-            txn = TransactionV209.from_json(obj)
-        elif tt == TransactionVersion.ERC20_ADDRESS_REGISTRATION:
-            txn = TransactionV210.from_json(obj)
-        elif tt == TransactionVersion.MINTER_DEFINITION:
-            txn = TransactionV128.from_json(obj)
-        elif tt == TransactionVersion.MINTER_COIN_CREATION:
-            txn = TransactionV129.from_json(obj)
-        elif tt == TransactionVersion.LEGACY:
-            txn = TransactionV1.legacy_from_json(obj)
+        # legacy transactions are decoded by the v1 transaction class as well
+        cls = transaction_class_get(tt)
+        if cls is not None:
+            txn = cls.from_binary(data)
 
         if isinstance(txn, TransactionBaseClass):
             txn.id = id
@@ -0,0 +1,26 @@
+"""
+TFChain types, encoders and clients.
+
+The submodules of this package are only imported once they are used,
+e.g. tfchain.TransactionFactory imports the transaction factory (and its dependencies)
+the first time it is accessed, rather than when the tfchain package is imported.
+"""
+
+import importlib
+
+
+# submodules which are imported when first accessed as an attribute of this package
+_SUBMODULES = frozenset([
+    'cache', 'chainstore', 'crypto', 'encoders', 'errors', 'health', 'jsutils', 'stubs', 'transport', 'types', 'utxo',
+    'TFChainExplorerClient', 'TFChainTypeFactory', 'TransactionFactory',
+])
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES)
@@ -0,0 +1,263 @@
+"""
+Cache of explorer responses, used in front of the explorer client(s).
+
+Responses of blocks and transactions which are confirmed deep enough never change,
+and are kept until evicted (optionally also on disk). All other responses
+are kept for a TTL, and until the observed chain height advances.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from tfchain.crypto.utils import blake2_string
+from tfchain.jsutils import json_loads
+
+
+class EndpointClass:
+    """
+    Classes of explorer endpoints, each with their own TTL.
+    """
+
+    # /explorer
+    CHAIN = 'chain'
+    # /explorer/blocks/<height>
+    BLOCK = 'block'
+    # /explorer/hashes/<hash>
+    HASH = 'hash'
+    # /explorer/mintcondition[/<height>]
+    MINT_CONDITION = 'mintcondition'
+    # any other endpoint
+    OTHER = 'other'
+
+
+_ENDPOINT_CLASSES = [
+    (re.compile(r'^/explorer/?$'), EndpointClass.CHAIN),
+    (re.compile(r'^/explorer/blocks/\d+$'), EndpointClass.BLOCK),
+    (re.compile(r'^/explorer/hashes/.+$'), EndpointClass.HASH),
+    (re.compile(r'^/explorer/mintcondition(/\d+)?$'), EndpointClass.MINT_CONDITION),
+]
+
+
+def endpoint_class_get(endpoint):
+    """
+    The EndpointClass of the given explorer endpoint.
+    """
+    for (template, endpoint_class) in _ENDPOINT_CLASSES:
+        if template.match(endpoint):
+            return endpoint_class
+    return EndpointClass.OTHER
+
+
+class ExplorerResponseDiskStore:
+    """
+    Stores (immutable) explorer responses as files within a directory,
+    such that they survive a restart of the process.
+    """
+
+    def __init__(self, directory):
+        """
+        @param directory: directory to store the responses in, created if it does not exist yet
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+
+    def get(self, endpoint):
+        """
+        The stored response for the given endpoint, None if no response is stored.
+        """
+        try:
+            with open(self._path_get(endpoint), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, endpoint, body):
+        """
+        Store the response for the given endpoint.
+        """
+        path = self._path_get(endpoint)
+        # write to a temporary file first, such that a response is never stored partially
+        tmp_path = '{}.{}.tmp'.format(path, threading.get_ident())
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def _path_get(self, endpoint):
+        return os.path.join(self._directory, blake2_string(endpoint, digest_size=16))
+
+
+class _CacheEntry:
+    __slots__ = ('body', 'expires_at')
+
+    def __init__(self, body, expires_at):
+        self.body = body
+        # None for an immutable entry
+        self.expires_at = expires_at
+
+
+class ExplorerResponseCache:
+    """
+    LRU cache of explorer GET responses.
+
+    Responses of blocks and transactions which are at least confirmation_depth blocks deep
+    are immutable: they never expire, and are also written to the disk store if there is one.
+    All other responses expire after the TTL of their endpoint class,
+    and are invalidated as soon as the chain height (as seen in responses of the /explorer endpoint
+    or reported using height_observe) advances.
+    """
+
+    DEFAULT_TTLS = {
+        EndpointClass.CHAIN: 5.0,
+        EndpointClass.BLOCK: 30.0,
+        EndpointClass.HASH: 10.0,
+        EndpointClass.MINT_CONDITION: 60.0,
+        EndpointClass.OTHER: 10.0,
+    }
+
+    def __init__(self, max_entries=10000, ttls=None, confirmation_depth=6, store=None, clock=None):
+        """
+        @param max_entries: maximum amount of responses kept in memory
+        @param ttls: optional dict of TTLs in seconds per EndpointClass, overwriting the DEFAULT_TTLS
+        @param confirmation_depth: amount of blocks a block or transaction has to be buried under
+                                   before its response is considered immutable
+        @param store: optional store (e.g. an ExplorerResponseDiskStore) for immutable responses
+        @param clock: function returning the current time in seconds, time.monotonic by default
+        """
+        if not isinstance(max_entries, int) or max_entries < 1:
+            raise ValueError("max entries has to be a positive integer, not {}".format(max_entries))
+        self._max_entries = max_entries
+        self._ttls = dict(ExplorerResponseCache.DEFAULT_TTLS)
+        if ttls:
+            self._ttls.update(ttls)
+        self._confirmation_depth = confirmation_depth
+        self._store = store
+        self._clock = time.monotonic if clock is None else clock
+        self._entries = OrderedDict()
+        self._height = None
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def height(self):
+        """
+        The highest chain height observed so far, None if no height was observed yet.
+        """
+        return self._height
+
+    def get(self, endpoint):
+        """
+        The cached response for the given endpoint, None if there is no (valid) cached response.
+        """
+        with self._lock:
+            entry = self._entries.get(endpoint)
+            if entry is not None:
+                if entry.expires_at is None or entry.expires_at > self._clock():
+                    self._entries.move_to_end(endpoint)
+                    self._hits += 1
+                    return entry.body
+                del self._entries[endpoint]
+        if self._store is not None:
+            body = self._store.get(endpoint)
+            if body is not None:
+                with self._lock:
+                    self._hits += 1
+                    self._entry_add(endpoint, _CacheEntry(body, None))
+                return body
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, endpoint, body):
+        """
+        Cache the response for the given endpoint.
+        """
+        endpoint_class = endpoint_class_get(endpoint)
+        height = None
+        immutable = False
+        if endpoint_class in (EndpointClass.CHAIN, EndpointClass.BLOCK, EndpointClass.HASH):
+            try:
+                resp = json_loads(body)
+            except ValueError:
+                # do not cache invalid responses
+                return
+            if endpoint_class == EndpointClass.CHAIN:
+                height = resp.get('height')
+            else:
+                immutable = self._is_immutable(resp)
+        if height is not None:
+            self.height_observe(height)
+        if immutable:
+            entry = _CacheEntry(body, None)
+            if self._store is not None:
+                self._store.put(endpoint, body)
+        else:
+            entry = _CacheEntry(body, self._clock() + self._ttls[endpoint_class])
+        with self._lock:
+            self._entry_add(endpoint, entry)
+
+    def height_observe(self, height):
+        """
+        Report the current chain height, invalidating all mutable responses
+        if the chain height advanced.
+        """
+        with self._lock:
+            if self._height is not None and height <= self._height:
+                return
+            self._height = height
+            for endpoint in [endpoint for (endpoint, entry) in self._entries.items() if entry.expires_at is not None]:
+                del self._entries[endpoint]
+
+    def clear(self):
+        """
+        Remove all responses from memory (not from the store).
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self):
+        """
+        The cache statistics, as a plain dict.
+        """
+        with self._lock:
+            immutable = sum(1 for entry in self._entries.values() if entry.expires_at is None)
+            return {
+                'entries': len(self._entries),
+                'immutable': immutable,
+                'hits': self._hits,
+                'misses': self._misses,
+                'height': self._height,
+            }
+
+    def _entry_add(self, endpoint, entry):
+        self._entries[endpoint] = entry
+        self._entries.move_to_end(endpoint)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _is_immutable(self, resp):
+        """
+        A response is immutable if it is a block or confirmed transaction,
+        buried at least confirmation_depth blocks deep.
+        """
+        if not isinstance(resp, dict):
+            return False
+        hashtype = resp.get('hashtype')
+        if hashtype is None or hashtype == 'blockid':
+            height = (resp.get('block') or {}).get('height')
+        elif hashtype == 'transactionid':
+            transaction = resp.get('transaction') or {}
+            if transaction.get('unconfirmed', True):
+                return False
+            height = transaction.get('height')
+        else:
+            # unlock hashes, coin outputs, ... can change as the chain grows
+            return False
+        with self._lock:
+            chain_height = self._height
+        if not isinstance(height, int) or chain_height is None:
+            return False
+        return chain_height - height >= self._confirmation_depth
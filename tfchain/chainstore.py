@@ -0,0 +1,266 @@
+"""
+Local, persistent (SQLite) store of explorer blocks and transactions,
+consulted by the explorer client(s) before going to the network.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+
+from tfchain.jsutils import json_loads
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocks (
+    height INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    block TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    id TEXT PRIMARY KEY,
+    height INTEGER NOT NULL,
+    block_id TEXT NOT NULL,
+    transaction_ TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_height ON transactions (height);
+"""
+
+_CHAIN_ENDPOINT = re.compile(r'^/explorer/?$')
+_BLOCK_ENDPOINT = re.compile(r'^/explorer/blocks/(\d+)$')
+_HASH_ENDPOINT = re.compile(r'^/explorer/hashes/([0-9a-fA-F]{64})$')
+
+# explorer responses as captured in the python fixtures of tests/jstests
+_FIXTURE_RESPONSE = re.compile(r"""\.(?:block_add|hash_add)\(\s*(?:\d+|'[0-9a-fA-F]+')\s*,\s*'(\{.*?\})'\s*\)""")
+
+
+class ChainStore:
+    """
+    Persists explorer blocks (as returned by the explorer, including all their transactions),
+    keyed by height and block ID, and the explorer transactions they contain, keyed by transaction ID.
+
+    Only add blocks which are confirmed deep enough not to be reverted,
+    as a stored block is never replaced by a block for the same height.
+    Blocks received from the explorer (see explorer_put) are only stored once they are
+    at least confirmation_depth blocks below the observed chain height.
+    """
+
+    def __init__(self, path=':memory:', confirmation_depth=6):
+        """
+        @param path: path of the SQLite database file, an in-memory database is used by default
+        @param confirmation_depth: amount of blocks a block received from the explorer has to be buried under
+                                   before it is stored
+        """
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._confirmation_depth = confirmation_depth
+        self._chain_height = None
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @property
+    def height(self):
+        """
+        The height of the highest stored block, None if no block is stored.
+        """
+        with self._lock:
+            (height,) = self._db.execute('SELECT MAX(height) FROM blocks').fetchone()
+        return height
+
+    @property
+    def chain_height(self):
+        """
+        The highest chain height observed so far, None if no height was observed yet.
+        """
+        return self._chain_height
+
+    def height_observe(self, height):
+        """
+        Report the current chain height, used to decide which blocks received from the explorer
+        are confirmed deep enough to be stored.
+        """
+        with self._lock:
+            if self._chain_height is None or height > self._chain_height:
+                self._chain_height = height
+
+    def block_add(self, block):
+        """
+        Store an explorer block, and all transactions it contains.
+        Returns False if a block was already stored at that height.
+
+        @param block: explorer block, as a dict or JSON-encoded str/bytes,
+                      either the block object itself or a response containing it (as its block property)
+        """
+        with self._lock, self._db:
+            return self._block_add(block)
+
+    def block_get(self, height):
+        """
+        The stored explorer block (as a dict) at the given height, None if it is not stored.
+        """
+        return self._block_query('SELECT block FROM blocks WHERE height = ?', height)
+
+    def block_get_by_id(self, id):
+        """
+        The stored explorer block (as a dict) with the given ID, None if it is not stored.
+        """
+        return self._block_query('SELECT block FROM blocks WHERE id = ?', str(id))
+
+    def transaction_get(self, id):
+        """
+        The stored explorer transaction (as a dict) with the given ID, None if it is not stored.
+        The decoded transaction is available as its rawtransaction, see transaction_decode.
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT transaction_ FROM transactions WHERE id = ?', (str(id),)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def transaction_decode(self, id):
+        """
+        The stored transaction with the given ID, decoded as a TFChain transaction,
+        None if it is not stored.
+        """
+        etxn = self.transaction_get(id)
+        if etxn is None:
+            return None
+        # imported here, as the store is also used without any transaction types
+        from tfchain.TransactionFactory import TransactionFactory
+        txn = TransactionFactory().from_json(etxn['rawtransaction'], id=etxn['id'])
+        txn.height = etxn.get('height', -1)
+        return txn
+
+    def explorer_get(self, endpoint):
+        """
+        Answer an explorer GET request from the store.
+        Returns the JSON-encoded response as bytes, None if the store cannot answer it.
+
+        Supported are /explorer/blocks/<height> and /explorer/hashes/<id>
+        for the ID of a stored block or transaction. For the latter the properties
+        of the explorer response that list other hashes (blocks, transactions, multisigaddresses) are null.
+        """
+        match = _BLOCK_ENDPOINT.match(endpoint)
+        if match:
+            block = self.block_get(int(match.group(1)))
+            return None if block is None else json.dumps({'block': block}).encode('utf-8')
+        match = _HASH_ENDPOINT.match(endpoint)
+        if match:
+            id = match.group(1).lower()
+            block = self.block_get_by_id(id)
+            if block is not None:
+                return _hash_response_encode('blockid', block, None)
+            with self._lock:
+                row = self._db.execute(
+                    'SELECT transactions.transaction_, blocks.block FROM transactions'
+                    ' JOIN blocks ON blocks.id = transactions.block_id WHERE transactions.id = ?', (id,)).fetchone()
+            if row is not None:
+                return _hash_response_encode('transactionid', json.loads(row[1]), json.loads(row[0]))
+        return None
+
+    def explorer_put(self, endpoint, body):
+        """
+        Store the block contained in an explorer GET response of the /explorer/blocks/<height> endpoint,
+        if that block is at least confirmation_depth blocks below the observed chain height.
+        Responses of the /explorer endpoint are used to observe the chain height.
+        Returns True if a block was added.
+
+        @param endpoint: the endpoint the response was received for
+        @param body: the JSON-encoded response
+        """
+        if _CHAIN_ENDPOINT.match(endpoint):
+            height = json_loads(body).get('height')
+            if isinstance(height, int):
+                self.height_observe(height)
+            return False
+        match = _BLOCK_ENDPOINT.match(endpoint)
+        if not match:
+            # hash responses are not parsed, as they can be large (e.g. those of unlock hashes)
+            return False
+        chain_height = self._chain_height
+        if chain_height is None or int(match.group(1)) > chain_height - self._confirmation_depth:
+            # the block might still be reverted
+            return False
+        return self.block_add(body)
+
+    def import_responses(self, responses):
+        """
+        Store the blocks of all given explorer responses, ignoring responses without a block.
+        Returns the amount of blocks added.
+
+        @param responses: iterable of explorer responses, as dicts or JSON-encoded str/bytes
+        """
+        count = 0
+        with self._lock, self._db:
+            for resp in responses:
+                if not isinstance(resp, dict):
+                    resp = json_loads(resp)
+                if resp.get('hashtype', 'blockid') != 'blockid':
+                    continue
+                if self._block_add(resp):
+                    count += 1
+        return count
+
+    def import_directory(self, path):
+        """
+        Store the blocks of all explorer responses captured within a directory.
+        Returns the amount of blocks added.
+
+        Supported are JSON files (*.json) containing a single explorer response,
+        and python files (*.py) adding explorer responses to a TFChainExplorerGetClientStub,
+        such as the fixtures in tests/jstests.
+
+        @param path: directory containing the captured responses
+        """
+        responses = []
+        for name in sorted(os.listdir(path)):
+            filepath = os.path.join(path, name)
+            if name.endswith('.json'):
+                with open(filepath, 'rb') as f:
+                    responses.append(f.read())
+            elif name.endswith('.py'):
+                with open(filepath, 'r') as f:
+                    responses.extend(_FIXTURE_RESPONSE.findall(f.read()))
+        return self.import_responses(responses)
+
+    def _block_add(self, block):
+        if not isinstance(block, dict):
+            block = json_loads(block)
+        if 'blockid' not in block:
+            block = block.get('block') or {}
+        height, id = block.get('height'), block.get('blockid')
+        if not isinstance(height, int) or not id or not block.get('rawblock'):
+            # not a (valid) block, e.g. the empty block of a transaction response
+            return False
+        cursor = self._db.execute(
+            'INSERT OR IGNORE INTO blocks (height, id, block) VALUES (?, ?, ?)',
+            (height, id, json.dumps(block)))
+        if cursor.rowcount == 0:
+            return False
+        self._db.executemany(
+            'INSERT OR REPLACE INTO transactions (id, height, block_id, transaction_) VALUES (?, ?, ?, ?)',
+            [(etxn['id'], height, id, json.dumps(etxn)) for etxn in block.get('transactions') or []])
+        return True
+
+    def _block_query(self, query, key):
+        with self._lock:
+            row = self._db.execute(query, (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+
+def _hash_response_encode(hashtype, block, etxn):
+    """
+    Encode a response of the /explorer/hashes/<id> endpoint, for a stored block or transaction.
+    """
+    return json.dumps({
+        'hashtype': hashtype,
+        'block': block,
+        'blocks': None,
+        'transaction': etxn,
+        'transactions': None,
+        'multisigaddresses': None,
+        'unconfirmed': False,
+    }).encode('utf-8')
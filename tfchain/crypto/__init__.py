@@ -1,4 +1,6 @@
-from .merkletree import Tree
+from .merkletree import Tree, FullTree, proof_verify
+from .utils import blake2_string, blake2_hash, blake2_hasher_new
 
 
 MerkleTree = Tree
+FullMerkleTree = FullTree
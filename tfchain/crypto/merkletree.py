@@ -7,6 +7,11 @@
 # // The Tree also constructs proof that a single leaf is a part of the tree. The
 # // leaf can be chosen with 'SetIndex'. The memory footprint of Tree grows in
 # // O(log(n)) in the number of leaves.
+#
+# Unlike the original, the ported Tree does not construct proofs,
+# use a FullTree (which retains all leaves) for that instead.
+
+from .utils import blake2_hasher_new
 
 
 class Tree:
@@ -54,7 +59,7 @@ class Tree:
         // Root returns the Merkle root of the data that has been pushed.
         """
         if self.head is None:
-            return sum(self.hash_func, bytearray())
+            return sum_(self.hash_func, bytearray())
 
         # // The root is formed by hashing together subTrees in order from least in
         # // height to greatest in height. The taller subtree is the first subtree in
@@ -65,6 +70,174 @@ class Tree:
         return current.sum
 
 
+class FullTree:
+    """
+    A Merkle tree which retains all its leaves, such that besides its root
+    it can also create proofs that a leaf is part of the tree, for any leaf index.
+
+    Leaves are hashed as they are added, and each level of the tree is stored
+    as a single contiguous buffer of hashes. The levels are computed (level by level)
+    only when the root or a proof is requested, and kept until a leaf is added.
+
+    The root of a FullTree equals the root of a Tree with the same leaves.
+    """
+
+    def __init__(self, leaves=None, hasher_new=blake2_hasher_new):
+        """
+        @param leaves: optional iterable of leaves (bytes, bytearray or memoryview) to add
+        @param hasher_new: function creating a new streaming hasher (with update, copy and digest methods),
+                           a blake2 hasher by default
+        """
+        self._hasher_new = hasher_new
+        self._leaf_hasher = hasher_new()
+        self._leaf_hasher.update(b'\x00')
+        self._node_hasher = hasher_new()
+        self._node_hasher.update(b'\x01')
+        self._size = self._leaf_hasher.digest_size
+        self._leaves = bytearray()
+        self._levels = None
+        if leaves is not None:
+            self.extend(leaves)
+
+    def push(self, data):
+        """
+        Add a single leaf to the tree.
+        """
+        h = self._leaf_hasher.copy()
+        h.update(data)
+        self._leaves += h.digest()
+        self._levels = None
+
+    def extend(self, leaves):
+        """
+        Add multiple leaves to the tree, hashed as a single batch.
+        """
+        leaf_hasher = self._leaf_hasher
+        hashes = []
+        for data in leaves:
+            h = leaf_hasher.copy()
+            h.update(data)
+            hashes.append(h.digest())
+        self._leaves += b''.join(hashes)
+        self._levels = None
+
+    def __len__(self):
+        return len(self._leaves) // self._size
+
+    def leaf_hash(self, index):
+        """
+        The hash of the leaf at the given index.
+        """
+        self._index_check(index)
+        return bytes(self._leaves[index*self._size:(index+1)*self._size])
+
+    def _index_check(self, index):
+        if not isinstance(index, int):
+            raise TypeError("leaf index is expected to be an int, not {}".format(type(index)))
+        if index < 0 or index >= len(self):
+            raise IndexError("leaf index {} is out of range, the tree has {} leaves".format(index, len(self)))
+
+    def _levels_get(self):
+        """
+        All levels of the tree, from the leaves up to (and including) the root level,
+        each level a buffer of concatenated hashes.
+        """
+        if self._levels is None:
+            size = self._size
+            node_hasher = self._node_hasher
+            level = bytes(self._leaves)
+            levels = [level]
+            while len(level) > size:
+                view = memoryview(level)
+                pairs = len(level) // (2*size)
+                hashes = []
+                for offset in range(0, pairs*2*size, 2*size):
+                    # the left and right sibling are stored next to each other
+                    h = node_hasher.copy()
+                    h.update(view[offset:offset+2*size])
+                    hashes.append(h.digest())
+                if len(level) % (2*size):
+                    # the last node of an odd level is promoted as-is
+                    hashes.append(level[-size:])
+                level = b''.join(hashes)
+                levels.append(level)
+            self._levels = levels
+        return self._levels
+
+    def root(self):
+        """
+        The Merkle root of all leaves, the hash of no data if the tree has no leaves.
+        """
+        if not self._leaves:
+            return self._hasher_new().digest()
+        return self._levels_get()[-1]
+
+    def proof(self, index):
+        """
+        Create a proof that the leaf at the given index is part of this tree,
+        the list of sibling hashes on the path from that leaf to the root,
+        which can be verified using proof_verify.
+        """
+        self._index_check(index)
+        size = self._size
+        proof = []
+        for level in self._levels_get()[:-1]:
+            sibling = index ^ 1
+            if sibling*size < len(level):
+                proof.append(level[sibling*size:(sibling+1)*size])
+            index //= 2
+        return proof
+
+    def verify(self, data, index, proof):
+        """
+        Verify that the given data is the leaf at the given index of this tree,
+        using a proof as created by the proof method.
+        """
+        return proof_verify(self.root(), data, index, len(self), proof, hasher_new=self._hasher_new)
+
+
+def proof_verify(root, data, index, nr_of_leaves, proof, hasher_new=blake2_hasher_new):
+    """
+    Verify that the given data is the leaf at the given index,
+    of a Merkle tree with the given root and amount of leaves.
+
+    @param root: the Merkle root of the tree
+    @param data: the data of the leaf to verify
+    @param index: the index of the leaf within the tree
+    @param nr_of_leaves: the amount of leaves of the tree
+    @param proof: the list of sibling hashes, as created by FullTree.proof
+    @param hasher_new: function creating a new streaming hasher, a blake2 hasher by default
+    """
+    if index < 0 or index >= nr_of_leaves:
+        return False
+    h = hasher_new()
+    h.update(b'\x00')
+    h.update(data)
+    current = h.digest()
+    proof = iter(proof)
+    try:
+        while nr_of_leaves > 1:
+            if index % 2:
+                current = _node_digest(hasher_new, next(proof), current)
+            elif index + 1 < nr_of_leaves:
+                current = _node_digest(hasher_new, current, next(proof))
+            index //= 2
+            nr_of_leaves = (nr_of_leaves + 1) // 2
+    except StopIteration:
+        return False
+    if next(proof, None) is not None:
+        return False
+    return current == bytes(root)
+
+
+def _node_digest(hasher_new, a, b):
+    h = hasher_new()
+    h.update(b'\x01')
+    h.update(a)
+    h.update(b)
+    return h.digest()
+
+
 class SubTree:
     """
     // A subTree contains the Merkle root of a complete (2^height leaves) subTree
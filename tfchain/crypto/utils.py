@@ -1,4 +1,4 @@
-from pyblake2 import blake2b
+from hashlib import blake2b
 
 
 def blake2_string(s, digest_size=32):
@@ -14,3 +14,40 @@ def blake2_string(s, digest_size=32):
         s = s.encode()
     h = blake2b(s, digest_size=digest_size)
     return h.hexdigest()
+
+
+def blake2_hash(*buffers, digest_size=32):
+    '''Calculate the binary blake2 hash of one or multiple input buffers,
+    hashed one after another as if they were a single buffer.
+
+    @param buffers: bytes, bytearray or memoryview values to hash
+    @param digest_size: size in bytes of the returned digest
+
+    @returns: blake2 hash of the input buffers
+    @rtype: bytes
+    '''
+    if len(buffers) == 1:
+        return blake2b(buffers[0], digest_size=digest_size).digest()
+    h = blake2b(digest_size=digest_size)
+    for buffer in buffers:
+        h.update(buffer)
+    return h.digest()
+
+
+def blake2_hasher_new(*buffers, digest_size=32):
+    '''Create a new streaming blake2 hasher, optionally already fed with input buffers.
+
+    More buffers can be hashed using the hasher's update method,
+    its (binary) digest method returns the hash of all buffers fed so far,
+    and its copy method can be used to hash different data with a shared prefix.
+
+    @param buffers: bytes, bytearray or memoryview values to hash first
+    @param digest_size: size in bytes of the digest
+
+    @returns: blake2 hasher
+    @rtype: hashlib.blake2b
+    '''
+    h = blake2b(digest_size=digest_size)
+    for buffer in buffers:
+        h.update(buffer)
+    return h
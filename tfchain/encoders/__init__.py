@@ -1,26 +1,56 @@
-from .rivine import RivineBinaryObjectEncoderBase, RivineBinaryEncoder
-from .sia import SiaBinaryObjectEncoderBase, SiaBinaryEncoder
+from .rivine import RivineBinaryObjectEncoderBase, RivineBinaryEncoder, RivineBinarySizeEncoder, \
+    RivineBinaryStreamEncoder, RivineBinaryDecoder
+from .sia import SiaBinaryObjectEncoderBase, SiaBinaryEncoder, SiaBinarySizeEncoder, \
+    SiaBinaryStreamEncoder, SiaBinaryDecoder
 
 
 BaseRivineObjectEncoder = RivineBinaryObjectEncoderBase
 BaseSiaObjectEncoder = SiaBinaryObjectEncoderBase
 
 
-def encoder_rivine_get():
-    return RivineBinaryEncoder()
+def encoder_rivine_get(size=None):
+    return RivineBinaryEncoder(size=size)
 
 
-def encoder_sia_get():
-    return SiaBinaryEncoder()
+def encoder_sia_get(size=None):
+    return SiaBinaryEncoder(size=size)
+
+
+def encoder_rivine_stream_get(write, buffer_size=65536):
+    return RivineBinaryStreamEncoder(write, buffer_size=buffer_size)
+
+
+def encoder_sia_stream_get(write, buffer_size=65536):
+    return SiaBinaryStreamEncoder(write, buffer_size=buffer_size)
+
+
+def decoder_rivine_get(data):
+    return RivineBinaryDecoder(data)
+
+
+def decoder_sia_get(data):
+    return SiaBinaryDecoder(data)
+
+
+def rivine_encoded_size(*values):
+    e = RivineBinarySizeEncoder()
+    e.add_all(*values)
+    return e.size
+
+
+def sia_encoded_size(*values):
+    e = SiaBinarySizeEncoder()
+    e.add_all(*values)
+    return e.size
 
 
 def rivine_encode(*values):
-    e = encoder_rivine_get()
+    e = encoder_rivine_get(size=rivine_encoded_size(*values))
     e.add_all(*values)
     return e.data
 
 
 def sia_encode(*values):
-    e = encoder_sia_get()
+    e = encoder_sia_get(size=sia_encoded_size(*values))
     e.add_all(*values)
     return e.data
@@ -11,3 +11,10 @@ class SliceLengthOutOfRange(Exception):
     """
     SliceLengthOutOfRange error
     """
+
+
+class DecodeError(Exception):
+    """
+    DecodeError error, raised when binary data cannot be decoded,
+    because it is truncated, has trailing bytes or is otherwise invalid.
+    """
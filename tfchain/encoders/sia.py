@@ -1,4 +1,6 @@
-from .exceptions import IntegerOutOfRange, SliceLengthOutOfRange
+from struct import pack_into
+
+from .exceptions import IntegerOutOfRange, SliceLengthOutOfRange, DecodeError
 
 
 _INT_UPPERLIMIT = pow(2, 64) - 1
@@ -7,6 +9,8 @@ from abc import ABC, abstractmethod
 
 
 class SiaBinaryObjectEncoderBase(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def sia_binary_encode(self, encoder):
         """
@@ -21,24 +25,54 @@ class SiaBinaryObjectEncoderBase(ABC):
 class SiaBinaryEncoder:
     """
     Module implementing the siabin binary encoding,
-    for the purposes of creating signatures only.
+    used to create signatures, IDs and the binary encoding of objects.
+
+    Decoding of siabin-encoded data is supported by the SiaBinaryDecoder.
 
-    Decoding of siabin-encoded data is not supported,
-    and is out of scope for the siabin data encoding module.
+    If the size of the encoded data is known upfront (see SiaBinarySizeEncoder),
+    the encoder can be created with that size, in which case the buffer is allocated only once,
+    and all data is written directly into it.
 
     official specification can be found at
     https://github.com/threefoldtech/rivine/blob/18b19eac90f3cf9585a7ad4de4ecd612bee9c8e6/doc/encoding/SiaEncoding.md
     """
 
-    def __init__(self):
-        self._data = bytearray()
+    def __init__(self, size=None):
+        """
+        @param size: optional size of the encoded data, used to pre-allocate the buffer
+        """
+        self._data = bytearray(size or 0)
+        self._offset = 0
 
     @property
     def data(self):
+        if self._offset != len(self._data):
+            # less data was encoded than pre-allocated
+            del self._data[self._offset:]
         return self._data
 
     def reset(self):
         self._data = bytearray()
+        self._offset = 0
+
+    def _write(self, value):
+        """
+        Write bytes at the current offset, growing the buffer only if required.
+        """
+        end = self._offset + len(value)
+        self._data[self._offset:end] = value
+        self._offset = end
+
+    def _pack(self, format, size, value):
+        """
+        Write a value packed according to the given struct format at the current offset,
+        growing the buffer only if required.
+        """
+        end = self._offset + size
+        if end > len(self._data):
+            self._data += bytes(end - len(self._data))
+        pack_into(format, self._data, self._offset, value)
+        self._offset = end
 
     def add_int(self, value):
         """
@@ -55,7 +89,7 @@ class SiaBinaryEncoder:
         if value > _INT_UPPERLIMIT:
             raise IntegerOutOfRange(
                 "integer {} is out of upper range of {}".format(value, _INT_UPPERLIMIT))
-        self._data += value.to_bytes(8, byteorder='little')
+        self._pack('<Q', 8, value)
 
     def add_array(self, value):
         """
@@ -65,15 +99,13 @@ class SiaBinaryEncoder:
         @param value: the iterateble object to be siabin-encoded as an array
         """
         if isinstance(value, str):
-            self._data += value.encode('utf-8')
-        elif isinstance(value, (bytes, bytearray)):
-            self._data += value
+            self._write(value.encode('utf-8'))
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            self._write(value)
         else:
             try:
-                result = bytearray()
                 for element in value:
                     self.add(element)
-                return result
             except TypeError:
                 raise TypeError("value cannot be encoded as an array")
 
@@ -85,18 +117,40 @@ class SiaBinaryEncoder:
         @param value: the iterateble object to be siabin-encoded as a slice
         """
         if isinstance(value, str):
+            value = value.encode('utf-8')
             self.add_int(len(value))
-            self._data += value.encode('utf-8')
-        elif isinstance(value, (bytes, bytearray)):
+            self._write(value)
+        elif isinstance(value, (bytes, bytearray, memoryview)):
             self.add_int(len(value))
-            self._data += value
+            self._write(value)
         else:
-            length = 0
-            for _ in value:
-                length += 1
+            try:
+                length = len(value)
+            except TypeError:
+                # only iterate twice over iterables that do not know their length
+                value = list(value)
+                length = len(value)
             self.add_int(length)
             self.add_array(value)
 
+    def add_slice_encoded(self, encode, size=None):
+        """
+        Add a slice of which the content is encoded by the given function,
+        directly into this encoder, without encoding the content into an intermediate buffer first.
+
+        Unless given, the size of the content is computed upfront using a SiaBinarySizeEncoder,
+        as the length has to be encoded before the content.
+
+        @param encode: function that encodes the content of the slice, using the encoder it receives as its only argument
+        @param size: optional size of the encoded content
+        """
+        if size is None:
+            sizer = SiaBinarySizeEncoder()
+            encode(sizer)
+            size = sizer.size
+        self.add_int(size)
+        encode(self)
+
     def add_byte(self, value):
         """
         Add an encoded iterateble value as a single byte.
@@ -107,7 +161,7 @@ class SiaBinaryEncoder:
             if value < 0 or value > 255:
                 raise ValueError(
                     "byte overflow: invaid value of {}".format(value))
-            self._data += value.to_bytes(1, byteorder='little')
+            self._pack('B', 1, value)
         else:
             if isinstance(value, str):
                 value = value.encode('utf-8')
@@ -117,7 +171,62 @@ class SiaBinaryEncoder:
             if len(value) != 1:
                 raise ValueError(
                     "a single byte has to be accepted, amount of bytes given: {}".format(len(value)))
-            self._data += value
+            self._write(value)
+
+    # functions used to encode a value, keyed by the (concrete) type of the value,
+    # resolved on the first value of each type, see _type_encoder_resolve
+    _type_encoders = {}
+    # fast-path functions registered for specific types, see type_register
+    _type_encoders_registered = {}
+
+    @classmethod
+    def type_register(cls, value_type, encode):
+        """
+        Register a function used to siabin-encode all values of the given type,
+        when added using the add method, instead of the matching based on its python type.
+
+        Types that know their encoding can register it as a fast path,
+        no subclasses of the type are matched by the registration.
+        The function is also used by the SiaBinarySizeEncoder,
+        unless the type defines a sia_binary_encoded_size method.
+
+        @param value_type: the (concrete) type to register the function for
+        @param encode: function that encodes a value, called as encode(encoder, value)
+        """
+        if not isinstance(value_type, type):
+            raise TypeError("value_type has to be a class, not {}".format(type(value_type)))
+        if not callable(encode):
+            raise TypeError("encode has to be callable, {} is not".format(type(encode)))
+        SiaBinaryEncoder._type_encoders_registered[value_type] = encode
+        # forget the function resolved earlier for this type, by any encoder
+        SiaBinaryEncoder._type_encoders.pop(value_type, None)
+        SiaBinarySizeEncoder._type_encoders.pop(value_type, None)
+
+    @classmethod
+    def _type_encoder_resolve(cls, value_type):
+        """
+        Resolve the function used to siabin-encode values of the given type,
+        cached such that it is only resolved once per type.
+        """
+        encode = SiaBinaryEncoder._type_encoders_registered.get(value_type)
+        if encode is None:
+            # if the value implements the SiabinEncoder interface,
+            # we ignore the underlying type and use the custom-defined logic
+            # as provided by the SiabinEncoder object
+            if issubclass(value_type, SiaBinaryObjectEncoderBase):
+                encode = _add_object
+            # try to siabin-encode the value based on its python type
+            elif issubclass(value_type, bool):
+                encode = _add_bool
+            elif issubclass(value_type, int):
+                encode = SiaBinaryEncoder.add_int
+            elif issubclass(value_type, (str, bytes, bytearray, memoryview)):
+                encode = SiaBinaryEncoder.add_slice
+            else:
+                # try to siabin-encode the value as a slice
+                encode = _add_any
+        cls._type_encoders[value_type] = encode
+        return encode
 
     def add(self, value):
         """
@@ -129,27 +238,11 @@ class SiaBinaryEncoder:
 
         @param value: the value to be siabin-encoded
         """
-
-        # if the value implements the SiabinEncoder interface,
-        # we ignore the underlying type and use the custom-defined logic
-        # as provided by the SiabinEncoder object
-        if isinstance(value, SiaBinaryObjectEncoderBase):
-            value.sia_binary_encode(encoder=self)
-            return
-
-        # try to siabin-encode the value based on its python type
-        if isinstance(value, bool):
-            self._data += bytearray([1]) if value else bytearray([0])
-        elif isinstance(value, int):
-            self.add_int(value)
-        else:
-            # try to siabin-encode the value as a slice
-            try:
-                return self.add_slice(value)
-            except TypeError:
-                pass
-            raise ValueError(
-                "cannot siabin-encode value with unsupported type {}".format(type(value)))
+        try:
+            encode = self._type_encoders[type(value)]
+        except KeyError:
+            encode = self._type_encoder_resolve(type(value))
+        encode(self, value)
 
     def add_all(self, *values):
         """
@@ -162,3 +255,276 @@ class SiaBinaryEncoder:
         """
         for value in values:
             self.add(value)
+
+
+class SiaBinarySizeEncoder(SiaBinaryEncoder):
+    """
+    Encoder which computes the size of the siabin encoding of values,
+    without encoding (or storing) any of them. Used as the first phase
+    of a two-phase encoding, where the second phase encodes the values
+    into a buffer which is allocated with the exact size upfront.
+
+    Objects can define a sia_binary_encoded_size method, returning the size
+    of their encoding, in which case they are not encoded to compute it.
+    """
+
+    def __init__(self):
+        self._offset = 0
+
+    @property
+    def size(self):
+        """
+        The size of the siabin encoding of all values added so far.
+        """
+        return self._offset
+
+    @property
+    def data(self):
+        raise TypeError("a size encoder does not encode any data")
+
+    def reset(self):
+        self._offset = 0
+
+    def _write(self, value):
+        self._offset += len(value)
+
+    def _pack(self, format, size, value):
+        self._offset += size
+
+    def add_slice_encoded(self, encode, size=None):
+        # the length is always encoded as 8 bytes, no need to compute the content size first
+        self._offset += 8
+        if size is None:
+            encode(self)
+        else:
+            self._offset += size
+
+    # not shared with the SiaBinaryEncoder, as objects are not encoded to compute their size
+    _type_encoders = {}
+
+    @classmethod
+    def _type_encoder_resolve(cls, value_type):
+        if getattr(value_type, 'sia_binary_encoded_size', None) is not None:
+            cls._type_encoders[value_type] = _add_object_size
+            return _add_object_size
+        return super()._type_encoder_resolve(value_type)
+
+
+class SiaBinaryStreamEncoder(SiaBinaryEncoder):
+    """
+    Encoder which writes the siabin encoding of values to a sink, such as a hasher,
+    file or socket, instead of storing the entire encoding in a buffer.
+    Used to hash (or send) encoded data which is too large to keep in memory.
+
+    The encoded data is collected in a small buffer first,
+    and written each time that buffer is full, as well as when flush is called,
+    which is required once all values are added. Chunks are written as memoryviews
+    of that buffer, only valid during the call, bytes should be copied to be kept.
+    """
+
+    def __init__(self, write, buffer_size=65536):
+        """
+        @param write: function called with each encoded chunk, e.g. the update method of a hasher, the write method of a file or the sendall method of a socket
+        @param buffer_size: amount of encoded bytes to collect before they are written
+        """
+        if not callable(write):
+            raise TypeError("write has to be callable, {} is not".format(type(write)))
+        if not isinstance(buffer_size, int) or buffer_size <= 0:
+            raise ValueError("buffer_size has to be a positive integer, not {}".format(buffer_size))
+        super().__init__(size=buffer_size)
+        self._sink_write = write
+        self._buffer_size = buffer_size
+        self._written = 0
+
+    @property
+    def size(self):
+        """
+        The size of the siabin encoding of all values added so far, written or not.
+        """
+        return self._written + self._offset
+
+    @property
+    def data(self):
+        raise TypeError("a stream encoder does not keep the encoded data")
+
+    def reset(self):
+        """
+        Forget the encoded data which is not yet written, and reset the size.
+        """
+        self._offset = 0
+        self._written = 0
+
+    def flush(self):
+        """
+        Write all encoded data which is not yet written.
+        """
+        if self._offset == 0:
+            return
+        with memoryview(self._data) as view:
+            with view[:self._offset] as chunk:
+                self._sink_write(chunk)
+        self._written += self._offset
+        self._offset = 0
+
+    def _write(self, value):
+        if len(value) >= self._buffer_size:
+            # large values are written directly, without copying them into the buffer first
+            self.flush()
+            self._sink_write(value)
+            self._written += len(value)
+            return
+        end = self._offset + len(value)
+        self._data[self._offset:end] = value
+        self._offset = end
+        if end >= self._buffer_size:
+            self.flush()
+
+    def _pack(self, format, size, value):
+        end = self._offset + size
+        if end > len(self._data):
+            self._data += bytes(end - len(self._data))
+        pack_into(format, self._data, self._offset, value)
+        self._offset = end
+        if end >= self._buffer_size:
+            self.flush()
+
+
+def _add_object(encoder, value):
+    value.sia_binary_encode(encoder)
+
+
+def _add_object_size(encoder, value):
+    encoder._offset += value.sia_binary_encoded_size()
+
+
+def _add_bool(encoder, value):
+    encoder._pack('B', 1, 1 if value else 0)
+
+
+def _add_any(encoder, value):
+    try:
+        encoder.add_slice(value)
+    except TypeError:
+        raise ValueError(
+            "cannot siabin-encode value with unsupported type {}".format(type(value)))
+
+
+class SiaBinaryDecoder:
+    """
+    Module implementing the decoding of siabin-encoded data,
+    the inverse of the SiaBinaryEncoder.
+
+    The data is decoded from a memoryview, such that arrays and slices
+    are returned as views of the decoded data, without being copied.
+    Objects are decoded using the sia_binary_decode class method of their type.
+
+    official specification can be found at
+    https://github.com/threefoldtech/rivine/blob/18b19eac90f3cf9585a7ad4de4ecd612bee9c8e6/doc/encoding/SiaEncoding.md
+    """
+
+    def __init__(self, data):
+        """
+        @param data: the siabin-encoded data, any object supporting the buffer protocol (e.g. bytes, bytearray or memoryview)
+        """
+        self._view = memoryview(data).cast('B')
+        self._offset = 0
+
+    @property
+    def offset(self):
+        """
+        The amount of bytes decoded so far.
+        """
+        return self._offset
+
+    @property
+    def remaining(self):
+        """
+        The amount of bytes not yet decoded.
+        """
+        return len(self._view) - self._offset
+
+    def _take(self, length):
+        end = self._offset + length
+        if end > len(self._view):
+            raise DecodeError(
+                "cannot decode {} bytes at offset {}: only {} bytes remaining".format(length, self._offset, self.remaining))
+        view = self._view[self._offset:end]
+        self._offset = end
+        return view
+
+    def get_int(self):
+        """
+        Decode an integer, encoded as 8 bytes using little-endianness,
+        as specified by the siabin encoding specification.
+        """
+        return int.from_bytes(self._take(8), byteorder='little')
+
+    def get_bool(self):
+        """
+        Decode a boolean, encoded as a single byte.
+        """
+        value = self.get_byte()
+        if value > 1:
+            raise DecodeError("invalid boolean byte value {}".format(value))
+        return value == 1
+
+    def get_byte(self):
+        """
+        Decode a single byte, returned as an int.
+        """
+        return self._take(1)[0]
+
+    def get_array(self, length):
+        """
+        Decode a byte array of a fixed length, returned as a memoryview.
+
+        @param length: the (known) amount of bytes of the array
+        """
+        return self._take(length)
+
+    def get_slice(self):
+        """
+        Decode a byte slice, prefixed with its length, returned as a memoryview.
+        """
+        return self._take(self.get_int())
+
+    def get(self, type):
+        """
+        Decode an object of the given type, which has to define
+        a sia_binary_decode class method.
+
+        @param type: the type of the object to decode
+        """
+        return type.sia_binary_decode(self)
+
+    def get_all(self, *types):
+        """
+        Decode objects of the given types, one after another, returned as a list.
+
+        @param types: the types of the objects to decode
+        """
+        return [self.get(type) for type in types]
+
+    def get_object_array(self, type, length):
+        """
+        Decode a fixed amount of objects of the same type, returned as a list.
+
+        @param type: the type of the objects to decode
+        @param length: the (known) amount of objects
+        """
+        return [type.sia_binary_decode(self) for _ in range(length)]
+
+    def get_object_slice(self, type):
+        """
+        Decode a slice of objects of the same type, prefixed with its length, returned as a list.
+
+        @param type: the type of the objects to decode
+        """
+        return self.get_object_array(type, self.get_int())
+
+    def end(self):
+        """
+        Ensure all data was decoded, raising a DecodeError if bytes are remaining.
+        """
+        if self._offset != len(self._view):
+            raise DecodeError("{} bytes remaining after decoding".format(self.remaining))
@@ -0,0 +1,276 @@
+"""
+Health tracking of explorer addresses, used by the explorer client(s)
+to prefer the fastest healthy explorer and to stop hitting failing ones.
+"""
+
+import math
+import random
+import threading
+import time
+from collections import deque
+
+
+class ExplorerState:
+    """
+    Circuit breaker states of an explorer address.
+    """
+
+    # requests are allowed
+    CLOSED = 'closed'
+    # the explorer failed too many times in a row, and is only used as a last resort
+    OPEN = 'open'
+    # the explorer is being probed, to see if it can be closed again
+    HALF_OPEN = 'half-open'
+
+
+class _AddressHealth:
+    """
+    Health statistics of a single explorer address.
+    """
+
+    def __init__(self, latency_window):
+        self.state = ExplorerState.CLOSED
+        self.latency = None
+        self.latencies = deque(maxlen=latency_window)
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.opened_at = None
+        self.trips = 0
+
+    def snapshot(self):
+        return {
+            'state': self.state,
+            'latency': self.latency,
+            'requests': self.requests,
+            'successes': self.successes,
+            'failures': self.failures,
+            'consecutive_failures': self.consecutive_failures,
+            'last_error': self.last_error,
+            'trips': self.trips,
+        }
+
+
+class ExplorerHealthTracker:
+    """
+    Tracks per explorer address an exponentially weighted moving average (EWMA)
+    of the latency of its successful requests, its error counts and its circuit breaker state.
+
+    An explorer which fails failure_threshold times in a row is tripped (its circuit is opened),
+    after which it is only used when no other explorer is available,
+    except for a single probe request every probe_interval seconds,
+    which closes its circuit again if it succeeds.
+    """
+
+    def __init__(self, alpha=0.3, failure_threshold=3, probe_interval=30.0, latency_window=100, clock=None):
+        """
+        @param alpha: weight (0, 1] of a new latency sample in the latency EWMA
+        @param failure_threshold: amount of consecutive failures which trip an explorer
+        @param probe_interval: seconds to wait before a tripped explorer is probed
+        @param latency_window: amount of most recent latencies kept per explorer, used for percentiles
+        @param clock: function returning the current time in seconds, time.monotonic by default
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha has to be within the range (0, 1], {} is invalid".format(alpha))
+        if not isinstance(failure_threshold, int) or failure_threshold < 1:
+            raise ValueError("failure threshold has to be a positive integer, not {}".format(failure_threshold))
+        self._alpha = alpha
+        self._failure_threshold = failure_threshold
+        self._probe_interval = probe_interval
+        self._latency_window = latency_window
+        self._clock = time.monotonic if clock is None else clock
+        self._addresses = {}
+        self._lock = threading.Lock()
+
+    def clock(self):
+        """
+        The current time in seconds, as used to measure latencies and probe intervals.
+        """
+        return self._clock()
+
+    def order(self, addresses):
+        """
+        Order the given addresses in the order they should be tried:
+        tripped explorers due for a probe first (one probe at a time per explorer),
+        followed by all healthy explorers from fastest to slowest
+        (explorers without known latency first, in random order),
+        and finally all other tripped explorers.
+
+        @param addresses: list of explorer addresses
+        """
+        now = self._clock()
+        probes, healthy, tripped = [], [], []
+        with self._lock:
+            for address in addresses:
+                health = self._health_get(address)
+                if health.state == ExplorerState.CLOSED:
+                    healthy.append((health.latency or 0.0, random.random(), address))
+                elif now - health.opened_at >= self._probe_interval:
+                    # (re)start probing, a probe which did not complete is retried after another interval
+                    health.state = ExplorerState.HALF_OPEN
+                    health.opened_at = now
+                    probes.append(address)
+                else:
+                    tripped.append(address)
+        healthy.sort()
+        return probes + [address for (_, _, address) in healthy] + tripped
+
+    def healthy(self, addresses):
+        """
+        The given addresses of the healthy explorers (of which the circuit is closed),
+        from fastest to slowest (explorers without known latency first, in the given order).
+        Unlike order, this does not start probing any tripped explorer.
+
+        @param addresses: list of explorer addresses
+        """
+        healthy = []
+        with self._lock:
+            for address in addresses:
+                health = self._addresses.get(address)
+                if health is None or health.state == ExplorerState.CLOSED:
+                    healthy.append((0.0 if health is None else (health.latency or 0.0), address))
+        healthy.sort(key=lambda pair: pair[0])
+        return [address for (_, address) in healthy]
+
+    def success(self, address, latency):
+        """
+        Record a successful request (the explorer answered).
+
+        @param address: explorer address
+        @param latency: duration of the request in seconds
+        """
+        with self._lock:
+            health = self._health_get(address)
+            health.requests += 1
+            health.successes += 1
+            health.consecutive_failures = 0
+            health.state = ExplorerState.CLOSED
+            health.opened_at = None
+            health.latencies.append(latency)
+            if health.latency is None:
+                health.latency = latency
+            else:
+                health.latency += self._alpha * (latency - health.latency)
+
+    def failure(self, address, error=None):
+        """
+        Record a failed request (the explorer was not available or had an internal error).
+
+        @param address: explorer address
+        @param error: optional error that caused the failure
+        """
+        with self._lock:
+            health = self._health_get(address)
+            health.requests += 1
+            health.failures += 1
+            health.consecutive_failures += 1
+            if error is not None:
+                health.last_error = str(error)
+            if health.state == ExplorerState.HALF_OPEN or (
+                    health.state == ExplorerState.CLOSED and
+                    health.consecutive_failures >= self._failure_threshold):
+                health.state = ExplorerState.OPEN
+                health.opened_at = self._clock()
+                health.trips += 1
+
+    def latency_percentile(self, address, percentile):
+        """
+        The given percentile of the most recent latencies of an explorer,
+        None if no latency was recorded yet for that explorer.
+
+        @param address: explorer address
+        @param percentile: percentile within the range (0, 100]
+        """
+        if not 0 < percentile <= 100:
+            raise ValueError("percentile has to be within the range (0, 100], {} is invalid".format(percentile))
+        with self._lock:
+            health = self._addresses.get(address)
+            if health is None or not health.latencies:
+                return None
+            latencies = sorted(health.latencies)
+        return latencies[max(0, math.ceil(percentile / 100 * len(latencies)) - 1)]
+
+    def snapshot(self):
+        """
+        The health statistics of all explorer addresses seen so far,
+        as a dict of plain dicts, keyed by address.
+        """
+        with self._lock:
+            return {address: health.snapshot() for (address, health) in self._addresses.items()}
+
+    def _health_get(self, address):
+        health = self._addresses.get(address)
+        if health is None:
+            health = _AddressHealth(self._latency_window)
+            self._addresses[address] = health
+        return health
+
+
+class ExplorerHedgingPolicy:
+    """
+    Policy to hedge explorer GET requests: when the first explorer did not answer
+    within a delay, based on a percentile of its recent latencies, the same request
+    is sent to a second explorer, and the first response is used.
+
+    Keeps track of how often hedge requests were fired and how often they won.
+    """
+
+    def __init__(self, percentile=95, min_delay=0.01, max_delay=2.0, default_delay=1.0, max_workers=16):
+        """
+        @param percentile: percentile (0, 100] of the latencies of the first explorer used as hedge delay
+        @param min_delay: minimum hedge delay in seconds
+        @param max_delay: maximum hedge delay in seconds
+        @param default_delay: hedge delay in seconds used for an explorer without known latencies
+        @param max_workers: maximum amount of threads used to do hedged requests
+        """
+        if not 0 < percentile <= 100:
+            raise ValueError("percentile has to be within the range (0, 100], {} is invalid".format(percentile))
+        if not 0 <= min_delay <= max_delay:
+            raise ValueError("hedge delays have to satisfy 0 <= min_delay <= max_delay")
+        self._percentile = percentile
+        self._min_delay = min_delay
+        self._max_delay = max_delay
+        self._default_delay = default_delay
+        self._max_workers = max_workers
+        self._fired = 0
+        self._won = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_workers(self):
+        return self._max_workers
+
+    def delay(self, health, address):
+        """
+        The delay in seconds after which a request to the given explorer is hedged.
+
+        @param health: ExplorerHealthTracker which tracks the latencies of the explorer
+        @param address: address of the explorer the request is sent to first
+        """
+        latency = health.latency_percentile(address, self._percentile)
+        if latency is None:
+            latency = self._default_delay
+        return min(self._max_delay, max(self._min_delay, latency))
+
+    def fired(self):
+        """
+        Record that a hedge request was fired.
+        """
+        with self._lock:
+            self._fired += 1
+
+    def won(self):
+        """
+        Record that a hedge request answered before the original request.
+        """
+        with self._lock:
+            self._won += 1
+
+    def snapshot(self):
+        """
+        The hedging counters, as a plain dict.
+        """
+        with self._lock:
+            return {'fired': self._fired, 'won': self._won}
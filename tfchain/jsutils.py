@@ -3,7 +3,6 @@ import random
 from datetime import datetime, timedelta
 import time
 from functools import reduce
-import traceback
 import struct
 import json
 
@@ -60,6 +59,9 @@ def printdelta():
     where you want to print out a timestamp, together with the source code line
     """
 
+    # imported here, as it is only used for debugging
+    import traceback
+
     global LASTTIME, DELTATIME_INITIALIZED
     currenttime = time.time()
     if DELTATIME_INITIALIZED:
@@ -660,11 +662,75 @@ class Encoder(object):
         return kls
 
 
-def json_dumps(self, obj, sort_keys=False, indent=False, encoding='ascii'):
-    return json_dumps(obj, ensure_ascii=False, sort_keys=sort_keys, indent=indent, cls=Encoder.get(encoding=encoding))
+def json_dumps(obj, sort_keys=False, indent=False, encoding='ascii'):
+    return json.dumps(obj, ensure_ascii=False, sort_keys=sort_keys, indent=indent or None, cls=Encoder.get(encoding=encoding))
 
 
-def json_loads(self, s):
-    if isinstance(s, bytes):
+def _json_loads_std(s):
+    if isinstance(s, (bytes, bytearray)):
         s = s.decode('utf-8')
-    return json_loads(s)
+    return json.loads(s)
+
+
+def _json_loads_fast_new(loads):
+    def json_loads_fast(s):
+        try:
+            return loads(s)
+        except ValueError:
+            # fast backends only support 64-bit integers,
+            # the std backend decodes any valid JSON (or raises a proper error)
+            return _json_loads_std(s)
+    return json_loads_fast
+
+
+def _json_loads_auto(s):
+    # the backend is selected on first use, as importing it can take a while
+    json_backend_set()
+    return _json_loads(s)
+
+
+_JSON_BACKENDS = ('orjson', 'ujson', 'json')
+_json_backend = None
+_json_loads = _json_loads_auto
+
+
+def json_backend_set(name=None):
+    """
+    Select the backend used by json_loads to decode JSON.
+
+    @param name: orjson, ujson or json (the std library module),
+                 if None the fastest installed backend is selected
+    """
+    global _json_backend, _json_loads
+    if name is None:
+        for name in _JSON_BACKENDS:
+            try:
+                json_backend_set(name)
+                return
+            except ImportError:
+                pass
+    if name not in _JSON_BACKENDS:
+        raise ValueError("JSON backend {} is not supported, expected one of {}".format(name, _JSON_BACKENDS))
+    if name == 'json':
+        loads = _json_loads_std
+    else:
+        loads = _json_loads_fast_new(__import__(name).loads)
+    _json_backend = name
+    _json_loads = loads
+
+
+def json_backend_get():
+    """
+    The name of the backend used by json_loads to decode JSON.
+    """
+    if _json_backend is None:
+        json_backend_set()
+    return _json_backend
+
+
+def json_loads(s):
+    """
+    Decode a JSON-encoded str, bytes or bytearray value,
+    using the backend selected with json_backend_set.
+    """
+    return _json_loads(s)
@@ -4,9 +4,9 @@ from tfchain.types.ConditionTypes import ConditionBaseClass
 from tfchain.types.CryptoTypes import PublicKey
 from tfchain.types.PrimitiveTypes import Hash
 from tfchain.types.ThreeBot import BotName
-from tfchain.TFChainClient import ThreeBotRecord
-from tfchain.jsutils import generateXByteID
-from tfchain.errors import *  # FIXME
+from tfchain.TransactionFactory import TransactionFactory
+from tfchain.jsutils import generateXByteID, json_dumps
+from tfchain import errors
 
 
 class TFChainExplorerGetClientStub:
@@ -83,12 +83,12 @@ class TFChainExplorerGetClientStub:
         if match:
             transactionid = str(
                 Hash(value=generateXByteID(Hash.SIZE)))
-            transaction = j.clients.tfchain.types.transactions.from_json(data)
+            transaction = TransactionFactory().from_json(data)
             # ensure all coin outputs and block stake outputs have identifiers set
-            for idx, co in enumerate(transaction.coin_outputs):
-                co.id = transaction.coin_outputid_new(idx)
-            for idx, bso in enumerate(transaction.blockstake_outputs):
-                bso.id = transaction.blockstake_outputid_new(idx)
+            for co, id in zip(transaction.coin_outputs, transaction.coin_outputids()):
+                co.id = id
+            for bso, id in zip(transaction.blockstake_outputs, transaction.blockstake_outputids()):
+                bso.id = id
             self._posted_transactions[transactionid] = transaction
             return '{"transactionid":"%s"}' % (str(transactionid))
         raise Exception("invalid endpoint {}".format(endpoint))
@@ -138,6 +138,8 @@ class TFChainExplorerGetClientStub:
         """
         Add a block response to the stub explorer at the given height.
         """
+        # FIXME: the TFChainClient (and its ThreeBotRecord) is not ported yet
+        from tfchain.TFChainClient import ThreeBotRecord
         assert isinstance(record, ThreeBotRecord)
         if not force and record.identifier in self._threebot_records:
             raise KeyError(
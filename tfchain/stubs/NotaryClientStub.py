@@ -1,4 +1,3 @@
-from Jumpscale import j
 from io import BytesIO
 from tfchain.crypto.utils import blake2_string
 
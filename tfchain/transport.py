@@ -0,0 +1,303 @@
+"""
+HTTP transport used by the TFChain explorer client(s).
+
+Connections are kept alive (HTTP/1.1) and pooled per explorer address,
+such that many (small) explorer requests do not each pay for a TCP (and TLS) handshake.
+"""
+
+import gzip
+import http.client
+import threading
+import zlib
+from urllib.parse import urlsplit
+
+
+class HTTPError(Exception):
+    """
+    HTTPError error, raised when an HTTP request failed,
+    either with an error status code, or because no (valid) response was received at all,
+    in which case the status_code is None.
+    """
+
+    def __init__(self, msg, status_code=None, url=None):
+        super().__init__("{} (code: {}): {}".format(url, status_code, msg))
+        self._msg = msg
+        self._status_code = status_code
+        self._url = url
+
+    @property
+    def msg(self):
+        """
+        The error message, the response body in case an error status code was returned.
+        """
+        return self._msg
+
+    @property
+    def status_code(self):
+        """
+        The returned HTTP status code, None if no response was received.
+        """
+        return self._status_code
+
+    @property
+    def url(self):
+        """
+        The URL of the failed request.
+        """
+        return self._url
+
+
+class HttpResponse:
+    """
+    A completely read (and decoded) HTTP response.
+    """
+
+    def __init__(self, status_code, headers, body):
+        self._status_code = status_code
+        self._headers = headers
+        self._body = body
+
+    @property
+    def status_code(self):
+        """
+        The HTTP status code of the response.
+        """
+        return self._status_code
+
+    @property
+    def headers(self):
+        """
+        The headers of the response, as a dict with lower case keys.
+        """
+        return self._headers
+
+    @property
+    def body(self):
+        """
+        The body of the response, as bytes, decompressed if it was gzip-encoded.
+        """
+        return self._body
+
+
+class _ConnectionPool:
+    """
+    Pool of persistent connections to a single (scheme, host, port) address,
+    limiting the amount of connections that can be in use at once.
+    """
+
+    def __init__(self, scheme, host, port, size, connect_timeout, read_timeout):
+        self._scheme = scheme
+        self._host = host
+        self._port = port
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(size)
+        self._created = 0
+
+    @property
+    def created(self):
+        """
+        Total amount of connections created by this pool.
+        """
+        return self._created
+
+    def acquire(self):
+        """
+        Acquire a connection, reusing an idle connection if there is one,
+        blocking as long as all connections of this pool are in use.
+
+        Returns a (connection, reused) tuple.
+        """
+        self._semaphore.acquire()
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        try:
+            return self._connection_new(), False
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def release(self, conn, reuse=True):
+        """
+        Release an acquired connection, returning it to the pool if it can be reused.
+        """
+        try:
+            if reuse and conn.sock is not None:
+                with self._lock:
+                    self._idle.append(conn)
+            else:
+                conn.close()
+        finally:
+            self._semaphore.release()
+
+    def close(self):
+        """
+        Close all idle connections.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _connection_new(self):
+        if self._scheme == 'https':
+            conn = http.client.HTTPSConnection(self._host, self._port, timeout=self._connect_timeout)
+        else:
+            conn = http.client.HTTPConnection(self._host, self._port, timeout=self._connect_timeout)
+        # connect explicitly, such that the (longer) read timeout
+        # can be applied once the connection is established
+        conn.connect()
+        conn.sock.settimeout(self._read_timeout)
+        with self._lock:
+            self._created += 1
+        return conn
+
+
+# methods which can safely be sent again when it is unknown whether the server received them
+_IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD'))
+
+
+class HttpTransport:
+    """
+    HTTP/1.1 transport, keeping a bounded pool of persistent connections per address.
+
+    Any object with a compatible request method can be used as transport by the explorer client,
+    which is how the client can be tested without a network.
+    """
+
+    def __init__(self, pool_size=4, connect_timeout=5.0, read_timeout=30.0):
+        """
+        @param pool_size: maximum amount of connections (in use or idle) per address
+        @param connect_timeout: timeout in seconds to establish a connection
+        @param read_timeout: timeout in seconds for any single read from an established connection
+        """
+        if not isinstance(pool_size, int) or pool_size < 1:
+            raise ValueError("pool size has to be a positive integer, not {}".format(pool_size))
+        self._pool_size = pool_size
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    @property
+    def connect_timeout(self):
+        return self._connect_timeout
+
+    @property
+    def read_timeout(self):
+        return self._read_timeout
+
+    def get(self, url, headers=None):
+        """
+        GET the resource at the given URL.
+
+        @param url: full URL of the resource
+        @param headers: optional dict of extra request headers
+        """
+        return self.request('GET', url, headers=headers)
+
+    def post(self, url, data, headers=None):
+        """
+        POST data to the given URL.
+
+        @param url: full URL to post to
+        @param data: bytes to post
+        @param headers: optional dict of extra request headers
+        """
+        return self.request('POST', url, data=data, headers=headers)
+
+    def request(self, method, url, data=None, headers=None):
+        """
+        Do an HTTP request, over a pooled connection.
+
+        Returns an HttpResponse for any 1xx-3xx status code,
+        raises an HTTPError for any 4xx-5xx status code or when no (valid) response could be received.
+
+        A request sent over a reused connection which turns out to be closed by the server
+        is only retried over a new connection for idempotent methods (GET and HEAD),
+        or when the request could not be (completely) sent, such that data is never posted twice.
+
+        @param method: HTTP method, e.g. 'GET' or 'POST'
+        @param url: full URL of the resource
+        @param data: optional request body as bytes
+        @param headers: optional dict of extra request headers
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError("invalid URL {}: only absolute http(s) URLs are supported".format(url))
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        all_headers = {'Accept-Encoding': 'gzip'}
+        if headers:
+            all_headers.update(headers)
+        pool = self._pool_get(parts.scheme, parts.hostname, parts.port)
+
+        while True:
+            try:
+                conn, reused = pool.acquire()
+            except (OSError, http.client.HTTPException) as e:
+                raise HTTPError(str(e), url=url) from e
+            sent = False
+            try:
+                conn.request(method, path, body=data, headers=all_headers)
+                sent = True
+                resp = conn.getresponse()
+                body = resp.read()
+            except (ConnectionError, http.client.BadStatusLine) as e:
+                pool.release(conn, reuse=False)
+                if reused and (not sent or method in _IDEMPOTENT_METHODS):
+                    # the server closed the idle connection, retry over a new one
+                    continue
+                raise HTTPError(str(e), url=url) from e
+            except (OSError, http.client.HTTPException) as e:
+                # includes socket.timeout
+                pool.release(conn, reuse=False)
+                raise HTTPError(str(e), url=url) from e
+            except BaseException:
+                pool.release(conn, reuse=False)
+                raise
+            pool.release(conn, reuse=not resp.will_close)
+            break
+
+        resp_headers = {key.lower(): value for (key, value) in resp.getheaders()}
+        if resp_headers.get('content-encoding', '').lower() == 'gzip':
+            try:
+                body = gzip.decompress(body)
+            except (OSError, EOFError, zlib.error) as e:
+                raise HTTPError("invalid gzip-encoded response body: {}".format(e), url=url) from e
+        if resp.status >= 400:
+            raise HTTPError(body, status_code=resp.status, url=url)
+        return HttpResponse(resp.status, resp_headers, body)
+
+    def connections_created(self, url):
+        """
+        Amount of connections created so far for the address of the given URL.
+        """
+        parts = urlsplit(url)
+        with self._lock:
+            pool = self._pools.get((parts.scheme, parts.hostname, parts.port))
+        return 0 if pool is None else pool.created
+
+    def close(self):
+        """
+        Close all idle connections of this transport.
+        """
+        with self._lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.close()
+
+    def _pool_get(self, scheme, host, port):
+        key = (scheme, host, port)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = _ConnectionPool(
+                    scheme, host, port, self._pool_size,
+                    self._connect_timeout, self._read_timeout)
+                self._pools[key] = pool
+            return pool
@@ -2,8 +2,6 @@
 AtomicSwap Types.
 """
 
-from Jumpscale import j
-
 import hashlib
 
 from datetime import datetime
@@ -1,5 +1,6 @@
 from abc import abstractmethod, abstractclassmethod
-from tfchain.encoders import BaseRivineObjectEncoder, BaseSiaObjectEncoder
+from tfchain.encoders import BaseRivineObjectEncoder, BaseSiaObjectEncoder, decoder_rivine_get, decoder_sia_get, \
+    rivine_encoded_size, sia_encoded_size
 
 
 class BaseDataTypeClass(BaseSiaObjectEncoder, BaseRivineObjectEncoder):
@@ -7,10 +8,61 @@ class BaseDataTypeClass(BaseSiaObjectEncoder, BaseRivineObjectEncoder):
     Base type defines the type all TFChain data types inheret from.
     """
 
+    __slots__ = ()
+
     @abstractclassmethod
     def from_json(cls, obj):
         pass
 
+    @classmethod
+    def from_binary(cls, data, encoding='sia'):
+        """
+        Create an object of this type from its binary encoding,
+        the inverse of its sia_binary_encode/rivine_binary_encode method.
+
+        @param data: the encoded object, as bytes, bytearray or memoryview (which is not copied)
+        @param encoding: the encoding used, 'sia' or 'rivine'
+        """
+        if encoding == 'sia':
+            decoder = decoder_sia_get(data)
+        elif encoding == 'rivine':
+            decoder = decoder_rivine_get(data)
+        else:
+            raise ValueError("{} is not a valid binary encoding (expected: sia or rivine)".format(encoding))
+        obj = decoder.get(cls)
+        decoder.end()
+        return obj
+
+    def encoded_size(self, encoding='sia'):
+        """
+        The size of the binary encoding of this object.
+
+        Types can define a sia_binary_encoded_size/rivine_binary_encoded_size method
+        to compute it directly, all other objects are encoded by a size encoder,
+        which only counts the bytes of the encoding.
+
+        @param encoding: the encoding used, 'sia' or 'rivine'
+        """
+        if encoding == 'sia':
+            return sia_encoded_size(self)
+        if encoding == 'rivine':
+            return rivine_encoded_size(self)
+        raise ValueError("{} is not a valid binary encoding (expected: sia or rivine)".format(encoding))
+
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Decode an object of this type according to the Sia Binary Encoding format.
+        """
+        raise NotImplementedError("{} does not support Sia binary decoding".format(cls.__name__))
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Decode an object of this type according to the Rivine Binary Encoding format.
+        """
+        raise NotImplementedError("{} does not support Rivine binary decoding".format(cls.__name__))
+
     @abstractmethod
     def json(self):
         pass
@@ -1,10 +1,13 @@
-from Jumpscale import j
-
 import hashlib
+import weakref
+import contextvars
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from tfchain.encoders import encoder_rivine_get, encoder_sia_get, sia_encode, rivine_encode
+from tfchain.encoders import encoder_rivine_get, encoder_sia_get, decoder_rivine_get, decoder_sia_get, sia_encode, rivine_encode, \
+    SiaBinarySizeEncoder, RivineBinarySizeEncoder
+from tfchain.encoders.rivine import slice_length_size
 from tfchain.crypto import MerkleTree
-from tfchain.crypto.utils import blake2_string
+from tfchain.crypto.utils import blake2_hash
 from tfchain.types.PrimitiveTypes import BinaryData, Hash
 from tfchain.jsutils import duration, jsdatetime, jstime
 
@@ -17,12 +20,42 @@ _CONDITION_TYPE_ATOMIC_SWAP = 2
 _CONDITION_TYPE_LOCKTIME = 3
 _CONDITION_TYPE_MULTI_SIG = 4
 
+# False while decoding JSON from a trusted source, see trusted_json_decoding
+_unlockhash_checksum_verification = contextvars.ContextVar('unlockhash_checksum_verification', default=True)
+
+
+@contextmanager
+def trusted_json_decoding(trusted=True):
+    """
+    Context in which JSON is decoded from a trusted source (e.g. your own explorer node),
+    skipping the verification of the checksum of unlock hashes decoded using UnlockHash.from_json.
+    Checksums are verified by default, never use this context for user input.
+
+    @param trusted: if False, checksums are verified within the context (as they are by default)
+    """
+    token = _unlockhash_checksum_verification.set(not trusted)
+    try:
+        yield
+    finally:
+        _unlockhash_checksum_verification.reset(token)
+
+
 class ConditionFactory:
     """
     Condition Factory class
     """
 
-    def from_json(self, obj):
+    def from_json(self, obj, trusted=False):
+        """
+        Create a condition, of any type, from its JSON encoding.
+
+        @param obj: the JSON-decoded condition
+        @param trusted: if True the JSON comes from a trusted source,
+                        and the checksum of the unlock hashes it contains is not verified (see trusted_json_decoding)
+        """
+        if trusted:
+            with trusted_json_decoding():
+                return self.from_json(obj)
         ct = obj.get('type', 0)
         if ct == _CONDITION_TYPE_NIL:
             return ConditionNil.from_json(obj)
@@ -36,6 +69,15 @@ class ConditionFactory:
             return ConditionMultiSignature.from_json(obj)
         raise ValueError("unsupport condition type {}".format(ct))
 
+    def from_binary(self, data, encoding='sia'):
+        """
+        Create a condition, of any type, from its binary encoding.
+
+        @param data: the encoded condition, as bytes, bytearray or memoryview (which is not copied)
+        @param encoding: the encoding used, 'sia' or 'rivine'
+        """
+        return ConditionBaseClass.from_binary(data, encoding=encoding)
+
     def from_recipient(self, recipient, lock=None):
         """
         Create automatically a recipient condition based on any accepted pythonic value (combo).
@@ -201,6 +243,37 @@ class ConditionBaseClass(BaseDataTypeClass):
         ff.from_json_data_object(obj.get('data', {}))
         return ff
 
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Decode a Condition according to the Sia Binary Encoding format,
+        of any type if called on the ConditionBaseClass itself.
+        """
+        condition = cls._binary_decode_new(decoder.get_byte())
+        data_dec = decoder_sia_get(decoder.get_slice())
+        condition.sia_binary_decode_data(data_dec)
+        data_dec.end()
+        return condition
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Decode a Condition according to the Rivine Binary Encoding format,
+        of any type if called on the ConditionBaseClass itself.
+        """
+        condition = cls._binary_decode_new(decoder.get_int8())
+        data_dec = decoder_rivine_get(decoder.get_slice())
+        condition.rivine_binary_decode_data(data_dec)
+        data_dec.end()
+        return condition
+
+    @classmethod
+    def _binary_decode_new(cls, ct):
+        condition = _condition_new(ct)
+        if not isinstance(condition, cls):
+            raise ValueError("condition is expected to be of type {}, not {}".format(cls.__name__, ct))
+        return condition
+
     @property
     @abstractmethod
     def type(self):
@@ -244,27 +317,71 @@ class ConditionBaseClass(BaseDataTypeClass):
     def sia_binary_encode_data(self, encoder):
         pass
 
+    def sia_binary_encoded_data_size(self):
+        """
+        The size of the data of this Condition, when encoded according to the Sia Binary Encoding format.
+        """
+        e = SiaBinarySizeEncoder()
+        self.sia_binary_encode_data(e)
+        return e.size
+
     def sia_binary_encode(self, encoder):
         """
         Encode this Condition according to the Sia Binary Encoding format.
         """
         encoder.add_array(bytearray([int(self.type)]))
-        data_enc = encoder_sia_get()
-        self.sia_binary_encode_data(data_enc)
-        encoder.add_slice(data_enc.data)
+        encoder.add_slice_encoded(self.sia_binary_encode_data, size=self.sia_binary_encoded_data_size())
+
+    def sia_binary_encoded_size(self):
+        return 1 + 8 + self.sia_binary_encoded_data_size()
 
     @abstractmethod
     def rivine_binary_encode_data(self, encoder):
         pass
     
+    def rivine_binary_encoded_data_size(self):
+        """
+        The size of the data of this Condition, when encoded according to the Rivine Binary Encoding format.
+        """
+        e = RivineBinarySizeEncoder()
+        self.rivine_binary_encode_data(e)
+        return e.size
+
     def rivine_binary_encode(self, encoder):
         """
         Encode this Condition according to the Rivine Binary Encoding format.
         """
         encoder.add_int8(int(self.type))
-        data_enc = encoder_rivine_get()
-        self.rivine_binary_encode_data(data_enc)
-        encoder.add_slice(data_enc.data)
+        encoder.add_slice_encoded(self.rivine_binary_encode_data, size=self.rivine_binary_encoded_data_size())
+
+    def rivine_binary_encoded_size(self):
+        size = self.rivine_binary_encoded_data_size()
+        return 1 + slice_length_size(size) + size
+
+    @abstractmethod
+    def sia_binary_decode_data(self, decoder):
+        pass
+
+    @abstractmethod
+    def rivine_binary_decode_data(self, decoder):
+        pass
+
+
+def _condition_new(ct):
+    """
+    Create a new (empty) condition of the given type.
+    """
+    if ct == _CONDITION_TYPE_NIL:
+        return ConditionNil()
+    if ct == _CONDITION_TYPE_UNLOCK_HASH:
+        return ConditionUnlockHash()
+    if ct == _CONDITION_TYPE_ATOMIC_SWAP:
+        return ConditionAtomicSwap()
+    if ct == _CONDITION_TYPE_LOCKTIME:
+        return ConditionLockTime()
+    if ct == _CONDITION_TYPE_MULTI_SIG:
+        return ConditionMultiSignature()
+    raise ValueError("unsupport condition type {}".format(ct))
 
 
 from enum import IntEnum
@@ -291,6 +408,17 @@ class UnlockHash(BaseDataTypeClass):
     """
     An UnlockHash is a specially constructed hash of the UnlockConditions type,
     with a fixed binary length of 33 and a fixed string length of 78 (string version includes a checksum).
+
+    The string version and checksum are computed only once, and recomputed
+    only when the type or hash is changed using its property setters.
+
+    Unlock hashes decoded from a string using from_json are interned,
+    meaning that decoding the same string again returns the same (immutable) instance,
+    for as long as that instance is in use.
+
+    The checksum of a decoded string is not verified within a trusted_json_decoding context.
+    Unlock hashes decoded that way are interned separately, such that they are never returned
+    when decoding the same string (from an untrusted source) again outside of that context.
     """
 
     _TYPE_SIZE_HEX = 2
@@ -300,7 +428,15 @@ class UnlockHash(BaseDataTypeClass):
     _HASH_SIZE_HEX = (_HASH_SIZE*2)
     _TOTAL_SIZE_HEX = _TYPE_SIZE_HEX + _CHECKSUM_SIZE_HEX + _HASH_SIZE_HEX
 
+    # interned unlock hashes, mapped by the string they were decoded from
+    _INTERNED = weakref.WeakValueDictionary()
+    # interned unlock hashes of which the checksum was not verified
+    _INTERNED_TRUSTED = weakref.WeakValueDictionary()
+
     def __init__(self, type=None, hash=None):
+        self._frozen = False
+        self._str = None
+        self._checksum_value = None
         self._type = UnlockHashType.NIL
         self.type = type
         self._hash = Hash()
@@ -310,25 +446,55 @@ class UnlockHash(BaseDataTypeClass):
     def from_json(cls, obj):
         if not isinstance(obj, str):
             raise TypeError("UnlockHash is expected to be JSON-encoded as an str, not {}".format(type(obj)))
+        verify = _unlockhash_checksum_verification.get()
+        if cls is UnlockHash:
+            uh = UnlockHash._INTERNED.get(obj)
+            if uh is None and not verify:
+                uh = UnlockHash._INTERNED_TRUSTED.get(obj)
+            if uh is not None:
+                return uh
         if len(obj) != UnlockHash._TOTAL_SIZE_HEX:
             raise ValueError("UnlockHash is expexcted to be of length {} when JSON-encoded, not of length {}".format(UnlockHash._TOTAL_SIZE_HEX, len(obj)))
 
         t = UnlockHashType(int(obj[:UnlockHash._TYPE_SIZE_HEX]))
-        h = Hash(value=obj[UnlockHash._TYPE_SIZE_HEX:UnlockHash._TYPE_SIZE_HEX+UnlockHash._HASH_SIZE_HEX])
+        # decoded as bytes, such that the hash is only created once, by the unlock hash itself
+        h = bytes.fromhex(obj[UnlockHash._TYPE_SIZE_HEX:UnlockHash._TYPE_SIZE_HEX+UnlockHash._HASH_SIZE_HEX])
         uh = cls(type=t, hash=h)
         
         if t == UnlockHashType.NIL:
             expectedNH = b'\x00'*UnlockHash._HASH_SIZE
-            if h.value != expectedNH:
-                raise ValueError("unexpected nil hash {}".format(h.value.hex()))
-        else:
+            if h != expectedNH:
+                raise ValueError("unexpected nil hash {}".format(h.hex()))
+        elif verify:
             expected_checksum = uh._checksum()[:UnlockHash._CHECKSUM_SIZE].hex()
             checksum = obj[-UnlockHash._CHECKSUM_SIZE_HEX:]
             if expected_checksum != checksum:
                 raise ValueError("unexpected checksum {}, expected {}".format(checksum, expected_checksum))
 
+        if obj == obj.lower():
+            # the string is the canonical string version of this unlock hash
+            uh._str = obj
+        if cls is UnlockHash:
+            uh._frozen = True
+            if verify or t == UnlockHashType.NIL:
+                UnlockHash._INTERNED[obj] = uh
+            else:
+                UnlockHash._INTERNED_TRUSTED[obj] = uh
         return uh
-    
+
+    @property
+    def frozen(self):
+        """
+        Returns True if this unlock hash is interned, and can therefore not be modified.
+        """
+        return self._frozen
+
+    def _ensure_mutable(self):
+        if self._frozen:
+            raise TypeError("cannot modify an interned (immutable) UnlockHash {}".format(str(self)))
+        self._str = None
+        self._checksum_value = None
+
     @property
     def type(self):
         return self._type
@@ -338,26 +504,36 @@ class UnlockHash(BaseDataTypeClass):
             value = UnlockHashType.NIL
         elif not isinstance(value, UnlockHashType):
             raise TypeError("UnlockHash's type has to be of type UnlockHashType, not {}".format(type(value)))
+        self._ensure_mutable()
         self._type = value
 
     @property
     def hash(self):
+        if self._frozen:
+            # a copy, as a frozen (interned) unlock hash is shared and cannot be modified
+            return Hash(value=self._hash.value)
         return self._hash
     @hash.setter
     def hash(self, value):
+        self._ensure_mutable()
         self._hash.value = value
 
     def __str__(self):
-        checksum = self._checksum()[:UnlockHash._CHECKSUM_SIZE].hex()
-        return "{}{}{}".format(bytearray([int(self._type)]).hex(), str(self._hash), checksum)
+        if self._str is None:
+            checksum = self._checksum()[:UnlockHash._CHECKSUM_SIZE].hex()
+            self._str = "{}{}{}".format(bytearray([int(self._type)]).hex(), str(self._hash), checksum)
+        return self._str
 
     def _checksum(self):
-        if self._type == UnlockHashType.NIL:
-            return b'\x00'*UnlockHash._CHECKSUM_SIZE
-        e = encoder_rivine_get()
-        e.add_int8(int(self._type))
-        e.add(self._hash)
-        return bytearray.fromhex(blake2_string(e.data))
+        if self._checksum_value is None:
+            if self._type == UnlockHashType.NIL:
+                self._checksum_value = b'\x00'*UnlockHash._CHECKSUM_SIZE
+            else:
+                e = encoder_rivine_get()
+                e.add_int8(int(self._type))
+                e.add(self._hash)
+                self._checksum_value = blake2_hash(e.data)
+        return self._checksum_value
 
     __repr__ = __str__
 
@@ -365,10 +541,9 @@ class UnlockHash(BaseDataTypeClass):
 
     def __eq__(self, other):
         other = UnlockHash._op_other_as_unlockhash(other)
-        return self.type == other.type and self.hash == other.hash
+        return self is other or (self._type == other._type and self._hash.value == other._hash.value)
     def __ne__(self, other):
-        other = UnlockHash._op_other_as_unlockhash(other)
-        return self.type != other.type or self.hash != other.hash
+        return not self.__eq__(other)
 
     def __hash__(self):
         return hash(str(self))
@@ -387,6 +562,9 @@ class UnlockHash(BaseDataTypeClass):
         """
         encoder.add_byte(int(self._type))
         encoder.add(self._hash)
+
+    def sia_binary_encoded_size(self):
+        return 1 + len(self._hash)
     
     def rivine_binary_encode(self, encoder):
         """
@@ -395,6 +573,23 @@ class UnlockHash(BaseDataTypeClass):
         encoder.add_int8(int(self._type))
         encoder.add(self._hash)
 
+    def rivine_binary_encoded_size(self):
+        return 1 + len(self._hash)
+
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Decode an unlock hash according to the Sia Binary Encoding format.
+        """
+        return cls(type=UnlockHashType(decoder.get_byte()), hash=decoder.get_array(UnlockHash._HASH_SIZE))
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Decode an unlock hash according to the Rivine Binary Encoding format.
+        """
+        return cls(type=UnlockHashType(decoder.get_int8()), hash=decoder.get_array(UnlockHash._HASH_SIZE))
+
 
 class ConditionNil(ConditionBaseClass):
     """
@@ -419,9 +614,21 @@ class ConditionNil(ConditionBaseClass):
     def sia_binary_encode_data(self, encoder):
         pass # nothing to do
 
+    def sia_binary_encoded_data_size(self):
+        return 0
+
     def rivine_binary_encode_data(self, encoder):
         pass # nothing to do
 
+    def rivine_binary_encoded_data_size(self):
+        return 0
+
+    def sia_binary_decode_data(self, decoder):
+        pass # nothing to do
+
+    def rivine_binary_decode_data(self, decoder):
+        pass # nothing to do
+
 
 class ConditionUnlockHash(ConditionBaseClass):
     """
@@ -461,9 +668,21 @@ class ConditionUnlockHash(ConditionBaseClass):
     def sia_binary_encode_data(self, encoder):
         encoder.add(self.unlockhash)
 
+    def sia_binary_encoded_data_size(self):
+        return self.unlockhash.sia_binary_encoded_size()
+
     def rivine_binary_encode_data(self, encoder):
         encoder.add(self.unlockhash)
 
+    def rivine_binary_encoded_data_size(self):
+        return self.unlockhash.rivine_binary_encoded_size()
+
+    def sia_binary_decode_data(self, decoder):
+        self.unlockhash = decoder.get(UnlockHash)
+
+    def rivine_binary_decode_data(self, decoder):
+        self.unlockhash = decoder.get(UnlockHash)
+
 
 class AtomicSwapSecret(BinaryData):
     SIZE = 32
@@ -471,6 +690,9 @@ class AtomicSwapSecret(BinaryData):
     """
     Atomic Swap Secret Object, a special type of BinaryData
     """
+
+    __slots__ = ()
+
     def __init__(self, value=None):
         super().__init__(value, fixed_size=AtomicSwapSecret.SIZE, strencoding='hex')
 
@@ -491,6 +713,9 @@ class AtomicSwapSecretHash(BinaryData):
     """
     Atomic Swap Secret Hash, a special type of BinaryData
     """
+
+    __slots__ = ()
+
     def __init__(self, value=None):
         super().__init__(value, fixed_size=AtomicSwapSecretHash.SIZE, strencoding='hex')
 
@@ -529,11 +754,12 @@ class ConditionAtomicSwap(ConditionBaseClass):
     def unlockhash(self):
         e = encoder_rivine_get()
         self.sia_binary_encode_data(e)
-        # need to encode again to add the length
+        # hash the data as a slice, prefixing it with its length,
+        # without encoding (and thus copying) the data a second time
         data = e.data
         e = encoder_sia_get()
-        e.add_slice(data)
-        hash = bytearray.fromhex(blake2_string(e.data))
+        e.add_int(len(data))
+        hash = blake2_hash(e.data, data)
         return UnlockHash(type=UnlockHashType.ATOMIC_SWAP, hash=hash)
 
     @property
@@ -617,6 +843,16 @@ class ConditionAtomicSwap(ConditionBaseClass):
     def rivine_binary_encode_data(self, encoder):
         encoder.add_all(self.sender, self.receiver, self.hashed_secret, self.lock_time)
 
+    def sia_binary_decode_data(self, decoder):
+        self.sender, self.receiver, self.hashed_secret = decoder.get_all(
+            UnlockHash, UnlockHash, AtomicSwapSecretHash)
+        self.lock_time = decoder.get_int()
+
+    def rivine_binary_decode_data(self, decoder):
+        self.sender, self.receiver, self.hashed_secret = decoder.get_all(
+            UnlockHash, UnlockHash, AtomicSwapSecretHash)
+        self.lock_time = decoder.get_int64()
+
 
 class ConditionLockTime(ConditionBaseClass):
     """
@@ -685,6 +921,22 @@ class ConditionLockTime(ConditionBaseClass):
         encoder.add_int8(int(self.condition.type))
         self.condition.rivine_binary_encode_data(encoder)
 
+    def sia_binary_decode_data(self, decoder):
+        self.lock = decoder.get_int()
+        self.condition = self._binary_decode_condition_new(decoder.get_byte())
+        self.condition.sia_binary_decode_data(decoder)
+
+    def rivine_binary_decode_data(self, decoder):
+        self.lock = decoder.get_int64()
+        self.condition = self._binary_decode_condition_new(decoder.get_int8())
+        self.condition.rivine_binary_decode_data(decoder)
+
+    @staticmethod
+    def _binary_decode_condition_new(ct):
+        if ct not in (_CONDITION_TYPE_UNLOCK_HASH, _CONDITION_TYPE_MULTI_SIG, _CONDITION_TYPE_NIL):
+            raise ValueError("internal condition of ConditionLockTime cannot be of type {}".format(ct))
+        return _condition_new(ct)
+
 class ConditionMultiSignature(ConditionBaseClass):
     """
     ConditionMultiSignature class
@@ -704,7 +956,7 @@ class ConditionMultiSignature(ConditionBaseClass):
     @property
     def unlockhash(self):
         uhs = sorted(self.unlockhashes, key=lambda uh: str(uh))
-        tree = MerkleTree(hash_func=lambda o: bytes.fromhex(blake2_string(o)))
+        tree = MerkleTree(hash_func=blake2_hash)
         tree.push(sia_encode(len(uhs)))
         for uh in uhs:
             tree.push(sia_encode(uh))
@@ -758,4 +1010,12 @@ class ConditionMultiSignature(ConditionBaseClass):
         encoder.add_int64(self._min_nr_sig)
         encoder.add_slice(self._unlockhashes)
 
+    def sia_binary_decode_data(self, decoder):
+        self._min_nr_sig = decoder.get_int()
+        self._unlockhashes = decoder.get_object_slice(UnlockHash)
+
+    def rivine_binary_decode_data(self, decoder):
+        self._min_nr_sig = decoder.get_int64()
+        self._unlockhashes = decoder.get_object_slice(UnlockHash)
+
 
@@ -1,12 +1,10 @@
-from Jumpscale import j
-
 from .BaseDataType import BaseDataTypeClass
 from .PrimitiveTypes import Hash
 from .ConditionTypes import UnlockHash, UnlockHashType
 from tfchain.encoders import encoder_rivine_get, encoder_sia_get
 from enum import IntEnum
 import tfchain
-from tfchain.crypto.utils import blake2_string
+from tfchain.crypto.utils import blake2_hash
 
 _SIG_Ed25519 = 'ed25519'
 
@@ -103,13 +101,12 @@ class PublicKey(BaseDataTypeClass):
         """
         Return the unlock hash generated from this public key.
         """
-        e = encoder_sia_get()
+        # hash the public key encoded as a slice, encoded only once, in a buffer of the exact size
+        size = self.sia_binary_encoded_size()
+        e = encoder_sia_get(size=8+size)
+        e.add_int(size)
         self.sia_binary_encode(e)
-        # need to encode again to add the length
-        data = e.data
-        e = encoder_sia_get()
-        e.add_slice(data)
-        hash = bytearray.fromhex(blake2_string(e.data))
+        hash = blake2_hash(e.data)
         return UnlockHash(type=UnlockHashType.PUBLIC_KEY, hash=hash)
 
     @staticmethod
@@ -125,9 +122,38 @@ class PublicKey(BaseDataTypeClass):
         encoder.add_array(PublicKey._pad_specifier(str(self.specifier)))
         encoder.add_slice(self.hash.value)
 
+    def sia_binary_encoded_size(self):
+        # the specifier is padded to 16 bytes, see _pad_specifier
+        return 16 + 8 + len(self.hash)
+
     def rivine_binary_encode(self, encoder):
         """
         Encode this binary data according to the Rivine Binary Encoding format.
         """
         encoder.add_int8(int(self.specifier))
         encoder.add(self.hash)
+
+    def rivine_binary_encoded_size(self):
+        return 1 + len(self.hash)
+
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Decode a public key according to the Sia Binary Encoding format.
+        """
+        # the specifier is padded to 16 bytes, see _pad_specifier
+        specifier = bytes(decoder.get_array(16)).rstrip(b'\0').decode('utf-8')
+        return cls(specifier=PublicKeySpecifier.from_json(specifier), hash=decoder.get_slice())
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Decode a public key according to the Rivine Binary Encoding format.
+        """
+        specifier = decoder.get_int8()
+        try:
+            specifier = PublicKeySpecifier(specifier)
+        except ValueError:
+            raise tfchain.errors.InvalidPublicKeySpecifier(
+                "{} is an invalid Public Key specifier".format(specifier))
+        return cls(specifier=specifier, hash=decoder.get(Hash))
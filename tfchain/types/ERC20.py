@@ -4,7 +4,7 @@ ERC20 Types.
 
 from .PrimitiveTypes import BinaryData, Hash
 from tfchain.encoders import encoder_rivine_get, encoder_sia_get
-from tfchain.crypto.utils import blake2_string
+from tfchain.crypto.utils import blake2_hash
 
 
 class ERC20Address(BinaryData):
@@ -14,6 +14,8 @@ class ERC20Address(BinaryData):
     ERC20 Contract/Wallet Address, used in TFChain-ERC20 code.
     """
 
+    __slots__ = ()
+
     def __init__(self, value=None):
         super().__init__(value, fixed_size=ERC20Address.SIZE, strencoding='hexprefix')
 
@@ -46,7 +48,7 @@ class ERC20Address(BinaryData):
         """
         e = encoder_sia_get()
         unlockhash.sia_binary_encode(e)
-        hash = bytes.fromhex(blake2_string(e.data))
+        hash = blake2_hash(e.data)
         return cls(value=hash[Hash.SIZE-ERC20Address.SIZE:])
 
     @classmethod
@@ -66,6 +68,8 @@ class ERC20Hash(BinaryData):
     ERC20 Hash, used in TFChain-ERC20 code.
     """
 
+    __slots__ = ()
+
     def __init__(self, value=None):
         super().__init__(value, fixed_size=ERC20Hash.SIZE, strencoding='hexprefix')
 
@@ -1,11 +1,14 @@
-from Jumpscale import j
+import threading
+from contextlib import contextmanager
 
 from .BaseDataType import BaseDataTypeClass
 from .CryptoTypes import PublicKey
 from .PrimitiveTypes import BinaryData, Hash
 from .ConditionTypes import UnlockHash, UnlockHashType, ConditionNil, \
     ConditionUnlockHash, ConditionAtomicSwap, ConditionMultiSignature, AtomicSwapSecret
-from tfchain.encoders import encoder_rivine_get, encoder_sia_get
+from tfchain.encoders import encoder_rivine_get, encoder_sia_get, decoder_rivine_get, decoder_sia_get, \
+    SiaBinarySizeEncoder, RivineBinarySizeEncoder
+from tfchain.encoders.rivine import slice_length_size
 
 import tfchain
 
@@ -15,6 +18,9 @@ class ED25519Signature(BinaryData):
     """
     ED25519 Signature, used in TFChain.
     """
+
+    __slots__ = ('_as_array',)
+
     def __init__(self, value=None, as_array=False):
         super().__init__(value, fixed_size=ED25519Signature.SIZE, strencoding='hex')
         if not isinstance(as_array, bool):
@@ -36,6 +42,9 @@ class ED25519Signature(BinaryData):
         """
         encoder.add_slice(self._value)
 
+    def sia_binary_encoded_size(self):
+        return 8 + len(self._value)
+
     def rivine_binary_encode(self, encoder):
         """
         Encode this binary data according to the Rivine Binary Encoding format.
@@ -46,10 +55,44 @@ class ED25519Signature(BinaryData):
         else:
             encoder.add_slice(self._value)
 
+    def rivine_binary_encoded_size(self):
+        if self._as_array:
+            return len(self._value)
+        return slice_length_size(len(self._value)) + len(self._value)
+
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Decode a signature according to the Sia Binary Encoding format.
+        Always decoded as a slice.
+        """
+        return cls(value=decoder.get_slice())
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Decode a signature according to the Rivine Binary Encoding format.
+        Decoded as a slice, decode it as an array directly in a context where it is encoded as such.
+        """
+        return cls(value=decoder.get_slice())
+
 _FULFULLMENT_TYPE_SINGLE_SIG = 1
 _FULFILLMENT_TYPE_ATOMIC_SWAP = 2
 _FULFILLMENT_TYPE_MULTI_SIG = 3
 
+
+def _fulfillment_new(ft):
+    """
+    Create a new (empty) fulfillment of the given type.
+    """
+    if ft == _FULFULLMENT_TYPE_SINGLE_SIG:
+        return FulfillmentSingleSignature()
+    if ft == _FULFILLMENT_TYPE_MULTI_SIG:
+        return FulfillmentMultiSignature()
+    if ft == _FULFILLMENT_TYPE_ATOMIC_SWAP:
+        return FulfillmentAtomicSwap()
+    raise ValueError("unsupport fulfillment type {}".format(ft))
+
 from abc import ABC, abstractmethod
 
 class SignatureCallbackBase(ABC):
@@ -122,6 +165,97 @@ class SignatureRequest:
         self._signed = True
 
 
+# the signature hash batch the current thread is in, see signature_hash_batch
+_signature_hash_batches = threading.local()
+
+
+@contextmanager
+def signature_hash_batch():
+    """
+    Context in which the signature hashes of many signature requests are computed at once,
+    as done by signature_requests_sign.
+
+    The transactions of those requests may not be modified within this context (other than adding signatures),
+    which allows the SignatureHashContext of a transaction to encode the data shared by all its signature hashes
+    only once per batch. Outside of a batch, that data is encoded for every signature hash,
+    such that a signature hash is never computed for outdated content. Batches can be nested.
+    """
+    if getattr(_signature_hash_batches, 'current', None) is not None:
+        yield
+        return
+    _signature_hash_batches.current = object()
+    try:
+        yield
+    finally:
+        _signature_hash_batches.current = None
+
+
+def signature_hash_batch_get():
+    """
+    Token identifying the signature hash batch the current thread is in, None if not in a batch.
+    """
+    return getattr(_signature_hash_batches, 'current', None)
+
+
+def signature_requests_sign(requests, keys, sign, max_workers=None, executor='process', chunksize=32):
+    """
+    Sign and fulfill many signature requests at once, e.g. all requests of the transactions of a payout job,
+    computing the input hashes first and signing them in parallel.
+
+    The requests are fulfilled using their signature_fulfill method, once all signatures are created,
+    such that requests can never be signed twice. Requests that are already fulfilled, or of which
+    the address is not part of the given keys, are not signed.
+
+    @param requests: iterable of SignatureRequest
+    @param keys: dict mapping a wallet address (str) to a (PublicKey, private key) pair,
+                 the NIL address can be mapped as well in order to sign requests for a NIL condition
+    @param sign: function sign(private_key, message) -> signature, creating the ed25519 signature (bytes) of a message (bytes),
+                 has to be a picklable (module-level) function when signing in a process pool
+    @param max_workers: the max amount of workers used to sign, the amount of CPUs by default,
+                        signatures are created within the calling thread if 1
+    @param executor: 'process' to sign using a process pool, 'thread' to sign using a thread pool
+                     (only useful if the sign function releases the GIL), or a concurrent.futures.Executor to use
+    @param chunksize: the amount of signatures that are sent at once to a process of the pool
+
+    @returns: the list of signature requests that were fulfilled
+    """
+    # imported here, as the (process) pools pull in a lot of modules, not needed unless signing in batch
+    from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+    if not (isinstance(executor, Executor) or executor in ('process', 'thread')):
+        raise ValueError("executor is expected to be 'process', 'thread' or an Executor, not {}".format(executor))
+    signed = []
+    private_keys = []
+    messages = []
+    with signature_hash_batch():
+        for request in requests:
+            if request.fulfilled:
+                continue
+            key = keys.get(request.wallet_address)
+            if key is None:
+                continue
+            public_key, private_key = key
+            signed.append((request, public_key))
+            private_keys.append(private_key)
+            messages.append(request.input_hash_new(public_key).value)
+    if not signed:
+        return []
+
+    if isinstance(executor, Executor):
+        signatures = executor.map(sign, private_keys, messages, chunksize=chunksize)
+    elif max_workers == 1 or len(signed) == 1:
+        signatures = map(sign, private_keys, messages)
+    elif executor == 'process':
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            signatures = list(pool.map(sign, private_keys, messages, chunksize=chunksize))
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            signatures = list(pool.map(sign, private_keys, messages))
+
+    for ((request, public_key), signature) in zip(signed, signatures):
+        request.signature_fulfill(public_key=public_key, signature=signature)
+    return [request for (request, _) in signed]
+
+
 class FulfillmentFactory:
     """
     Fulfillment Factory class
@@ -136,6 +270,15 @@ class FulfillmentFactory:
             return FulfillmentAtomicSwap.from_json(obj)
         raise ValueError("unsupport fulfillment type {}".format(ft))
 
+    def from_binary(self, data, encoding='sia'):
+        """
+        Create a fulfillment, of any type, from its binary encoding.
+
+        @param data: the encoded fulfillment, as bytes, bytearray or memoryview (which is not copied)
+        @param encoding: the encoding used, 'sia' or 'rivine'
+        """
+        return FulfillmentBaseClass.from_binary(data, encoding=encoding)
+
     def from_condition(self, condition):
         """
         Create a fresh fulfillment from its parent condition.
@@ -184,6 +327,37 @@ class FulfillmentBaseClass(SignatureCallbackBase, BaseDataTypeClass):
         ff.from_json_data_object(obj.get('data', {}))
         return ff
 
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Decode a Fulfillment according to the Sia Binary Encoding format,
+        of any type if called on the FulfillmentBaseClass itself.
+        """
+        ff = cls._binary_decode_new(decoder.get_byte())
+        data_dec = decoder_sia_get(decoder.get_slice())
+        ff.sia_binary_decode_data(data_dec)
+        data_dec.end()
+        return ff
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Decode a Fulfillment according to the Rivine Binary Encoding format,
+        of any type if called on the FulfillmentBaseClass itself.
+        """
+        ff = cls._binary_decode_new(decoder.get_int8())
+        data_dec = decoder_rivine_get(decoder.get_slice())
+        ff.rivine_binary_decode_data(data_dec)
+        data_dec.end()
+        return ff
+
+    @classmethod
+    def _binary_decode_new(cls, ft):
+        ff = _fulfillment_new(ft)
+        if not isinstance(ff, cls):
+            raise ValueError("invalid fulfillment type {}, expected it to be of type {}".format(ft, cls.__name__))
+        return ff
+
     @property
     @abstractmethod
     def type(self):
@@ -207,27 +381,54 @@ class FulfillmentBaseClass(SignatureCallbackBase, BaseDataTypeClass):
     def sia_binary_encode_data(self, encoder):
         pass
 
+    def sia_binary_encoded_data_size(self):
+        """
+        The size of the data of this Fulfillment, when encoded according to the Sia Binary Encoding format.
+        """
+        e = SiaBinarySizeEncoder()
+        self.sia_binary_encode_data(e)
+        return e.size
+
     def sia_binary_encode(self, encoder):
         """
         Encode this Fulfillment according to the Sia Binary Encoding format.
         """
         encoder.add_array(bytearray([int(self.type)]))
-        data_enc = encoder_sia_get()
-        self.sia_binary_encode_data(data_enc)
-        encoder.add_slice(data_enc.data)
+        encoder.add_slice_encoded(self.sia_binary_encode_data, size=self.sia_binary_encoded_data_size())
+
+    def sia_binary_encoded_size(self):
+        return 1 + 8 + self.sia_binary_encoded_data_size()
 
     @abstractmethod
     def rivine_binary_encode_data(self, encoder):
         pass
 
+    def rivine_binary_encoded_data_size(self):
+        """
+        The size of the data of this Fulfillment, when encoded according to the Rivine Binary Encoding format.
+        """
+        e = RivineBinarySizeEncoder()
+        self.rivine_binary_encode_data(e)
+        return e.size
+
     def rivine_binary_encode(self, encoder):
         """
         Encode this Fulfillment according to the Rivine Binary Encoding format.
         """
         encoder.add_int8(int(self.type))
-        data_enc = encoder_rivine_get()
-        self.rivine_binary_encode_data(data_enc)
-        encoder.add_slice(data_enc.data)
+        encoder.add_slice_encoded(self.rivine_binary_encode_data, size=self.rivine_binary_encoded_data_size())
+
+    def rivine_binary_encoded_size(self):
+        size = self.rivine_binary_encoded_data_size()
+        return 1 + slice_length_size(size) + size
+
+    @abstractmethod
+    def sia_binary_decode_data(self, decoder):
+        pass
+
+    @abstractmethod
+    def rivine_binary_decode_data(self, decoder):
+        pass
 
     @abstractmethod
     def signature_requests_new(self, input_hash_func, parent_condition):
@@ -304,9 +505,21 @@ class FulfillmentSingleSignature(FulfillmentBaseClass):
     def sia_binary_encode_data(self, encoder):
         encoder.add_all(self.public_key, self.signature)
 
+    def sia_binary_encoded_data_size(self):
+        return self.public_key.sia_binary_encoded_size() + self.signature.sia_binary_encoded_size()
+
     def rivine_binary_encode_data(self, encoder):
         encoder.add_all(self.public_key, self.signature)
 
+    def rivine_binary_encoded_data_size(self):
+        return self.public_key.rivine_binary_encoded_size() + self.signature.rivine_binary_encoded_size()
+
+    def sia_binary_decode_data(self, decoder):
+        self._pub_key, self._signature = decoder.get_all(PublicKey, ED25519Signature)
+
+    def rivine_binary_decode_data(self, decoder):
+        self._pub_key, self._signature = decoder.get_all(PublicKey, ED25519Signature)
+
     def signature_requests_new(self, input_hash_func, parent_condition):
         if not callable(input_hash_func):
             raise TypeError("expected input hash generator func with signature `f(*extra_objects) -> Hash`, not {}".format(type(input_hash_func)))
@@ -383,6 +596,12 @@ class FulfillmentMultiSignature(FulfillmentBaseClass):
     def rivine_binary_encode_data(self, encoder):
         encoder.add(self._pairs)
 
+    def sia_binary_decode_data(self, decoder):
+        self._pairs = decoder.get_object_slice(PublicKeySignaturePair)
+
+    def rivine_binary_decode_data(self, decoder):
+        self._pairs = decoder.get_object_slice(PublicKeySignaturePair)
+
     def signature_requests_new(self, input_hash_func, parent_condition):
         if not callable(input_hash_func):
             raise TypeError("expected input hash generator func with signature `f(*extra_objects) -> Hash`, not {}".format(type(input_hash_func)))
@@ -468,6 +687,22 @@ class PublicKeySignaturePair(BaseDataTypeClass):
         """
         encoder.add_all(self.public_key, self.signature)
 
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Decode a PublicKeySignature Pair according to the Sia Binary Encoding format.
+        """
+        public_key, signature = decoder.get_all(PublicKey, ED25519Signature)
+        return cls(public_key=public_key, signature=signature)
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Decode a PublicKeySignature Pair according to the Rivine Binary Encoding format.
+        """
+        public_key, signature = decoder.get_all(PublicKey, ED25519Signature)
+        return cls(public_key=public_key, signature=signature)
+
 
 # Legacy AtomicSwap Fulfillments are not supported,
 # as these are not used on any active TFChain network
@@ -556,6 +791,16 @@ class FulfillmentAtomicSwap(FulfillmentBaseClass):
     def rivine_binary_encode_data(self, encoder):
         encoder.add_all(self.public_key, self.signature, self.secret)
 
+    def sia_binary_decode_data(self, decoder):
+        self._pub_key, self._signature = decoder.get_all(PublicKey, ED25519Signature)
+        # the secret is only encoded if defined (a refund does not define it)
+        self._secret = decoder.get(AtomicSwapSecret) if decoder.remaining else None
+
+    def rivine_binary_decode_data(self, decoder):
+        self._pub_key, self._signature = decoder.get_all(PublicKey, ED25519Signature)
+        # the secret is only encoded if defined (a refund does not define it)
+        self._secret = decoder.get(AtomicSwapSecret) if decoder.remaining else None
+
     def signature_requests_new(self, input_hash_func, parent_condition):
         if not callable(input_hash_func):
             raise TypeError("expected input hash generator func with signature `f(*extra_objects) -> Hash`, not {}".format(type(input_hash_func)))
@@ -1,5 +1,3 @@
-from Jumpscale import j
-
 from .BaseDataType import BaseDataTypeClass
 
 from .PrimitiveTypes import BinaryData, Hash, Currency, Blockstake
@@ -92,12 +90,34 @@ class CoinInput(BaseDataTypeClass):
         """
         encoder.add_all(self._parent_id, self._fulfillment)
 
+    def sia_binary_encoded_size(self):
+        return self._parent_id.sia_binary_encoded_size() + self._fulfillment.sia_binary_encoded_size()
+
     def rivine_binary_encode(self, encoder):
         """
         Encode this CoinInput according to the Rivine Binary Encoding format.
         """
         encoder.add_all(self._parent_id, self._fulfillment)
 
+    def rivine_binary_encoded_size(self):
+        return self._parent_id.rivine_binary_encoded_size() + self._fulfillment.rivine_binary_encoded_size()
+
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Decode a CoinInput according to the Sia Binary Encoding format.
+        """
+        parentid, fulfillment = decoder.get_all(Hash, FulfillmentBaseClass)
+        return cls(parentid=parentid, fulfillment=fulfillment)
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Decode a CoinInput according to the Rivine Binary Encoding format.
+        """
+        parentid, fulfillment = decoder.get_all(Hash, FulfillmentBaseClass)
+        return cls(parentid=parentid, fulfillment=fulfillment)
+
     def signature_requests_new(self, input_hash_func):
         """
         Returns all signature requests that can be generated for this Coin Inputs,
@@ -137,10 +157,17 @@ class CoinOutput(BaseDataTypeClass):
         self.id = id
 
     @classmethod
-    def from_json(cls, obj):
+    def from_json(cls, obj, trusted=False):
+        """
+        Create this output from its JSON encoding.
+
+        @param obj: the JSON-decoded output
+        @param trusted: if True the JSON comes from a trusted source,
+                        and the checksum of the unlock hashes it contains is not verified (see trusted_json_decoding)
+        """
         return cls(
             value=Currency.from_json(obj['value']),
-            condition=conditions.from_json(obj['condition']))
+            condition=conditions.from_json(obj['condition'], trusted=trusted))
 
     @property
     def value(self):
@@ -190,12 +217,34 @@ class CoinOutput(BaseDataTypeClass):
         """
         encoder.add_all(self._value, self._condition)
 
+    def sia_binary_encoded_size(self):
+        return self._value.sia_binary_encoded_size() + self._condition.sia_binary_encoded_size()
+
     def rivine_binary_encode(self, encoder):
         """
         Encode this CoinOutput according to the Rivine Binary Encoding format.
         """
         encoder.add_all(self._value, self._condition)
 
+    def rivine_binary_encoded_size(self):
+        return self._value.rivine_binary_encoded_size() + self._condition.rivine_binary_encoded_size()
+
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Decode a CoinOutput according to the Sia Binary Encoding format.
+        """
+        value, condition = decoder.get_all(Currency, ConditionBaseClass)
+        return cls(value=value, condition=condition)
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Decode a CoinOutput according to the Rivine Binary Encoding format.
+        """
+        value, condition = decoder.get_all(Currency, ConditionBaseClass)
+        return cls(value=value, condition=condition)
+
 
 class BlockstakeInput(BaseDataTypeClass):
     """
@@ -279,12 +328,34 @@ class BlockstakeInput(BaseDataTypeClass):
         """
         encoder.add_all(self._parent_id, self._fulfillment)
 
+    def sia_binary_encoded_size(self):
+        return self._parent_id.sia_binary_encoded_size() + self._fulfillment.sia_binary_encoded_size()
+
     def rivine_binary_encode(self, encoder):
         """
         Encode this BlockstakeInput according to the Rivine Binary Encoding format.
         """
         encoder.add_all(self._parent_id, self._fulfillment)
 
+    def rivine_binary_encoded_size(self):
+        return self._parent_id.rivine_binary_encoded_size() + self._fulfillment.rivine_binary_encoded_size()
+
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Decode a BlockstakeInput according to the Sia Binary Encoding format.
+        """
+        parentid, fulfillment = decoder.get_all(Hash, FulfillmentBaseClass)
+        return cls(parentid=parentid, fulfillment=fulfillment)
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Decode a BlockstakeInput according to the Rivine Binary Encoding format.
+        """
+        parentid, fulfillment = decoder.get_all(Hash, FulfillmentBaseClass)
+        return cls(parentid=parentid, fulfillment=fulfillment)
+
     def signature_requests_new(self, input_hash_func):
         """
         Returns all signature requests that can be generated for this Blockstake Inputs,
@@ -324,10 +395,17 @@ class BlockstakeOutput(BaseDataTypeClass):
         self.id = id
 
     @classmethod
-    def from_json(cls, obj):
+    def from_json(cls, obj, trusted=False):
+        """
+        Create this output from its JSON encoding.
+
+        @param obj: the JSON-decoded output
+        @param trusted: if True the JSON comes from a trusted source,
+                        and the checksum of the unlock hashes it contains is not verified (see trusted_json_decoding)
+        """
         return cls(
             value=Blockstake.from_json(obj['value']),
-            condition=conditions.from_json(obj['condition']))
+            condition=conditions.from_json(obj['condition'], trusted=trusted))
 
     @property
     def value(self):
@@ -377,8 +455,30 @@ class BlockstakeOutput(BaseDataTypeClass):
         """
         encoder.add_all(self._value, self._condition)
 
+    def sia_binary_encoded_size(self):
+        return self._value.sia_binary_encoded_size() + self._condition.sia_binary_encoded_size()
+
     def rivine_binary_encode(self, encoder):
         """
         Encode this BlockstakeOutput according to the Rivine Binary Encoding format.
         """
         encoder.add_all(self._value, self._condition)
+
+    def rivine_binary_encoded_size(self):
+        return self._value.rivine_binary_encoded_size() + self._condition.rivine_binary_encoded_size()
+
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Decode a BlockstakeOutput according to the Sia Binary Encoding format.
+        """
+        value, condition = decoder.get_all(Blockstake, ConditionBaseClass)
+        return cls(value=value, condition=condition)
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Decode a BlockstakeOutput according to the Rivine Binary Encoding format.
+        """
+        value, condition = decoder.get_all(Blockstake, ConditionBaseClass)
+        return cls(value=value, condition=condition)
@@ -2,31 +2,51 @@ import base64
 from enum import IntEnum
 
 from .BaseDataType import BaseDataTypeClass
+from tfchain.encoders import RivineBinaryEncoder, SiaBinaryEncoder
+from tfchain.encoders.rivine import slice_length_size
+
+
+def _hexprefix_from_str(s):
+    if s.startswith("0x") or s.startswith("0X"):
+        s = s[2:]
+    return bytes.fromhex(s)
+
+
+# (from_str, to_str) functions for all supported string encodings of binary data,
+# shared by all BinaryData instances
+_BINARY_DATA_CODECS = {
+    'hex': (bytes.fromhex, bytes.hex),
+    'base64': (base64.b64decode, lambda value: base64.b64encode(value).decode('ascii')),
+    'hexprefix': (_hexprefix_from_str, lambda value: '0x' + value.hex()),
+}
 
 
 class BinaryData(BaseDataTypeClass):
     """
     BinaryData is the data type used for any binary data used in tfchain.
+
+    The value is stored as immutable bytes, and is replaced as a whole when (re)assigned.
     """
 
+    __slots__ = ('_value', '_fixed_size', '_strencoding', '_codec')
+
+    # fixed size of binary data types that always have the same size,
+    # used to binary-decode such data as an array rather than a slice
+    SIZE = None
+
     def __init__(self, value=None, fixed_size=None, strencoding=None):
         # define string encoding
-        if strencoding is not None and not isinstance(strencoding, str):
+        if strencoding is None:
+            self._codec = _BINARY_DATA_CODECS['hex']
+        elif not isinstance(strencoding, str):
             raise TypeError(
                 "strencoding should be None or a str, not be of type {}".format(strencoding))
-        if strencoding is None or strencoding.lower().strip() == 'hex':
-            self._from_str = lambda s: bytearray.fromhex(s)
-            self._to_str = lambda value: value.hex()
-        elif strencoding.lower().strip() == 'base64':
-            self._from_str = lambda s: bytearray(base64.b64decode(s))
-            self._to_str = lambda value: base64.b64encode(value)
-        elif strencoding.lower().strip() == 'hexprefix':
-            self._from_str = lambda s: bytearray.fromhex(
-                s[2:] if (s.startswith("0x") or s.startswith("0X")) else s)
-            self._to_str = lambda value: '0x' + value.hex()
         else:
-            raise TypeError(
-                "{} is not a valid string encoding".format(strencoding))
+            try:
+                self._codec = _BINARY_DATA_CODECS[strencoding.lower().strip()]
+            except KeyError:
+                raise TypeError(
+                    "{} is not a valid string encoding".format(strencoding))
         self._strencoding = strencoding
 
         # define fixed size
@@ -70,12 +90,12 @@ class BinaryData(BaseDataTypeClass):
         if isinstance(value, BinaryData):
             value = value.value
         elif value is None:
-            value = bytearray()
+            value = bytes()
         elif isinstance(value, str):
-            value = self._from_str(value)
-        elif isinstance(value, bytes):
-            value = bytearray(value)
-        elif not isinstance(value, bytearray):
+            value = self._codec[0](value)
+        elif isinstance(value, (bytearray, memoryview)):
+            value = bytes(value)
+        elif not isinstance(value, bytes):
             raise TypeError(
                 "binary data can only be set to a BinaryData, str, bytes or bytearray, not {}".format(type(value)))
         # if fixed size, check this now
@@ -84,14 +104,14 @@ class BinaryData(BaseDataTypeClass):
             raise ValueError(
                 "binary data was expected to be of fixed size {}, length {} is not allowed".format(
                     self._fixed_size, len(value)))
-        # all good, assign the bytearray value
+        # all good, assign the bytes value
         self._value = value
 
     def __len__(self):
         return len(self.value)
 
     def __str__(self):
-        return self._to_str(self._value)
+        return self._codec[1](self._value)
 
     def __repr__(self):
         return self.__str__()
@@ -137,6 +157,14 @@ class BinaryData(BaseDataTypeClass):
         else:
             encoder.add_array(self._value)
 
+    def sia_binary_encoded_size(self):
+        """
+        The size of this binary data, when encoded according to the Sia Binary Encoding format.
+        """
+        if self._fixed_size is None:
+            return 8 + len(self._value)
+        return len(self._value)
+
     def rivine_binary_encode(self, encoder):
         """
         Encode this binary data according to the Rivine Binary Encoding format.
@@ -147,6 +175,34 @@ class BinaryData(BaseDataTypeClass):
         else:
             encoder.add_array(self._value)
 
+    def rivine_binary_encoded_size(self):
+        """
+        The size of this binary data, when encoded according to the Rivine Binary Encoding format.
+        """
+        if self._fixed_size is None:
+            return slice_length_size(len(self._value)) + len(self._value)
+        return len(self._value)
+
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Decode binary data according to the Sia Binary Encoding format.
+        Either decoded as a slice or an array, depending on whether or not the type has a fixed SIZE.
+        """
+        if cls.SIZE is None:
+            return cls(value=decoder.get_slice())
+        return cls(value=decoder.get_array(cls.SIZE))
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Decode binary data according to the Rivine Binary Encoding format.
+        Either decoded as a slice or an array, depending on whether or not the type has a fixed SIZE.
+        """
+        if cls.SIZE is None:
+            return cls(value=decoder.get_slice())
+        return cls(value=decoder.get_array(cls.SIZE))
+
 
 class Hash(BinaryData):
     SIZE = 32
@@ -155,6 +211,8 @@ class Hash(BinaryData):
     TFChain Hash Object, a special type of BinaryData
     """
 
+    __slots__ = ()
+
     def __init__(self, value=None):
         super().__init__(value, fixed_size=Hash.SIZE, strencoding='hex')
 
@@ -174,17 +232,40 @@ class Hash(BinaryData):
         return s
 
 
+def _hash_binary_encode(encoder, value):
+    # a hash is always fixed sized, and thus encoded as an array in both encodings
+    encoder.add_array(value._value)
+
+
+# fast path for the most commonly encoded object
+SiaBinaryEncoder.type_register(Hash, _hash_binary_encode)
+RivineBinaryEncoder.type_register(Hash, _hash_binary_encode)
+
+
 from math import floor
 from decimal import Decimal
+from array import array
+
+import tfchain.errors
+
+
+# amount of base units in a single TFT, and the value of a single base unit in TFT
+_CURRENCY_UNITS_PER_TFT = 1000000000
+_CURRENCY_UNIT = Decimal('0.000000001')
 
 
 class Currency(BaseDataTypeClass):
     """
     TFChain Currency Object.
+
+    The value is stored as an integer amount of base units (1 TFT = 10^9 base units),
+    such that arithmetic, comparisons and encoding never require decimal operations.
     """
 
+    __slots__ = ('_units',)
+
     def __init__(self, value=None):
-        self._value = None
+        self._units = 0
         self.value = value
 
     @classmethod
@@ -194,25 +275,50 @@ class Currency(BaseDataTypeClass):
                 "currency is expected to be a string when part of a JSON object, not type {}".format(type(obj)))
         if obj == '':
             obj = None
-        c = cls()
-        c.value = Decimal(obj) * Decimal('0.000000001')
-        return c
+        try:
+            units = int(obj)
+        except ValueError:
+            # not an integer, refused as it is too precise (or not a number at all)
+            raise tfchain.errors.CurrencyPrecisionOverflow(Decimal(obj) * _CURRENCY_UNIT)
+        return cls._from_base_units(units)
+
+    @classmethod
+    def sum(cls, values):
+        """
+        Sum the given currency values, faster than summing them using the + operator,
+        as no intermediate Currency values are created.
+
+        @param values: an iterable of Currency values (or values which can be converted to a Currency), or a CurrencyArray
+        """
+        if isinstance(values, CurrencyArray):
+            return values.sum()
+        units = 0
+        for value in values:
+            if not isinstance(value, Currency):
+                value = Currency._op_other_as_currency(value)
+            units += value._units
+        return cls._from_base_units(units)
 
     @property
     def value(self):
-        if self._value is None:
+        if self._units == 0:
             return Decimal()
-        return self._value
+        return Decimal(self._units).scaleb(-9)
 
     @value.setter
     def value(self, value):
         if value is None:
-            self._value = None
+            self._units = 0
             return
         if isinstance(value, Currency):
-            self._value = value.value
+            self._units = value._units
             return
-        if isinstance(value, (int, str, Decimal)):
+        if isinstance(value, int) and not isinstance(value, bool):
+            if value < 0:
+                raise tfchain.errors.CurrencyNegativeValue(Decimal(value))
+            self._units = value * _CURRENCY_UNITS_PER_TFT
+            return
+        if isinstance(value, (str, Decimal)):
             if isinstance(value, str):
                 value = value.upper().strip()
                 if len(value) >= 4 and value[-3:] == 'TFT':
@@ -223,7 +329,7 @@ class Currency(BaseDataTypeClass):
                 raise tfchain.errors.CurrencyPrecisionOverflow(d)
             if sign != 0:
                 raise tfchain.errors.CurrencyNegativeValue(d)
-            self._value = d
+            self._units = int(d.scaleb(9))
             return
         raise TypeError(
             "cannot set value of type {} as Currency (invalid type)".format(type(value)))
@@ -231,79 +337,88 @@ class Currency(BaseDataTypeClass):
     # operator overloading to allow currencies to be summed
     def __add__(self, other):
         other = Currency._op_other_as_currency(other)
-        value = self.value + other.value
-        return Currency(value=value)
+        return Currency._from_base_units(self._units + other._units)
     __radd__ = __add__
 
     def __iadd__(self, other):
         other = Currency._op_other_as_currency(other)
-        self.value += other.value
+        self._units += other._units
         return self
 
     # operator overloading to allow currencies to be multiplied
     def __mul__(self, other):
         other = Currency._op_other_as_currency(other)
-        value = self.value * other.value
-        return Currency(value=value)
+        return Currency._from_base_units(Currency._units_mul(self._units, other._units))
     __rmul__ = __mul__
 
     def __imul__(self, other):
         other = Currency._op_other_as_currency(other)
-        self.value *= other.value
+        self._units = Currency._units_mul(self._units, other._units)
         return self
 
+    @staticmethod
+    def _units_mul(a, b):
+        # the product of two amounts of base units is expressed in base units squared
+        units, rem = divmod(a * b, _CURRENCY_UNITS_PER_TFT)
+        if rem:
+            raise tfchain.errors.CurrencyPrecisionOverflow(Decimal(a * b).scaleb(-18))
+        return units
+
     # operator overloading to allow currencies to be subtracted
     def __sub__(self, other):
         other = Currency._op_other_as_currency(other)
-        value = self.value - other.value
-        return Currency(value=value)
+        return Currency._from_base_units(self._units - other._units)
     __rsub__ = __sub__
 
     def __isub__(self, other):
         other = Currency._op_other_as_currency(other)
-        self.value -= other.value
+        units = self._units - other._units
+        if units < 0:
+            raise tfchain.errors.CurrencyNegativeValue(Decimal(units).scaleb(-9))
+        self._units = units
         return self
 
     # operator overloading to allow currencies to be compared
     def __lt__(self, other):
         other = Currency._op_other_as_currency(other)
-        return self.value < other.value
+        return self._units < other._units
 
     def __le__(self, other):
         other = Currency._op_other_as_currency(other)
-        return self.value <= other.value
+        return self._units <= other._units
 
     def __eq__(self, other):
         other = Currency._op_other_as_currency(other)
-        return self.value == other.value
+        return self._units == other._units
 
     def __ne__(self, other):
         other = Currency._op_other_as_currency(other)
-        return self.value != other.value
+        return self._units != other._units
 
     def __gt__(self, other):
         other = Currency._op_other_as_currency(other)
-        return self.value > other.value
+        return self._units > other._units
 
     def __ge__(self, other):
         other = Currency._op_other_as_currency(other)
-        return self.value >= other.value
+        return self._units >= other._units
 
     @staticmethod
     def _op_other_as_currency(other):
+        if isinstance(other, Currency):
+            return other
         if isinstance(other, (int, str)):
             other = Currency(value=other)
         elif isinstance(other, float):
             other = Currency(value=Decimal(str(other)))
-        elif not isinstance(other, Currency):
+        else:
             raise TypeError(
                 "currency of type {} is not supported".format(type(other)))
         return other
 
     # allow our currency to be turned into an int
     def __int__(self):
-        s = "{:.9f}".format(self.value).replace(".", "")
-        return int(s)
+        return self._units
 
     def __str__(self):
         return self.str()
@@ -315,12 +430,10 @@ class Currency(BaseDataTypeClass):
 
         @param with_unit: include the TFT currency suffix unit with the str
         """
-        s = "{:.9f}".format(self.value)
-        s = s.rstrip("0 ")
-        if s[-1] == '.':
-            s = s[:-1]
-        if len(s) == 0:
-            s = "0"
+        tft, units = divmod(self._units, _CURRENCY_UNITS_PER_TFT)
+        s = str(tft)
+        if units:
+            s += '.' + '{:09d}'.format(units).rstrip('0')
         if with_unit:
             s += " TFT"
         return s
@@ -329,29 +442,185 @@ class Currency(BaseDataTypeClass):
         return self.str(with_unit=True)
 
     def json(self):
-        return str(int(self))
+        return str(self._units)
 
     def sia_binary_encode(self, encoder):
         """
         Encode this currency according to the Sia Binary Encoding format.
         """
-        value = int(self)
+        value = self._units
         nbytes, rem = divmod(value.bit_length(), 8)
         if rem:
             nbytes += 1
         encoder.add_int(nbytes)
         encoder.add_array(value.to_bytes(nbytes, byteorder='big'))
 
+    def sia_binary_encoded_size(self):
+        """
+        The size of this currency, when encoded according to the Sia Binary Encoding format.
+        """
+        return 8 + (self._units.bit_length() + 7) // 8
+
     def rivine_binary_encode(self, encoder):
         """
         Encode this currency according to the Rivine Binary Encoding format.
         """
-        value = int(self)
+        value = self._units
         nbytes, rem = divmod(value.bit_length(), 8)
         if rem:
             nbytes += 1
         encoder.add_slice(value.to_bytes(nbytes, byteorder='big'))
 
+    def rivine_binary_encoded_size(self):
+        """
+        The size of this currency, when encoded according to the Rivine Binary Encoding format.
+        """
+        nbytes = (self._units.bit_length() + 7) // 8
+        return slice_length_size(nbytes) + nbytes
+
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Decode a currency according to the Sia Binary Encoding format.
+        """
+        value = int.from_bytes(decoder.get_array(decoder.get_int()), byteorder='big')
+        return cls._from_base_units(value)
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Decode a currency according to the Rivine Binary Encoding format.
+        """
+        value = int.from_bytes(decoder.get_slice(), byteorder='big')
+        return cls._from_base_units(value)
+
+    @classmethod
+    def _from_base_units(cls, units):
+        if units < 0:
+            raise tfchain.errors.CurrencyNegativeValue(Decimal(units).scaleb(-9))
+        c = cls.__new__(cls)
+        c._units = units
+        return c
+
+
+class CurrencyArray:
+    """
+    Array of currency values, stored compactly as unsigned 64-bit integers of base units,
+    used to sum, filter and compare the values of many (e.g. coin) outputs at once,
+    without creating a Currency object for each of them.
+
+    Values which do not fit in 64 bits (more than 18446744073.709551615 TFT) cannot be stored.
+    """
+
+    __slots__ = ('_units',)
+
+    def __init__(self, values=None):
+        """
+        @param values: optional iterable of Currency values (or values which can be converted to a Currency)
+        """
+        self._units = array('Q')
+        if values is not None:
+            self.extend(values)
+
+    @classmethod
+    def from_base_units(cls, units):
+        """
+        Create a currency array directly from the base units of its values.
+
+        @param units: iterable of integer amounts of base units
+        """
+        a = cls()
+        a._units.extend(units)
+        return a
+
+    @property
+    def base_units(self):
+        """
+        The values of this array as base units, the array('Q') used as storage.
+        """
+        return self._units
+
+    def append(self, value):
+        if not isinstance(value, Currency):
+            value = Currency._op_other_as_currency(value)
+        self._units.append(value._units)
+
+    def extend(self, values):
+        if isinstance(values, CurrencyArray):
+            self._units.extend(values._units)
+            return
+        for value in values:
+            self.append(value)
+
+    def __len__(self):
+        return len(self._units)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            a = CurrencyArray()
+            a._units = self._units[index]
+            return a
+        return Currency._from_base_units(self._units[index])
+
+    def __iter__(self):
+        for units in self._units:
+            yield Currency._from_base_units(units)
+
+    def sum(self):
+        """
+        The sum of all values in this array, as a Currency value.
+        """
+        return Currency._from_base_units(sum(self._units))
+
+    def min(self):
+        """
+        The smallest value in this array, as a Currency value.
+        """
+        if not self._units:
+            raise ValueError("min of an empty currency array")
+        return Currency._from_base_units(min(self._units))
+
+    def max(self):
+        """
+        The largest value in this array, as a Currency value.
+        """
+        if not self._units:
+            raise ValueError("max of an empty currency array")
+        return Currency._from_base_units(max(self._units))
+
+    def mask(self, minimum=None, maximum=None):
+        """
+        Compare all values in this array against an (inclusive) minimum and/or maximum,
+        returning a list of booleans, True for each value within range.
+
+        @param minimum: optional minimum value, a Currency (or any value which can be converted to a Currency)
+        @param maximum: optional maximum value, a Currency (or any value which can be converted to a Currency)
+        """
+        if minimum is not None:
+            minimum = Currency._op_other_as_currency(minimum)._units
+        if maximum is not None:
+            maximum = Currency._op_other_as_currency(maximum)._units
+        if minimum is None:
+            if maximum is None:
+                return [True] * len(self._units)
+            return [units <= maximum for units in self._units]
+        if maximum is None:
+            return [units >= minimum for units in self._units]
+        return [minimum <= units <= maximum for units in self._units]
+
+    def filter(self, mask):
+        """
+        Create a new currency array, containing only the values for which the mask is True.
+
+        @param mask: iterable of booleans, one for each value in this array, see the mask method
+        """
+        a = CurrencyArray()
+        a._units = array('Q', (units for (units, selected) in zip(self._units, mask) if selected))
+        return a
+
+    def __repr__(self):
+        return "CurrencyArray([{}])".format(", ".join(repr(value) for value in self))
+
 
 class Blockstake(BaseDataTypeClass):
     """
@@ -415,6 +684,12 @@ class Blockstake(BaseDataTypeClass):
         encoder.add_int(nbytes)
         encoder.add_array(self._value.to_bytes(nbytes, byteorder='big'))
 
+    def sia_binary_encoded_size(self):
+        """
+        The size of this block stake (==Currency), when encoded according to the Sia Binary Encoding format.
+        """
+        return 8 + (self._value.bit_length() + 7) // 8
+
     def rivine_binary_encode(self, encoder):
         """
         Encode this block stake (==Currency) according to the Rivine Binary Encoding format.
@@ -423,3 +698,24 @@ class Blockstake(BaseDataTypeClass):
         if rem:
             nbytes += 1
         encoder.add_slice(self._value.to_bytes(nbytes, byteorder='big'))
+
+    def rivine_binary_encoded_size(self):
+        """
+        The size of this block stake (==Currency), when encoded according to the Rivine Binary Encoding format.
+        """
+        nbytes = (self._value.bit_length() + 7) // 8
+        return slice_length_size(nbytes) + nbytes
+
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Decode a block stake (==Currency) according to the Sia Binary Encoding format.
+        """
+        return cls(value=int.from_bytes(decoder.get_array(decoder.get_int()), byteorder='big'))
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Decode a block stake (==Currency) according to the Rivine Binary Encoding format.
+        """
+        return cls(value=int.from_bytes(decoder.get_slice(), byteorder='big'))
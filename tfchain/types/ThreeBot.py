@@ -1,5 +1,3 @@
-from Jumpscale import j
-
 import re
 import ipaddress
 from enum import IntEnum
@@ -198,6 +196,33 @@ class NetworkAddress(BaseDataTypeClass):
         encoder.add_int8(self._type | (len(self._address) << 2))
         encoder.add_array(self._address)
 
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Sia binary decoding decodes the network address as it is encoded by the Rivine Encoder,
+        see rivine_binary_decode for more information.
+        """
+        prefix = decoder.get_byte()
+        return cls._binary_decode_address(prefix, decoder.get_array(prefix >> 2))
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Rivine binary decoding decodes the single byte prefix, containing the type and length 'n'
+        of the network address, followed by the 'n' bytes of the address itself.
+        """
+        prefix = decoder.get_int8()
+        return cls._binary_decode_address(prefix, decoder.get_array(prefix >> 2))
+
+    @classmethod
+    def _binary_decode_address(cls, prefix, address):
+        network_type = NetworkAddress.Type(prefix & 3)
+        if network_type == NetworkAddress.Type.HOSTNAME:
+            value = bytes(address).decode('utf-8') or None
+        else:
+            value = str(ipaddress.ip_address(bytes(address)))
+        return cls(address=value, network_type=network_type)
+
 
 class BotName(BaseDataTypeClass):
     REGEXP = re.compile(
@@ -269,3 +294,17 @@ class BotName(BaseDataTypeClass):
         Rivine binary encodes a botname as a slice.
         """
         encoder.add_slice(self.value)
+
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Sia binary decodes a botname as a slice.
+        """
+        return cls(value=bytes(decoder.get_slice()).decode('utf-8') or None)
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Rivine binary decodes a botname as a slice.
+        """
+        return cls(value=bytes(decoder.get_slice()).decode('utf-8') or None)
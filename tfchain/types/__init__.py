@@ -0,0 +1,47 @@
+"""
+TFChain types, defined per module.
+
+The modules of this package, as well as the most commonly used types,
+are only imported once they are used, e.g. tfchain.types.Currency
+imports the PrimitiveTypes module the first time it is accessed.
+"""
+
+import importlib
+
+
+# submodules which are imported when first accessed as an attribute of this package
+_SUBMODULES = frozenset([
+    'AtomicSwap', 'BaseDataType', 'ConditionTypes', 'CryptoTypes', 'ERC20',
+    'FulfillmentTypes', 'IO', 'PrimitiveTypes', 'ThreeBot', 'transactions',
+])
+# types which are imported from their submodule when first accessed as an attribute of this package
+_TYPE_LOCATIONS = {
+    'BinaryData': 'PrimitiveTypes',
+    'Hash': 'PrimitiveTypes',
+    'Currency': 'PrimitiveTypes',
+    'CurrencyArray': 'PrimitiveTypes',
+    'Blockstake': 'PrimitiveTypes',
+    'UnlockHash': 'ConditionTypes',
+    'ConditionFactory': 'ConditionTypes',
+    'FulfillmentFactory': 'FulfillmentTypes',
+    'PublicKey': 'CryptoTypes',
+    'CoinInput': 'IO',
+    'CoinOutput': 'IO',
+    'BlockstakeInput': 'IO',
+    'BlockstakeOutput': 'IO',
+}
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module('.' + name, __name__)
+    module = _TYPE_LOCATIONS.get(name)
+    if module is not None:
+        value = getattr(importlib.import_module('.' + module, __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES | set(_TYPE_LOCATIONS))
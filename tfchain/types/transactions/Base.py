@@ -1,6 +1,6 @@
 import json
-from tfchain.crypto.utils import blake2_string
-from tfchain.encoders import encoder_rivine_get, encoder_sia_get, BaseRivineObjectEncoder, BaseSiaObjectEncoder
+from tfchain.crypto.utils import blake2_hasher_new
+from tfchain.encoders import encoder_rivine_get, encoder_sia_get, BaseRivineObjectEncoder, BaseSiaObjectEncoder, sia_encode
 from functools import reduce
 from enum import IntEnum
 from abc import ABC, abstractmethod, abstractclassmethod
@@ -26,14 +26,64 @@ class TransactionVersion(IntEnum):
 
 
 from tfchain.types.PrimitiveTypes import Hash
+from tfchain.types.FulfillmentTypes import SignatureCallbackBase, signature_hash_batch_get
 
 
 class TransactionBaseClass(ABC):
+    """
+    Base class of all TFChain transactions.
+
+    The IDs of a transaction are cached once computed, and the cache is only reset
+    when an attribute of the transaction itself is assigned or one of its own methods modifies it.
+    Nested objects (e.g. inputs, outputs, conditions and fulfillments) do not notify the transaction,
+    and therefore should not be modified in place once an ID was read, as the cached ID would be outdated.
+    Assign the (modified) attribute to the transaction again to reset the cached IDs,
+    e.g. txn.coin_outputs = txn.coin_outputs, or sign using the signature requests of the transaction.
+    Hashing and comparing transactions never uses the cached ID, such that a modified transaction
+    can never be mistaken for its original.
+    """
+
+    # attributes that are not part of the encoding of a transaction,
+    # assigning any other attribute resets the cached IDs, see _id_cache_reset
+    _ID_CACHE_IGNORED_ATTRIBUTES = frozenset([
+        'id', '_id', 'height', '_height', 'unconfirmed', '_unconfirmed', '_id_cache', '_modification_count'])
+
+    # IDs computed from the encoding of this transaction, reset when the transaction is modified
+    _id_cache = None
+    # ID assigned to this transaction (e.g. as reported by an explorer), reset when the transaction is modified
+    _id = None
+    # amount of times this transaction was modified (signatures excluded),
+    # used to detect that the data cached by a SignatureHashContext is outdated
+    _modification_count = 0
+
     def __init__(self):
         self._id = None
         self._height = -1
         self._unconfirmed = False
 
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name not in self._ID_CACHE_IGNORED_ATTRIBUTES:
+            self._id_cache_reset()
+
+    def _id_cache_reset(self, signatures_only=False):
+        """
+        Forget the cached (and assigned) IDs of this transaction, called whenever the transaction is modified.
+
+        Assigning an attribute of the transaction resets the cache automatically,
+        methods that modify the transaction in any other way (e.g. by appending to a list)
+        have to call it themselves. Nested objects modified in place do not call it.
+
+        @param signatures_only: True if only signatures were added, which are not part of
+                                the signature hash input, such that signature hash contexts remain valid
+        """
+        if self._id_cache is not None:
+            self._id_cache = None
+        if self._id is not None:
+            self._id = None
+        if not signatures_only:
+            self._modification_count += 1
+
     @classmethod
     def from_json(cls, obj):
         """
@@ -47,6 +97,24 @@ class TransactionBaseClass(ABC):
         txn._from_json_data_object(obj.get('data', {}))
         return txn
 
+    @classmethod
+    def from_binary(cls, data):
+        """
+        Create this transaction from its binary encoding,
+        the inverse of binary_encode.
+
+        @param data: the encoded transaction, as bytes, bytearray or memoryview (which is not copied)
+        """
+        data = memoryview(data).cast('B')
+        if len(data) == 0:
+            raise ValueError("binary-encoded transaction cannot be empty")
+        txn = cls()
+        if txn.version != data[0]:
+            raise ValueError(
+                "transaction is expected to be of version {}, not version {}".format(txn.version, data[0]))
+        txn._binary_decode_data(data[1:])
+        return txn
+
     @property
     @abstractmethod
     def version(self):
@@ -69,20 +137,45 @@ class TransactionBaseClass(ABC):
     @property
     def id(self):
         """
-        ID of this transaction.
+        ID of this transaction, as assigned (e.g. by the explorer),
+        or otherwise computed from its encoding, cached until the transaction is modified.
+
+        Modifying a nested object in place does not reset the cached ID, see TransactionBaseClass.
         """
-        return str(self._id)
+        if self._id is not None:
+            return str(self._id)
+        if self._id_cache is None:
+            self._id_cache = {}
+        id = self._id_cache.get('transaction')
+        if id is None:
+            id = self._id_compute()
+            self._id_cache['transaction'] = id
+        return str(id)
 
     @id.setter
     def id(self, id):
+        if id is None:
+            # use the computed ID from now on
+            self._id = None
+            return
         if isinstance(id, Hash):
-            self._id = Hash(value=id.value)
+            id = id.value
         self._id = Hash(value=id)
 
+    def _id_compute(self):
+        """
+        Compute the ID of this transaction, the hash of its core ID input (see _id_input_encode).
+        Can be overriden by Transaction Classes should it be required.
+        """
+        hasher = blake2_hasher_new()
+        self._id_input_encode(hasher.update)
+        return Hash(value=hasher.digest())
+
     def __hash__(self):
-        if self._id is None:
-            return hash(json_dumps(self.json()))
-        return hash(self.id)
+        # the cached ID is not used, as it is not reset by nested objects modified in place
+        if self._id is not None:
+            return hash(str(self._id))
+        return hash(str(self._id_compute()))
 
     def __eq__(self, other):
         if not isinstance(other, TransactionBaseClass):
@@ -156,19 +249,47 @@ class TransactionBaseClass(ABC):
         return bytes()
 
     @abstractmethod
+    def _signature_hash_input_encode(self, write, *extra_objects):
+        """
+        Encode the input of the signature hash, writing it in chunks using the given write function,
+        such that the signature hash input never has to be kept in memory as a whole.
+        """
+        pass
+
     def _signature_hash_input_get(self, *extra_objects):
         """
         signature_hash_get is used to get the input
         """
-        pass
+        data = bytearray()
+        self._signature_hash_input_encode(data.extend, *extra_objects)
+        return data
+
+    def _signature_hash_input_parts_get(self):
+        """
+        Optional split of the signature hash input in the encoded data that goes
+        before and after the extra objects, as a tuple (prefix, suffix, encoder_new),
+        where encoder_new is used to encode the extra objects.
+
+        Returns None by default, in which case the entire signature hash input
+        is encoded again for every signature hash.
+        """
+        return None
 
     def signature_hash_get(self, *extra_objects):
         """
         signature_hash_get is used to get the signature hash for this Transaction,
         which are used to proof the authenticity of the transaction.
         """
-        input = self._signature_hash_input_get(*extra_objects)
-        return bytes.fromhex(blake2_string(input))
+        hasher = blake2_hasher_new()
+        self._signature_hash_input_encode(hasher.update, *extra_objects)
+        return hasher.digest()
+
+    def signature_hash_context_new(self):
+        """
+        Create a context that can be used to compute many signature hashes
+        for this Transaction, encoding the data shared by all of them only once per signature hash batch.
+        """
+        return SignatureHashContext(self)
 
     @abstractmethod
     def _from_json_data_object(self, data):
@@ -187,8 +308,9 @@ class TransactionBaseClass(ABC):
 
     def __str__(self):
         s = "transaction v{}".format(self.version)
-        if self.id:
-            s += " {}".format(self.id)
+        # only an assigned ID is shown, computing the ID would require encoding the transaction
+        if self._id is not None:
+            s += " {}".format(self._id)
         return s
     __repr__ = __str__
 
@@ -206,23 +328,57 @@ class TransactionBaseClass(ABC):
         """
         if index < 0 or index >= len(self.coin_outputs):
             raise ValueError("coin output index is out of range")
-        return self._outputid_new(specifier=self._coin_outputid_specifier, index=index)
+        return self._outputids_get(self._coin_outputid_specifier, len(self.coin_outputs))[index]
 
     def blockstake_outputid_new(self, index):
         """
-        Compute the ID of a Coin Output within this transaction.
+        Compute the ID of a Blockstake Output within this transaction.
         """
-        if index < 0 or index >= len(self.coin_outputs):
-            raise ValueError("coin output index is out of range")
-        return self._outputid_new(specifier=self._blockstake_outputid_specifier, index=index)
+        if index < 0 or index >= len(self.blockstake_outputs):
+            raise ValueError("blockstake output index is out of range")
+        return self._outputids_get(self._blockstake_outputid_specifier, len(self.blockstake_outputs))[index]
 
-    def _outputid_new(self, specifier, index):
-        encoder = encoder_sia_get()
-        encoder.add_array(specifier)
-        encoder.add_array(self._id_input_compute())
-        encoder.add_int(index)
-        hash = bytearray.fromhex(blake2_string(encoder.data))
-        return Hash(value=hash)
+    def coin_outputids(self):
+        """
+        Compute the IDs of all Coin Outputs within this transaction,
+        in the order of the outputs, encoding the transaction only once.
+        """
+        return list(self._outputids_get(self._coin_outputid_specifier, len(self.coin_outputs)))
+
+    def blockstake_outputids(self):
+        """
+        Compute the IDs of all Blockstake Outputs within this transaction,
+        in the order of the outputs, encoding the transaction only once.
+        """
+        return list(self._outputids_get(self._blockstake_outputid_specifier, len(self.blockstake_outputs)))
+
+    def _outputids_get(self, specifier, count):
+        """
+        Get the IDs of the outputs identified by the given specifier, computed only once
+        for as long as this transaction is not modified. The specifier and ID input
+        are hashed only once, each ID hashes only its index on a copy of that hasher.
+        """
+        if self._id_cache is None:
+            self._id_cache = {}
+        ids = self._id_cache.get(specifier)
+        if ids is None or len(ids) != count:
+            hasher = blake2_hasher_new(specifier)
+            self._id_input_encode(hasher.update)
+            ids = []
+            for index in range(count):
+                h = hasher.copy()
+                h.update(index.to_bytes(8, byteorder='little'))
+                ids.append(Hash(value=h.digest()))
+            self._id_cache[specifier] = ids
+        return ids
+
+    def _id_input_encode(self, write):
+        """
+        Encode the core input data used for any ID computation, writing it using the given write function.
+        Writes the data computed by _id_input_compute by default, Transaction Classes can override it
+        to write the data in chunks instead, such that it never has to be kept in memory as a whole.
+        """
+        write(self._id_input_compute())
 
     def _id_input_compute(self):
         """
@@ -243,8 +399,13 @@ class TransactionBaseClass(ABC):
         Default Binary encoding of a Transaction Data,
         can be overriden if required.
         """
-        encoder = encoder_sia_get()
-        encoder.add_all(
+        return sia_encode(*self._binary_encode_data_values())
+
+    def _binary_encode_data_values(self):
+        """
+        The values encoded (in order) by the default Binary encoding of a Transaction Data.
+        """
+        return (
             self.coin_inputs,
             self.coin_outputs,
             self.blockstake_inputs,
@@ -252,20 +413,35 @@ class TransactionBaseClass(ABC):
             self.miner_fees,
             self.data,
         )
-        return encoder.data
+
+    def _binary_decode_data(self, data):
+        """
+        Decode the binary encoded Transaction Data, the inverse of _binary_encode_data.
+        Has to be implemented by the Transaction Classes that support binary decoding.
+
+        @param data: the encoded transaction data, as a memoryview
+        """
+        raise NotImplementedError(
+            "binary decoding is not supported for transaction version {}".format(self.version))
 
     def signature_requests_new(self):
         """
         Returns all signature requests still open for this Transaction.
         """
         requests = []
+        context = self.signature_hash_context_new()
         for (index, ci) in enumerate(self.coin_inputs):
-            f = InputSignatureHashFactory(self, index).signature_hash_new
+            f = InputSignatureHashFactory(self, index, context=context).signature_hash_new
             requests += ci.signature_requests_new(input_hash_func=f)
         for (index, bsi) in enumerate(self.blockstake_inputs):
-            f = InputSignatureHashFactory(self, index).signature_hash_new
+            f = InputSignatureHashFactory(self, index, context=context).signature_hash_new
             requests += bsi.signature_requests_new(input_hash_func=f)
-        return requests + self._extra_signature_requests_new()
+        requests += self._extra_signature_requests_new()
+        # signatures are part of the encoding of a transaction,
+        # so fulfilling a request has to reset the cached IDs of this transaction
+        for request in requests:
+            request._callback = _TransactionSignatureCallback(self, request._callback)
+        return requests
 
     def _extra_signature_requests_new(self):
         """
@@ -293,21 +469,120 @@ class TransactionBaseClass(ABC):
         return True
 
 
+class _TransactionSignatureCallback(SignatureCallbackBase):
+    """
+    Signature callback that resets the cached IDs of a transaction,
+    after adding the signature using the callback it wraps.
+    """
+
+    def __init__(self, txn, callback):
+        self._txn = txn
+        self._callback = callback
+
+    def signature_add(self, public_key, signature):
+        self._callback.signature_add(public_key=public_key, signature=signature)
+        self._txn._id_cache_reset(signatures_only=True)
+
+
+class SignatureHashContext:
+    """
+    Context used to compute the signature hashes of a single Transaction.
+
+    The encoded data that goes before and after the extra objects is the same
+    for all signature hashes of a Transaction. Within a signature hash batch
+    (see tfchain.types.FulfillmentTypes.signature_hash_batch, used by signature_requests_sign)
+    it is therefore only encoded (and for the prefix, hashed) once, when the first signature hash is computed,
+    and each signature hash afterwards only requires the encoding of its extra objects.
+    Outside of a batch the entire signature hash input is encoded for every signature hash,
+    as in-place modifications of the nested objects of a transaction cannot be detected.
+
+    Transactions that do not define their signature hash input parts
+    fall back to encoding the entire signature hash input for each hash.
+    """
+
+    def __init__(self, txn):
+        if not isinstance(txn, TransactionBaseClass):
+            raise TypeError("txn has an invalid type {}".format(type(txn)))
+        self._txn = txn
+        self._prepared = False
+        self._modification_count = None
+        self._batch = None
+        self._hasher = None
+        self._suffix = None
+        self._encoder_new = None
+
+    @property
+    def transaction(self):
+        return self._txn
+
+    def reset(self):
+        """
+        Forget the cached encoded data. Done automatically for every new signature hash batch,
+        and when the transaction was modified using its attributes or methods.
+        """
+        self._prepared = False
+        self._batch = None
+        self._hasher = None
+        self._suffix = None
+        self._encoder_new = None
+
+    def _prepare(self, batch):
+        parts = self._txn._signature_hash_input_parts_get()
+        if parts is not None:
+            prefix, suffix, encoder_new = parts
+            self._hasher = blake2_hasher_new(prefix)
+            self._suffix = bytes(suffix)
+            self._encoder_new = encoder_new
+        self._modification_count = self._txn._modification_count
+        self._batch = batch
+        self._prepared = True
+
+    def signature_hash_get(self, *extra_objects):
+        """
+        Get the signature hash of the transaction for the given extra objects,
+        equal to the hash returned by the transaction's signature_hash_get method.
+        """
+        batch = signature_hash_batch_get()
+        if batch is None:
+            return self._txn.signature_hash_get(*extra_objects)
+        if not self._prepared or self._batch is not batch or self._modification_count != self._txn._modification_count:
+            self.reset()
+            self._prepare(batch)
+        if self._hasher is None:
+            return self._txn.signature_hash_get(*extra_objects)
+        e = self._encoder_new()
+        e.add_all(*extra_objects)
+        h = self._hasher.copy()
+        h.update(e.data)
+        h.update(self._suffix)
+        return h.digest()
+
+
 class InputSignatureHashFactory:
     """
     Class that can be used by Transaction consumers,
     to generate a factory that can provide the signature_hash_func callback
     used during the creation of signature requests,
     only useful if some extra objects needs to be included that are outside the Txn scope.
+
+    A SignatureHashContext can be shared between factories of the same transaction,
+    such that the transaction is only encoded once for all of them within a signature hash batch.
     """
 
-    def __init__(self, txn, *extra_objects):
+    def __init__(self, txn, *extra_objects, context=None):
         if not isinstance(txn, TransactionBaseClass):
             raise TypeError("txn has an invalid type {}".format(type(txn)))
+        if context is None:
+            context = SignatureHashContext(txn)
+        elif not isinstance(context, SignatureHashContext):
+            raise TypeError("context has an invalid type {}".format(type(context)))
+        elif context.transaction is not txn:
+            raise ValueError("context was created for a different transaction")
         self._txn = txn
         self._extra_objects = extra_objects
+        self._context = context
 
     def signature_hash_new(self, *extra_objects):
         objects = list(self._extra_objects)
         objects += extra_objects
-        return self._txn.signature_hash_get(*objects)
+        return self._context.signature_hash_get(*objects)
@@ -1,5 +1,3 @@
-from Jumpscale import j
-
 from .Base import TransactionBaseClass, TransactionVersion, InputSignatureHashFactory
 
 from tfchain.types.FulfillmentTypes import ED25519Signature, SignatureCallbackBase, SignatureRequest
@@ -8,7 +6,7 @@ from tfchain.types.PrimitiveTypes import BinaryData, Currency
 from tfchain.types.ERC20 import ERC20Address, ERC20Hash
 from tfchain.types.IO import CoinInput, CoinOutput
 from tfchain.types.CryptoTypes import PublicKey
-from tfchain.encoders import encoder_sia_get, encoder_rivine_get
+from tfchain.encoders import encoder_rivine_get, encoder_sia_stream_get, encoder_rivine_stream_get, decoder_rivine_get
 
 
 class TransactionV208(TransactionBaseClass):
@@ -110,6 +108,7 @@ class TransactionV208(TransactionBaseClass):
         ci = CoinInput(parentid=parentid, fulfillment=fulfillment)
         ci.parent_output = parent_output
         self._coin_inputs.append(ci)
+        self._id_cache_reset()
 
     def refund_coin_output_set(self, value, condition, id=None):
         co = CoinOutput(value=value, condition=condition)
@@ -135,8 +134,8 @@ class TransactionV208(TransactionBaseClass):
             return []
         return [self._transaction_fee]
 
-    def _signature_hash_input_get(self, *extra_objects):
-        e = encoder_rivine_get()
+    def _signature_hash_input_encode(self, write, *extra_objects):
+        e = encoder_rivine_stream_get(write)
 
         # encode the transaction version
         e.add_int8(self.version)
@@ -166,8 +165,8 @@ class TransactionV208(TransactionBaseClass):
             e.add_int8(1)
             e.add(self._refund_coin_output)
 
-        # return data
-        return e.data
+        # write the remaining encoded data
+        e.flush()
 
     def _id_input_compute(self):
         return bytearray(TransactionV208._SPECIFIER) + self._binary_encode_data()
@@ -191,6 +190,16 @@ class TransactionV208(TransactionBaseClass):
         # return encoded data
         return e.data
 
+    def _binary_decode_data(self, data):
+        d = decoder_rivine_get(data)
+        # decode all easy properties
+        self._address, self._value, self._transaction_fee = d.get_all(
+            ERC20Address, Currency, Currency)
+        self._coin_inputs = d.get_object_slice(CoinInput)
+        # decode the only "pointer" property
+        self._refund_coin_output = d.get(CoinOutput) if d.get_bool() else None
+        d.end()
+
     def _from_json_data_object(self, data):
         # decode address
         if 'address' in data:
@@ -327,8 +336,8 @@ class TransactionV209(TransactionBaseClass):
         condition = ConditionUnlockHash(unlockhash=self.address)
         return [CoinOutput(value=self.value, condition=condition, id=None)]
 
-    def _signature_hash_input_get(self, *extra_objects):
-        e = encoder_sia_get()
+    def _signature_hash_input_encode(self, write, *extra_objects):
+        e = encoder_sia_stream_get(write)
 
         # encode the transaction version
         e.add_array(bytearray([self.version]))
@@ -349,8 +358,8 @@ class TransactionV209(TransactionBaseClass):
         # encode the block- and transaction identifier
         e.add_all(self.blockid, self.transactionid)
 
-        # return data
-        return e.data
+        # write the remaining encoded data
+        e.flush()
 
     def _id_input_compute(self):
         return bytearray(TransactionV209._SPECIFIER) + self._binary_encode_data()
@@ -369,6 +378,13 @@ class TransactionV209(TransactionBaseClass):
         # return encoded data
         return e.data
 
+    def _binary_decode_data(self, data):
+        d = decoder_rivine_get(data)
+        # decode all properties
+        self._address, self._value, self._transaction_fee, self._blockid, self._transactionid = d.get_all(
+            UnlockHash, Currency, Currency, ERC20Hash, ERC20Hash)
+        d.end()
+
     def _from_json_data_object(self, data):
         # decode address
         if 'address' in data:
@@ -515,6 +531,7 @@ class TransactionV210(TransactionBaseClass, SignatureCallbackBase):
         ci = CoinInput(parentid=parentid, fulfillment=fulfillment)
         ci.parent_output = parent_output
         self._coin_inputs.append(ci)
+        self._id_cache_reset()
 
     def refund_coin_output_set(self, value, condition, id=None):
         co = CoinOutput(value=value, condition=condition)
@@ -561,8 +578,8 @@ class TransactionV210(TransactionBaseClass, SignatureCallbackBase):
                 str(self._public_key.unlockhash), str(public_key.unlockhash)))
         self.signature = signature
 
-    def _signature_hash_input_get(self, *extra_objects):
-        e = encoder_rivine_get()
+    def _signature_hash_input_encode(self, write, *extra_objects):
+        e = encoder_rivine_stream_get(write)
 
         # encode the transaction version
         e.add_int8(self.version)
@@ -592,8 +609,8 @@ class TransactionV210(TransactionBaseClass, SignatureCallbackBase):
             e.add_int8(1)
             e.add(self._refund_coin_output)
 
-        # return data
-        return e.data
+        # write the remaining encoded data
+        e.flush()
 
     def _id_input_compute(self):
         return bytearray(TransactionV210._SPECIFIER) + self._binary_encode_data()
@@ -618,6 +635,17 @@ class TransactionV210(TransactionBaseClass, SignatureCallbackBase):
         # return encoded data
         return e.data
 
+    def _binary_decode_data(self, data):
+        d = decoder_rivine_get(data)
+        # decode all easy properties
+        self._public_key, self._signature = d.get_all(PublicKey, ED25519Signature)
+        self.registration_fee = d.get(Currency)
+        self._transaction_fee = d.get(Currency)
+        self._coin_inputs = d.get_object_slice(CoinInput)
+        # decode the only "pointer" property
+        self._refund_coin_output = d.get(CoinOutput) if d.get_bool() else None
+        d.end()
+
     def _from_json_data_object(self, data):
         # decode public key
         if 'pubkey' in data:
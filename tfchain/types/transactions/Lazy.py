@@ -0,0 +1,194 @@
+from .Base import TransactionVersion
+from tfchain.types.IO import CoinOutput
+from tfchain.types.PrimitiveTypes import Currency, CurrencyArray
+from tfchain.types.ConditionTypes import ConditionFactory
+from tfchain.jsutils import json_loads
+
+
+_CONDITION_TYPE_UNLOCK_HASH = 1
+_CONDITION_TYPE_LOCKTIME = 3
+
+# versions of which the coin outputs are JSON-encoded as a list of {value, condition} objects
+_COIN_OUTPUTS_VERSIONS = frozenset([
+    TransactionVersion.STANDARD,
+    TransactionVersion.MINTER_COIN_CREATION,
+])
+# versions of which the miner fees are JSON-encoded as a list of currency strings
+_MINER_FEES_VERSIONS = frozenset([
+    TransactionVersion.LEGACY,
+    TransactionVersion.STANDARD,
+    TransactionVersion.MINTER_DEFINITION,
+    TransactionVersion.MINTER_COIN_CREATION,
+])
+
+
+class LazyTransaction:
+    """
+    A read-only view on a raw JSON Tx, which only decodes the properties that are used.
+
+    The version, coin outputs, their values and addresses and the miner fees are decoded
+    directly from the raw JSON Tx for the transaction versions that support it,
+    any other property is read from the transaction, which is only decoded (once)
+    when it is required, or when the transaction property is used.
+    """
+
+    def __init__(self, obj, id=None, decode=None, trusted=False):
+        """
+        @param obj: JSON-encoded str, bytes, bytearray or JSON-decoded dict that contains a raw JSON Tx
+        @param id: optional ID of the transaction (e.g. as assigned by the explorer)
+        @param decode: optional function used to decode the raw JSON Tx into a transaction,
+                       called as decode(obj, id=id, trusted=trusted), TransactionFactory.from_json is used by default
+        @param trusted: if True the JSON comes from a trusted source,
+                        and the checksum of the unlock hashes it contains is not verified (see trusted_json_decoding)
+        """
+        if isinstance(obj, (str, bytes, bytearray)):
+            obj = json_loads(obj)
+        if not isinstance(obj, dict):
+            raise TypeError(
+                "only a dictionary or JSON-encoded dictionary is supported as input: type {} is not supported".format(type(obj)))
+        self._raw = obj
+        self._data = obj.get('data', None) or {}
+        self._id = id
+        self._decode = decode
+        self._trusted = trusted
+        self._transaction = None
+        self._coin_outputs = None
+
+    @property
+    def version(self):
+        """
+        Version of this Transaction, a TransactionVersion if it is known.
+        """
+        tt = self._raw.get('version', -1)
+        try:
+            return TransactionVersion(tt)
+        except ValueError:
+            return tt
+
+    @property
+    def id(self):
+        """
+        ID of this transaction, as assigned (e.g. by the explorer),
+        or otherwise computed from the decoded transaction.
+        """
+        if self._id is not None:
+            return str(self._id)
+        return self.transaction.id
+
+    @property
+    def decoded(self):
+        """
+        True if the transaction has been decoded already.
+        """
+        return self._transaction is not None
+
+    @property
+    def transaction(self):
+        """
+        The transaction, decoded (only once) from the raw JSON Tx.
+        """
+        if self._transaction is None:
+            decode = self._decode
+            if decode is None:
+                # imported here, as the transaction factory imports this module
+                from tfchain.TransactionFactory import TransactionFactory
+                decode = TransactionFactory().from_json
+            self._transaction = decode(self._raw, id=self._id, trusted=self._trusted)
+        return self._transaction
+
+    def _raw_coin_outputs_get(self):
+        """
+        The coin outputs of the raw JSON Tx, normalized to {value, condition} objects,
+        None if the coin outputs of this version cannot be read from the raw JSON Tx.
+        """
+        version = self._raw.get('version', -1)
+        if version in _COIN_OUTPUTS_VERSIONS:
+            return self._data.get('coinoutputs', None) or []
+        if version == TransactionVersion.LEGACY:
+            return [{
+                'value': co.get('value', '0'),
+                'condition': {
+                    'type': _CONDITION_TYPE_UNLOCK_HASH,
+                    'data': {
+                        'unlockhash': co.get('unlockhash', ''),
+                    },
+                },
+            } for co in (self._data.get('coinoutputs', None) or [])]
+        return None
+
+    @property
+    def coin_outputs(self):
+        """
+        Coin outputs of this Transaction, decoded (only once) when first used.
+        """
+        if self._coin_outputs is None:
+            if self._transaction is not None:
+                return self._transaction.coin_outputs
+            outputs = self._raw_coin_outputs_get()
+            if outputs is None:
+                return self.transaction.coin_outputs
+            self._coin_outputs = [CoinOutput.from_json(co, trusted=self._trusted) for co in outputs]
+        return self._coin_outputs
+
+    @property
+    def coin_output_values(self):
+        """
+        The values of the coin outputs of this Transaction as a CurrencyArray,
+        without decoding the conditions of these outputs.
+        """
+        outputs = self._raw_coin_outputs_get()
+        if outputs is None or self._coin_outputs is not None:
+            return CurrencyArray(co.value for co in self.coin_outputs)
+        return CurrencyArray(Currency.from_json(co.get('value', '0')) for co in outputs)
+
+    @property
+    def coin_output_addresses(self):
+        """
+        The addresses (unlock hashes as str) of the coin outputs of this Transaction,
+        in the order of the coin outputs.
+
+        Addresses of (time-locked) unlock hash conditions are read as-is from the raw JSON Tx,
+        without verifying their checksum, other conditions are decoded in order to compute their address.
+        """
+        outputs = self._raw_coin_outputs_get()
+        if outputs is None or self._coin_outputs is not None:
+            return [str(co.condition.unlockhash) for co in self.coin_outputs]
+        return [_condition_address_get(co.get('condition', None) or {}) for co in outputs]
+
+    @property
+    def miner_fees(self):
+        """
+        Miner fees, paid to the block creator of this Transaction.
+        """
+        if self._transaction is None and self._raw.get('version', -1) in _MINER_FEES_VERSIONS:
+            return [Currency.from_json(fee) for fee in (self._data.get('minerfees', None) or [])]
+        return self.transaction.miner_fees
+
+    def json(self):
+        """
+        The raw JSON Tx this view was created from.
+        """
+        return self._raw
+
+    def __getattr__(self, name):
+        # any other property or method is read from the decoded transaction
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.transaction, name)
+
+    def __repr__(self):
+        return "LazyTransaction(version={}, id={})".format(int(self.version), self._id)
+
+
+def _condition_address_get(obj):
+    """
+    The address of a JSON-encoded condition, read as-is if it is part of the JSON object,
+    computed from the decoded condition otherwise.
+    """
+    ct = obj.get('type', 0)
+    data = obj.get('data', None) or {}
+    if ct == _CONDITION_TYPE_LOCKTIME:
+        return _condition_address_get(data.get('condition', None) or {})
+    if ct == _CONDITION_TYPE_UNLOCK_HASH and data.get('unlockhash'):
+        return data['unlockhash']
+    return str(ConditionFactory().from_json(obj, trusted=True).unlockhash)
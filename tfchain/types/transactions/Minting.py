@@ -1,5 +1,3 @@
-from Jumpscale import j
-
 from .Base import TransactionBaseClass, TransactionVersion
 
 from tfchain.types.FulfillmentTypes import FulfillmentBaseClass, FulfillmentSingleSignature, FulfillmentFactory
@@ -7,7 +5,7 @@ from tfchain.types.ConditionTypes import ConditionBaseClass, ConditionNil, Condi
 from tfchain.types.PrimitiveTypes import BinaryData, Currency
 from tfchain.types.IO import CoinInput, CoinOutput
 from tfchain.jsutils import generateXByteID
-from tfchain.encoders import encoder_sia_get
+from tfchain.encoders import encoder_sia_get, encoder_sia_stream_get, decoder_sia_get
 
 conditions = ConditionFactory()
 fulfillments = FulfillmentFactory()
@@ -126,9 +124,10 @@ class TransactionV128(TransactionBaseClass):
 
     def miner_fee_add(self, value):
         self._miner_fees.append(Currency(value=value))
+        self._id_cache_reset()
 
-    def _signature_hash_input_get(self, *extra_objects):
-        e = encoder_sia_get()
+    def _signature_hash_input_encode(self, write, *extra_objects):
+        e = encoder_sia_stream_get(write)
 
         # encode the transaction version
         e.add_byte(self.version)
@@ -152,8 +151,8 @@ class TransactionV128(TransactionBaseClass):
         # encode custom data
         e.add(self.data)
 
-        # return the encoded data
-        return e.data
+        # write the remaining encoded data
+        e.flush()
 
     def _id_input_compute(self):
         return bytearray(TransactionV128._SPECIFIER) + self._binary_encode_data()
@@ -169,6 +168,15 @@ class TransactionV128(TransactionBaseClass):
         )
         return encoder.data
 
+    def _binary_decode_data(self, data):
+        decoder = decoder_sia_get(data)
+        self._nonce = BinaryData(value=decoder.get_array(8), strencoding='base64')
+        self._mint_fulfillment, self._mint_condition = decoder.get_all(
+            FulfillmentBaseClass, ConditionBaseClass)
+        self._miner_fees = decoder.get_object_slice(Currency)
+        self._data = BinaryData(value=decoder.get_slice(), strencoding='base64')
+        decoder.end()
+
     def _from_json_data_object(self, data):
         self._nonce = BinaryData.from_json(
             data.get('nonce', ''), strencoding='base64')
@@ -276,9 +284,11 @@ class TransactionV129(TransactionBaseClass):
         co = CoinOutput(value=value, condition=condition)
         co.id = id
         self._coin_outputs.append(co)
+        self._id_cache_reset()
 
     def miner_fee_add(self, value):
         self._miner_fees.append(Currency(value=value))
+        self._id_cache_reset()
 
     def mint_fulfillment_defined(self):
         return self._mint_fulfillment is not None
@@ -321,8 +331,8 @@ class TransactionV129(TransactionBaseClass):
                 "CoinCreation (v129) Transaction's parent mint condition has to be a subtype of ConditionBaseClass, not {}".format(type(value)))
         self._parent_mint_condition = value
 
-    def _signature_hash_input_get(self, *extra_objects):
-        e = encoder_sia_get()
+    def _signature_hash_input_encode(self, write, *extra_objects):
+        e = encoder_sia_stream_get(write)
 
         # encode the transaction version
         e.add_byte(self.version)
@@ -346,8 +356,8 @@ class TransactionV129(TransactionBaseClass):
         # encode custom data
         e.add(self.data)
 
-        # return the encoded data
-        return e.data
+        # write the remaining encoded data
+        e.flush()
 
     def _id_input_compute(self):
         return bytearray(TransactionV129._SPECIFIER) + self._binary_encode_data()
@@ -363,6 +373,15 @@ class TransactionV129(TransactionBaseClass):
         )
         return encoder.data
 
+    def _binary_decode_data(self, data):
+        decoder = decoder_sia_get(data)
+        self._nonce = BinaryData(value=decoder.get_array(8), strencoding='base64')
+        self._mint_fulfillment = decoder.get(FulfillmentBaseClass)
+        self._coin_outputs = decoder.get_object_slice(CoinOutput)
+        self._miner_fees = decoder.get_object_slice(Currency)
+        self._data = BinaryData(value=decoder.get_slice(), strencoding='base64')
+        decoder.end()
+
     def _from_json_data_object(self, data):
         self._nonce = BinaryData.from_json(
             data.get('nonce', ''), strencoding='base64')
@@ -1,9 +1,11 @@
-from Jumpscale import j
-
 from .Base import TransactionBaseClass, TransactionVersion
 from tfchain.types.IO import CoinInput, CoinOutput, BlockstakeInput, BlockstakeOutput
-from tfchain.types.PrimitiveTypes import Currency, BinaryData
-from tfchain.encoders import encoder_sia_get
+from tfchain.types.PrimitiveTypes import Currency, Blockstake, BinaryData, Hash
+from tfchain.types.CryptoTypes import PublicKey
+from tfchain.types.ConditionTypes import UnlockHash, ConditionUnlockHash
+from tfchain.types.FulfillmentTypes import ED25519Signature, FulfillmentSingleSignature
+from tfchain.crypto.utils import blake2_hasher_new
+from tfchain.encoders import encoder_sia_get, encoder_sia_stream_get, decoder_sia_get, sia_encoded_size
 
 
 class TransactionV1(TransactionBaseClass):
@@ -104,6 +106,22 @@ class TransactionV1(TransactionBaseClass):
         txn._legacy = True
         return txn
 
+    @classmethod
+    def from_binary(cls, data):
+        """
+        Create this transaction from its binary encoding,
+        the inverse of binary_encode, decoding legacy v0 transactions as well.
+
+        @param data: the encoded transaction, as bytes, bytearray or memoryview (which is not copied)
+        """
+        data = memoryview(data).cast('B')
+        if len(data) == 0 or data[0] != TransactionVersion.LEGACY:
+            return super().from_binary(data)
+        txn = cls()
+        txn._legacy = True
+        txn._binary_decode_data(data[1:])
+        return txn
+
     @property
     def version(self):
         return TransactionVersion.STANDARD
@@ -145,11 +163,13 @@ class TransactionV1(TransactionBaseClass):
         ci = CoinInput(parentid=parentid, fulfillment=fulfillment)
         ci.parent_output = parent_output
         self._coin_inputs.append(ci)
+        self._id_cache_reset()
 
     def coin_output_add(self, value, condition, id=None):
         co = CoinOutput(value=value, condition=condition)
         co.id = id
         self._coin_outputs.append(co)
+        self._id_cache_reset()
 
     @property
     def blockstake_inputs(self):
@@ -186,14 +206,17 @@ class TransactionV1(TransactionBaseClass):
         bsi = BlockstakeInput(parentid=parentid, fulfillment=fulfillment)
         bsi.parent_output = parent_output
         self._blockstake_inputs.append(bsi)
+        self._id_cache_reset()
 
     def blockstake_output_add(self, value, condition, id=None):
         bso = BlockstakeOutput(value=value, condition=condition)
         bso.id = id
         self._blockstake_outputs.append(bso)
+        self._id_cache_reset()
 
     def miner_fee_add(self, value):
         self._miner_fees.append(Currency(value=value))
+        self._id_cache_reset()
 
     @property
     def miner_fees(self):
@@ -227,19 +250,43 @@ class TransactionV1(TransactionBaseClass):
                 "arbitrary data can have a maximum bytes length of 83, {} exceeds this limit".format(len(value)))
         self._data = BinaryData(value=value, strencoding='base64')
 
-    def _signature_hash_input_get(self, *extra_objects):
+    def _signature_hash_input_encode(self, write, *extra_objects):
+        e = encoder_sia_stream_get(write)
+
+        # encode the transaction version, legacy transactions start with the extra objects instead
+        if not self._legacy:
+            e.add_byte(self.version)
+
+        # encode extra objects if exists
+        if extra_objects:
+            e.add_all(*extra_objects)
+
         if self._legacy:
-            return self._legacy_signature_hash_input_get(*extra_objects)
+            self._legacy_signature_hash_suffix_encode(e)
+        else:
+            self._signature_hash_suffix_encode(e)
+
+        # write the remaining encoded data
+        e.flush()
 
+    def _signature_hash_input_parts_get(self):
         e = encoder_sia_get()
+        if self._legacy:
+            # legacy transactions start with the extra objects, no prefix is used
+            self._legacy_signature_hash_suffix_encode(e)
+            return (bytearray(), e.data, encoder_sia_get)
 
         # encode the transaction version
-        e.add_byte(self.version)
+        prefix = encoder_sia_get()
+        prefix.add_byte(self.version)
 
-        # encode extra objects if exists
-        if extra_objects:
-            e.add_all(*extra_objects)
+        # (extra objects are encoded in between the prefix and suffix)
+        self._signature_hash_suffix_encode(e)
+
+        # return the encoded parts
+        return (prefix.data, e.data, encoder_sia_get)
 
+    def _signature_hash_suffix_encode(self, e):
         # encode the number of coins inputs
         e.add(len(self.coin_inputs))
         # encode coin inputs parent_ids
@@ -264,16 +311,7 @@ class TransactionV1(TransactionBaseClass):
         # encode custom data
         e.add(self.data)
 
-        # return the encoded data
-        return e.data
-
-    def _legacy_signature_hash_input_get(self, *extra_objects):
-        e = encoder_sia_get()
-
-        # encode extra objects if exists
-        if extra_objects:
-            e.add_all(*extra_objects)
-
+    def _legacy_signature_hash_suffix_encode(self, e):
         # encode coin inputs
         for ci in self.coin_inputs:
             e.add_all(ci.parentid, ci.fulfillment.public_key.unlockhash)
@@ -298,9 +336,6 @@ class TransactionV1(TransactionBaseClass):
         # encode custom data
         e.add(self.data)
 
-        # return the encoded data
-        return e.data
-
     def _from_json_data_object(self, data):
         self._coin_inputs = [CoinInput.from_json(
             ci) for ci in data.get('coininputs', []) or []]
@@ -349,25 +384,55 @@ class TransactionV1(TransactionBaseClass):
         """
         if self._legacy:
             return bytearray([TransactionVersion.LEGACY]) + self._binary_encode_data()
-        encoder = encoder_sia_get()
-        encoder.add_array(bytearray([TransactionVersion.STANDARD]))
-        encoder.add_slice(self._binary_encode_data())
+        # encode the version and data (as a slice) directly into a single buffer of the exact size
+        values = self._binary_encode_data_values()
+        size = sia_encoded_size(*values)
+        encoder = encoder_sia_get(size=1+8+size)
+        self._binary_encode_into(encoder, values, size)
         return encoder.data
 
+    def _binary_encode_into(self, encoder, values, size):
+        encoder.add_array(bytearray([TransactionVersion.STANDARD]))
+        encoder.add_int(size)
+        encoder.add_all(*values)
+
+    def _id_input_encode(self, write):
+        # the ID input is the binary encoding, streamed as to not keep it in memory as a whole
+        encoder = encoder_sia_stream_get(write)
+        if self._legacy:
+            encoder.add_array(bytearray([TransactionVersion.LEGACY]))
+            self._legacy_binary_encode_data(encoder)
+        else:
+            values = self._binary_encode_data_values()
+            self._binary_encode_into(encoder, values, sia_encoded_size(*values))
+        encoder.flush()
+
+    def _id_compute(self):
+        if not self._legacy:
+            return super()._id_compute()
+        # the ID of a legacy transaction (v0) is the hash of its encoding without the version
+        hasher = blake2_hasher_new()
+        encoder = encoder_sia_stream_get(hasher.update)
+        self._legacy_binary_encode_data(encoder)
+        encoder.flush()
+        return Hash(value=hasher.digest())
+
     def _binary_encode_data(self):
         if not self._legacy:
             return super()._binary_encode_data()
+        encoder = encoder_sia_get()
+        self._legacy_binary_encode_data(encoder)
+        return encoder.data
+
+    def _legacy_binary_encode_data(self, encoder):
         # encoding was slightly different in legacy transactions (v0)
         # (NOTE: we only support the subset of v0 transactions that are actually active on the tfchain network)
-        encoder = encoder_sia_get()
         # > encode coin inputs
         encoder.add_int(len(self.coin_inputs))
         for ci in self.coin_inputs:
             encoder.add(ci.parentid)
             encoder.add_array(bytearray([1]))  # FulfillmentTypeSingleSignature
-            sub_encoder = encoder_sia_get()
-            sub_encoder.add(ci.fulfillment.public_key)
-            encoder.add_slice(sub_encoder.data)
+            encoder.add_slice_encoded(ci.fulfillment.public_key.sia_binary_encode)
             encoder.add(ci.fulfillment.signature)
         # > encode coin outputs
         encoder.add_int(len(self.coin_outputs))
@@ -378,9 +443,7 @@ class TransactionV1(TransactionBaseClass):
         for bsi in self._blockstake_inputs:
             encoder.add(bsi.parentid)
             encoder.add_array(bytearray([1]))  # FulfillmentTypeSingleSignature
-            sub_encoder = encoder_sia_get()
-            sub_encoder.add(bsi.fulfillment.public_key)
-            encoder.add_slice(sub_encoder.data)
+            encoder.add_slice_encoded(bsi.fulfillment.public_key.sia_binary_encode)
             encoder.add(bsi.fulfillment.signature)
         # > encode block stake outputs
         encoder.add_int(len(self._blockstake_outputs))
@@ -388,4 +451,45 @@ class TransactionV1(TransactionBaseClass):
             encoder.add_all(bso.value, bso.condition.unlockhash)
         # > encode miner fees and arbitrary data
         encoder.add_all(self.miner_fees, self.data)
-        return encoder.data
+
+    def _binary_decode_data(self, data):
+        decoder = decoder_sia_get(data)
+        if not self._legacy:
+            data = decoder.get_slice()
+            decoder.end()
+            decoder = decoder_sia_get(data)
+            self._coin_inputs = decoder.get_object_slice(CoinInput)
+            self._coin_outputs = decoder.get_object_slice(CoinOutput)
+            self._blockstake_inputs = decoder.get_object_slice(BlockstakeInput)
+            self._blockstake_outputs = decoder.get_object_slice(BlockstakeOutput)
+        else:
+            # decoding of the legacy (v0) encoding, see _binary_encode_data
+            self._coin_inputs = [
+                CoinInput(parentid=parentid, fulfillment=fulfillment)
+                for (parentid, fulfillment) in self._legacy_binary_decode_inputs(decoder)]
+            self._coin_outputs = [
+                CoinOutput(value=value, condition=ConditionUnlockHash(unlockhash=unlockhash))
+                for _ in range(decoder.get_int())
+                for (value, unlockhash) in [decoder.get_all(Currency, UnlockHash)]]
+            self._blockstake_inputs = [
+                BlockstakeInput(parentid=parentid, fulfillment=fulfillment)
+                for (parentid, fulfillment) in self._legacy_binary_decode_inputs(decoder)]
+            self._blockstake_outputs = [
+                BlockstakeOutput(value=value, condition=ConditionUnlockHash(unlockhash=unlockhash))
+                for _ in range(decoder.get_int())
+                for (value, unlockhash) in [decoder.get_all(Blockstake, UnlockHash)]]
+        self._miner_fees = decoder.get_object_slice(Currency)
+        self._data = BinaryData(value=decoder.get_slice(), strencoding='base64')
+        decoder.end()
+
+    @staticmethod
+    def _legacy_binary_decode_inputs(decoder):
+        inputs = []
+        for _ in range(decoder.get_int()):
+            parentid = decoder.get(Hash)
+            if decoder.get_byte() != 1:
+                raise ValueError("legacy v0 transaction inputs are expected to be unlocked by a single signature")
+            public_key = PublicKey.from_binary(decoder.get_slice())
+            signature = decoder.get(ED25519Signature)
+            inputs.append((parentid, FulfillmentSingleSignature(pub_key=public_key, signature=signature)))
+        return inputs
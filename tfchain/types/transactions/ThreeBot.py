@@ -1,5 +1,3 @@
-from Jumpscale import j
-
 from .Base import TransactionBaseClass, TransactionVersion, InputSignatureHashFactory
 
 from tfchain.types.FulfillmentTypes import ED25519Signature, SignatureCallbackBase, SignatureRequest
@@ -11,7 +9,7 @@ from tfchain.types.IO import CoinInput, CoinOutput
 from abc import abstractmethod
 
 from tfchain.encoders import BaseRivineObjectEncoder, BaseSiaObjectEncoder
-from tfchain.encoders import encoder_sia_get, encoder_rivine_get
+from tfchain.encoders import encoder_sia_get, encoder_rivine_get, encoder_rivine_stream_get, decoder_rivine_get
 
 
 class BotTransactionBaseClass(TransactionBaseClass, SignatureCallbackBase):
@@ -100,6 +98,30 @@ class BotMonthsAndFlagsData(BaseSiaObjectEncoder, BaseRivineObjectEncoder):
             flag |= 128
         encoder.add_int8(flag)
 
+    @classmethod
+    def sia_binary_decode(cls, decoder):
+        """
+        Sia binary decodes a BotMonthsAndFlagsData from a one-byte flag,
+        see rivine_binary_decode for more information.
+        """
+        return cls._from_flag(decoder.get_byte())
+
+    @classmethod
+    def rivine_binary_decode(cls, decoder):
+        """
+        Rivine binary decodes a BotMonthsAndFlagsData from a one-byte flag.
+        """
+        return cls._from_flag(decoder.get_int8())
+
+    @classmethod
+    def _from_flag(cls, flag):
+        return cls(
+            number_of_months=(flag & 31),
+            has_addresses=bool(flag & 32),
+            has_names=bool(flag & 64),
+            has_refund=bool(flag & 128),
+        )
+
 
 class TransactionV144(BotTransactionBaseClass):
     _SPECIFIER = b'bot register tx\0'
@@ -188,6 +210,7 @@ class TransactionV144(BotTransactionBaseClass):
         ci = CoinInput(parentid=parentid, fulfillment=fulfillment)
         ci.parent_output = parent_output
         self._coin_inputs.append(ci)
+        self._id_cache_reset()
 
     def refund_coin_output_set(self, value, condition, id=None):
         co = CoinOutput(value=value, condition=condition)
@@ -216,6 +239,7 @@ class TransactionV144(BotTransactionBaseClass):
             raise Exception("a 3Bot can have a maximum of {} addresses, there is no more space for {} ({})".format(
                 BotTransactionBaseClass.MAX_ADDRESSES_PER_BOT, address, type(address)))
         self._addresses.append(NetworkAddress(address=address))
+        self._id_cache_reset()
     
     @property
     def names(self):
@@ -239,6 +263,7 @@ class TransactionV144(BotTransactionBaseClass):
             raise Exception("a 3Bot can have a maximum of {} names, there is no more space for {} ({})".format(
                 BotTransactionBaseClass.MAX_NAMES_PER_BOT, name, type(name)))
         self._names.append(BotName(value=name))
+        self._id_cache_reset()
 
     @property
     def transaction_fee(self):
@@ -303,8 +328,8 @@ class TransactionV144(BotTransactionBaseClass):
                 str(self._public_key.unlockhash), str(public_key.unlockhash)))
         self.signature = signature
 
-    def _signature_hash_input_get(self, *extra_objects):
-        e = encoder_rivine_get()
+    def _signature_hash_input_encode(self, write, *extra_objects):
+        e = encoder_rivine_stream_get(write)
 
         # encode the transaction version
         e.add_int8(self.version)
@@ -338,8 +363,8 @@ class TransactionV144(BotTransactionBaseClass):
         # encode public key
         e.add(self.public_key)
 
-        # return data
-        return e.data
+        # write the remaining encoded data
+        e.flush()
 
     def _id_input_compute(self):
         return bytearray(TransactionV144._SPECIFIER) + self._binary_encode_data()
@@ -381,6 +406,34 @@ class TransactionV144(BotTransactionBaseClass):
         # return encoded data
         return e.data
 
+    def _binary_decode_data(self, data):
+        d = decoder_rivine_get(data)
+
+        # decode bot binary encoding prefix (containing length and refund info)
+        maf = d.get(BotMonthsAndFlagsData)
+        self._number_of_months = maf.number_of_months
+        # decode the address and name length
+        lengths = d.get_int8()
+
+        # decode all addresses and names
+        self._addresses = d.get_object_array(NetworkAddress, lengths & 15)
+        self._names = d.get_object_array(BotName, lengths >> 4)
+
+        # decode transaction fee and coin inputs
+        self._transaction_fee = d.get(Currency)
+        self._coin_inputs = d.get_object_slice(CoinInput)
+
+        # decode refund coin output, if defined
+        self._refund_coin_output = d.get(CoinOutput) if maf.has_refund else None
+
+        # decode the identification at the end, the signature is encoded as an array
+        self._public_key = d.get(PublicKey)
+        if d.remaining:
+            self._signature = ED25519Signature(value=d.get_array(ED25519Signature.SIZE), as_array=True)
+        else:
+            self._signature = ED25519Signature(as_array=True)
+        d.end()
+
     def _from_json_data_object(self, data):
         self._addresses = [NetworkAddress.from_json(address) for address in data.get('addresses', []) or []]
         self._names = [BotName.from_json(name) for name in data.get('names', []) or []]
@@ -549,6 +602,7 @@ class TransactionV145(BotTransactionBaseClass):
         ci = CoinInput(parentid=parentid, fulfillment=fulfillment)
         ci.parent_output = parent_output
         self._coin_inputs.append(ci)
+        self._id_cache_reset()
 
     def refund_coin_output_set(self, value, condition, id=None):
         co = CoinOutput(value=value, condition=condition)
@@ -577,6 +631,7 @@ class TransactionV145(BotTransactionBaseClass):
             raise Exception("a 3Bot can have a maximum of {} addresses, there is no more space for {} ({})".format(
                 BotTransactionBaseClass.MAX_ADDRESSES_PER_BOT, address, type(address)))
         self._addresses_to_add.append(NetworkAddress(address=address))
+        self._id_cache_reset()
     
     @property
     def addresses_to_remove(self):
@@ -600,6 +655,7 @@ class TransactionV145(BotTransactionBaseClass):
             raise Exception("a 3Bot can have a maximum of {} addresses, there is no more space for {} ({})".format(
                 BotTransactionBaseClass.MAX_ADDRESSES_PER_BOT, address, type(address)))
         self._addresses_to_remove.append(NetworkAddress(address=address))
+        self._id_cache_reset()
     
     @property
     def names_to_add(self):
@@ -623,6 +679,7 @@ class TransactionV145(BotTransactionBaseClass):
             raise Exception("a 3Bot can have a maximum of {} names, there is no more space for {} ({})".format(
                 BotTransactionBaseClass.MAX_NAMES_PER_BOT, name, type(name)))
         self._names_to_add.append(BotName(value=name))
+        self._id_cache_reset()
 
     @property
     def names_to_remove(self):
@@ -646,6 +703,7 @@ class TransactionV145(BotTransactionBaseClass):
             raise Exception("a 3Bot can have a maximum of {} names, there is no more space for {} ({})".format(
                 BotTransactionBaseClass.MAX_NAMES_PER_BOT, name, type(name)))
         self._names_to_remove.append(BotName(value=name))
+        self._id_cache_reset()
 
     @property
     def transaction_fee(self):
@@ -710,8 +768,8 @@ class TransactionV145(BotTransactionBaseClass):
                 str(self._parent_public_key.unlockhash), str(public_key.unlockhash)))
         self.signature = signature
 
-    def _signature_hash_input_get(self, *extra_objects):
-        e = encoder_rivine_get()
+    def _signature_hash_input_encode(self, write, *extra_objects):
+        e = encoder_rivine_stream_get(write)
 
         # encode the transaction version
         e.add_int8(self.version)
@@ -746,8 +804,8 @@ class TransactionV145(BotTransactionBaseClass):
             e.add_int8(1)
             e.add(self._refund_coin_output)
 
-        # return data
-        return e.data
+        # write the remaining encoded data
+        e.flush()
 
     def _id_input_compute(self):
         return bytearray(TransactionV145._SPECIFIER) + self._binary_encode_data()
@@ -802,6 +860,41 @@ class TransactionV145(BotTransactionBaseClass):
         # return encoded data
         return e.data
 
+    def _binary_decode_data(self, data):
+        d = decoder_rivine_get(data)
+
+        # decode the identifier
+        self._botid = d.get_int32()
+
+        # decode bot binary encoding prefix (containing length and refund info)
+        maf = d.get(BotMonthsAndFlagsData)
+        self._number_of_months = maf.number_of_months
+
+        # decode the addresses, if any
+        self._addresses_to_add, self._addresses_to_remove = [], []
+        if maf.has_addresses:
+            lengths = d.get_int8()
+            self._addresses_to_add = d.get_object_array(NetworkAddress, lengths & 15)
+            self._addresses_to_remove = d.get_object_array(NetworkAddress, lengths >> 4)
+
+        # decode the names, if any
+        self._names_to_add, self._names_to_remove = [], []
+        if maf.has_names:
+            lengths = d.get_int8()
+            self._names_to_add = d.get_object_array(BotName, lengths & 15)
+            self._names_to_remove = d.get_object_array(BotName, lengths >> 4)
+
+        # decode transaction fee and coin inputs
+        self._transaction_fee = d.get(Currency)
+        self._coin_inputs = d.get_object_slice(CoinInput)
+
+        # decode refund coin output, if defined
+        self._refund_coin_output = d.get(CoinOutput) if maf.has_refund else None
+
+        # decode the signature at the end
+        self._signature = d.get(ED25519Signature)
+        d.end()
+
     def _from_json_data_object(self, data):
         self._botid = int(data.get('id', 0) or 0)
         addresses = data.get('addresses', {}) or {}
@@ -994,6 +1087,7 @@ class TransactionV146(BotTransactionBaseClass):
         ci = CoinInput(parentid=parentid, fulfillment=fulfillment)
         ci.parent_output = parent_output
         self._coin_inputs.append(ci)
+        self._id_cache_reset()
 
     def refund_coin_output_set(self, value, condition, id=None):
         co = CoinOutput(value=value, condition=condition)
@@ -1022,6 +1116,7 @@ class TransactionV146(BotTransactionBaseClass):
             raise Exception("a 3Bot can have a maximum of {} names, there is no more space for {} ({})".format(
                 BotTransactionBaseClass.MAX_NAMES_PER_BOT, name, type(name)))
         self._names.append(BotName(value=name))
+        self._id_cache_reset()
 
     @property
     def transaction_fee(self):
@@ -1105,8 +1200,8 @@ class TransactionV146(BotTransactionBaseClass):
         else:
             raise ValueError("given public key (unlockhash: {}) is not linked to this BotNameTransfer Transaction".format(str(unlockhash)))
 
-    def _signature_hash_input_get(self, *extra_objects):
-        e = encoder_rivine_get()
+    def _signature_hash_input_encode(self, write, *extra_objects):
+        e = encoder_rivine_stream_get(write)
 
         # encode the transaction version
         e.add_int8(self.version)
@@ -1140,8 +1235,8 @@ class TransactionV146(BotTransactionBaseClass):
             e.add_int8(1)
             e.add(self._refund_coin_output)
 
-        # return data
-        return e.data
+        # write the remaining encoded data
+        e.flush()
 
     def _id_input_compute(self):
         return bytearray(TransactionV146._SPECIFIER) + self._binary_encode_data()
@@ -1184,6 +1279,29 @@ class TransactionV146(BotTransactionBaseClass):
         # return encoded data
         return e.data
 
+    def _binary_decode_data(self, data):
+        d = decoder_rivine_get(data)
+
+        # decode sender and receiver bot info
+        self._sender_botid = d.get_int32()
+        self._sender_signature = d.get(ED25519Signature)
+        self._receiver_botid = d.get_int32()
+        self._receiver_signature = d.get(ED25519Signature)
+
+        # decode info value, containing the names length and refund status
+        info_value = d.get_int8()
+
+        # decode the names
+        self._names = d.get_object_array(BotName, info_value & 15)
+
+        # decode transaction fee and coin inputs
+        self._transaction_fee = d.get(Currency)
+        self._coin_inputs = d.get_object_slice(CoinInput)
+
+        # decode refund coin output, if defined
+        self._refund_coin_output = d.get(CoinOutput) if info_value & 16 else None
+        d.end()
+
     def _from_json_data_object(self, data):
         # decode sender info
         if 'sender' in data:
@@ -0,0 +1,113 @@
+"""
+TFChain transaction types, defined per family of transaction versions.
+
+The module of a family is only imported once one of its versions is used,
+see transaction_class_get. Custom (out-of-tree) transaction versions
+can be added using register_transaction_version,
+and removed again using unregister_transaction_version.
+"""
+
+import importlib
+
+from .Base import TransactionBaseClass, TransactionVersion
+
+
+# the transaction class of each known version, as (module, class name),
+# such that a transaction family is only imported once one of its versions is used
+_TRANSACTION_CLASS_LOCATIONS = {
+    TransactionVersion.LEGACY: ('.Standard', 'TransactionV1'),
+    TransactionVersion.STANDARD: ('.Standard', 'TransactionV1'),
+    TransactionVersion.MINTER_DEFINITION: ('.Minting', 'TransactionV128'),
+    TransactionVersion.MINTER_COIN_CREATION: ('.Minting', 'TransactionV129'),
+    TransactionVersion.THREEBOT_REGISTRATION: ('.ThreeBot', 'TransactionV144'),
+    TransactionVersion.THREEBOT_RECORD_UPDATE: ('.ThreeBot', 'TransactionV145'),
+    TransactionVersion.THREEBOT_NAME_TRANSFER: ('.ThreeBot', 'TransactionV146'),
+    TransactionVersion.ERC20_CONVERT: ('.ERC20', 'TransactionV208'),
+    TransactionVersion.ERC20_COIN_CREATION: ('.ERC20', 'TransactionV209'),
+    TransactionVersion.ERC20_ADDRESS_REGISTRATION: ('.ERC20', 'TransactionV210'),
+}
+# the transaction classes of the versions used (or registered) so far
+_transaction_classes = {}
+# the JSON decoders of the versions used (or registered) so far
+_transaction_json_decoders = {}
+
+
+def transaction_class_get(version):
+    """
+    The transaction class of the given version, None if the version is unknown.
+    The module defining the class is imported the first time one of its versions is used.
+
+    Legacy (v0) transactions are decoded as (and share the class of) v1 transactions.
+
+    @param version: the (int) version of the transaction
+    """
+    cls = _transaction_classes.get(version) if isinstance(version, int) else None
+    if cls is None:
+        location = _TRANSACTION_CLASS_LOCATIONS.get(version) if isinstance(version, int) else None
+        if location is None:
+            return None
+        (module, name) = location
+        cls = getattr(importlib.import_module(module, __name__), name)
+        _transaction_classes[version] = cls
+    return cls
+
+
+def transaction_json_decoder_get(version):
+    """
+    The function which decodes a raw JSON Tx (dict) of the given version into a transaction,
+    None if the version is unknown.
+
+    @param version: the (int) version of the transaction
+    """
+    decoder = _transaction_json_decoders.get(version) if isinstance(version, int) else None
+    if decoder is None:
+        cls = transaction_class_get(version)
+        if cls is None:
+            return None
+        if version == TransactionVersion.LEGACY:
+            decoder = cls.legacy_from_json
+        else:
+            decoder = cls.from_json
+        _transaction_json_decoders[version] = decoder
+    return decoder
+
+
+def register_transaction_version(version, cls, json_decoder=None, override=False):
+    """
+    Register the transaction class of a (custom) transaction version,
+    such that transactions of that version can be created and decoded by the TransactionFactory.
+
+    @param version: the version of the transaction, an int in the range [0, 255]
+    @param cls: the transaction class, a subclass of TransactionBaseClass
+    @param json_decoder: optional function which decodes a raw JSON Tx (dict) of this version into a transaction,
+                         cls.from_json by default
+    @param override: if True an already known version is replaced, otherwise registering it raises a ValueError
+    """
+    if not isinstance(version, int) or isinstance(version, bool):
+        raise TypeError("transaction version has to be of type int, not {}".format(type(version)))
+    if version < 0 or version > 255:
+        raise ValueError("transaction version has to be in the range [0, 255], {} is out of range".format(version))
+    if not isinstance(cls, type) or not issubclass(cls, TransactionBaseClass):
+        raise TypeError("transaction class has to be a subclass of TransactionBaseClass, {} is not".format(cls))
+    if json_decoder is not None and not callable(json_decoder):
+        raise TypeError("transaction JSON decoder has to be callable, {} is not".format(type(json_decoder)))
+    if not override and (version in _TRANSACTION_CLASS_LOCATIONS or version in _transaction_classes):
+        raise ValueError("transaction version {} is already registered".format(version))
+    _transaction_classes[version] = cls
+    _transaction_json_decoders[version] = json_decoder or cls.from_json
+
+
+def unregister_transaction_version(version):
+    """
+    Unregister a transaction version registered using register_transaction_version,
+    restoring the original class and JSON decoder in case a known version was overridden.
+
+    @param version: the (int) version of the transaction
+    """
+    if not isinstance(version, int) or isinstance(version, bool):
+        raise TypeError("transaction version has to be of type int, not {}".format(type(version)))
+    if version not in _transaction_classes and version not in _TRANSACTION_CLASS_LOCATIONS:
+        raise ValueError("transaction version {} is not registered".format(version))
+    # known versions are (lazily) resolved again the next time they are used
+    _transaction_classes.pop(version, None)
+    _transaction_json_decoders.pop(version, None)
@@ -0,0 +1,362 @@
+"""
+Local index of unspent coin and blockstake outputs (UTXOs),
+such that balances and spendable outputs can be queried without explorer round-trips.
+"""
+
+from tfchain.jsutils import json_loads
+from tfchain.crypto.utils import blake2_hash
+from tfchain.types.PrimitiveTypes import BinaryData, Currency, Blockstake
+from tfchain.types.ConditionTypes import UnlockHash, ConditionUnlockHash, ConditionLockTime, trusted_json_decoding
+from tfchain.types.IO import CoinOutput
+
+
+class UnspentBalance:
+    """
+    The balance of the unspent (coin or blockstake) outputs of an address,
+    split in the value which can be spent and the value which is still locked.
+    """
+
+    __slots__ = ('_spendable', '_locked', '_total')
+
+    def __init__(self, spendable, locked, total):
+        self._spendable = spendable
+        self._locked = locked
+        self._total = total
+
+    @property
+    def spendable(self):
+        """
+        Value of the unspent outputs which are unlocked (at the height/time of the query).
+        """
+        return self._spendable
+
+    @property
+    def locked(self):
+        """
+        Value of the unspent outputs which are still locked (at the height/time of the query).
+        """
+        return self._locked
+
+    @property
+    def total(self):
+        """
+        Value of all unspent outputs, locked or not.
+        """
+        return self._total
+
+    def __repr__(self):
+        return "UnspentBalance(spendable={}, locked={})".format(self._spendable, self._locked)
+
+
+class UTXOIndex:
+    """
+    Index of the unspent coin and blockstake outputs of a chain,
+    keyed by output ID and by the unlock hash (address) of the condition owning them.
+
+    The index is built by adding (decoded) blocks and transactions in chain order:
+    the outputs they create are added, the outputs their inputs spend are removed.
+    Outputs of time-locked conditions are indexed by the unlock hash of the condition they wrap,
+    and their lock is checked (see OutputLock.locked_check) when querying spendable or locked outputs.
+
+    Queries for an address only visit the unspent outputs of that address.
+    Only add blocks which are confirmed deep enough not to be reverted,
+    as spent outputs are forgotten (and cannot be restored).
+    Miner payouts are indexed as soon as their block is added (the maturity delay is not applied).
+    """
+
+    def __init__(self):
+        # output ID (bytes) -> (output, address, lock)
+        self._coin_outputs = {}
+        self._blockstake_outputs = {}
+        # address (str) -> {output ID (bytes) -> (output, address, lock)}
+        self._coin_outputs_by_address = {}
+        self._blockstake_outputs_by_address = {}
+        self._height = -1
+        self._timestamp = 0
+
+    @property
+    def height(self):
+        """
+        Height of the last block added, -1 if no block was added.
+        """
+        return self._height
+
+    @property
+    def timestamp(self):
+        """
+        Timestamp of the last block added, 0 if no block was added.
+        """
+        return self._timestamp
+
+    def __len__(self):
+        return len(self._coin_outputs) + len(self._blockstake_outputs)
+
+    def block_add(self, block, transactions=None, trusted=False):
+        """
+        Add an explorer block, indexing the miner payouts and all transactions it contains,
+        the height and timestamp of this index are updated to the ones of the block.
+
+        Output IDs are read from the explorer block when available, computed otherwise.
+
+        @param block: explorer block, as a dict or JSON-encoded str/bytes,
+                      either the block object itself or a response containing it (as its block property)
+        @param transactions: optional list of the transactions of the block, already decoded (in block order),
+                             decoded from the explorer block (using TransactionFactory.from_json_many) by default
+        @param trusted: if True the block comes from a trusted source (e.g. your own explorer node),
+                        and the checksum of the unlock hashes it contains is not verified (see trusted_json_decoding)
+        """
+        if not isinstance(block, dict):
+            block = json_loads(block)
+        if 'blockid' not in block:
+            block = block.get('block') or {}
+        height = block.get('height', None)
+        if not isinstance(height, int):
+            raise ValueError("explorer block is expected to define its height")
+        rawblock = block.get('rawblock', None) or {}
+        timestamp = rawblock.get('timestamp', self._timestamp)
+        etxns = block.get('transactions', None) or []
+        if transactions is None:
+            # imported here, as the index can also be used with transactions that are already decoded
+            from tfchain.TransactionFactory import TransactionFactory
+            transactions = TransactionFactory().from_json_many(
+                (etxn['rawtransaction'] for etxn in etxns), ids=(etxn['id'] for etxn in etxns), trusted=trusted)
+        elif len(transactions) != len(etxns):
+            raise ValueError("explorer block contains {} transactions, {} were given".format(len(etxns), len(transactions)))
+
+        payouts = rawblock.get('minerpayouts', None) or []
+        if payouts:
+            payoutids = block.get('minerpayoutids', None) or []
+            if len(payoutids) != len(payouts):
+                payoutids = _miner_payout_ids_compute(block, len(payouts))
+            with trusted_json_decoding(trusted):
+                for (id, payout) in zip(payoutids, payouts):
+                    self._output_add(self._coin_outputs, self._coin_outputs_by_address, id, CoinOutput(
+                        value=Currency.from_json(payout['value']),
+                        condition=ConditionUnlockHash(unlockhash=UnlockHash.from_json(payout['unlockhash']))))
+        for (etxn, txn) in zip(etxns, transactions):
+            self.transaction_add(
+                txn, coin_outputids=etxn.get('coinoutputids', None),
+                blockstake_outputids=etxn.get('blockstakeoutputids', None))
+        self._height = height
+        self._timestamp = timestamp
+
+    def transaction_add(self, txn, coin_outputids=None, blockstake_outputids=None):
+        """
+        Add a transaction, removing the outputs spent by its inputs and indexing the outputs it creates.
+        Inputs that spend outputs unknown to this index (e.g. created before the index was started) are ignored.
+
+        @param txn: the (decoded) transaction
+        @param coin_outputids: optional IDs of the coin outputs of the transaction (e.g. as reported by the explorer),
+                               computed from the transaction by default
+        @param blockstake_outputids: optional IDs of the blockstake outputs of the transaction,
+                                     computed from the transaction by default
+        """
+        for ci in txn.coin_inputs:
+            self._output_remove(self._coin_outputs, self._coin_outputs_by_address, ci.parentid)
+        for bsi in txn.blockstake_inputs:
+            self._output_remove(self._blockstake_outputs, self._blockstake_outputs_by_address, bsi.parentid)
+        outputs = txn.coin_outputs
+        if outputs:
+            for (id, co) in zip(coin_outputids or txn.coin_outputids(), outputs):
+                self._output_add(self._coin_outputs, self._coin_outputs_by_address, id, co)
+        outputs = txn.blockstake_outputs
+        if outputs:
+            for (id, bso) in zip(blockstake_outputids or txn.blockstake_outputids(), outputs):
+                self._output_add(self._blockstake_outputs, self._blockstake_outputs_by_address, id, bso)
+
+    def coin_output_get(self, id):
+        """
+        The unspent coin output with the given ID, None if it is spent or unknown.
+
+        @param id: the output ID, as a Hash, str or bytes
+        """
+        return self._output_get(self._coin_outputs, id)
+
+    def blockstake_output_get(self, id):
+        """
+        The unspent blockstake output with the given ID, None if it is spent or unknown.
+
+        @param id: the output ID, as a Hash, str or bytes
+        """
+        return self._output_get(self._blockstake_outputs, id)
+
+    def coin_outputs_get(self, address):
+        """
+        All unspent coin outputs of the given address, locked or not.
+
+        @param address: the unlock hash of the owning condition, as an UnlockHash or str
+        """
+        return self._outputs_get(self._coin_outputs_by_address, address, None, None, None)
+
+    def coin_outputs_spendable_get(self, address, height=None, time=None):
+        """
+        The unspent coin outputs of the given address which are unlocked at the given block height/time.
+
+        @param address: the unlock hash of the owning condition, as an UnlockHash or str
+        @param height: block height to check the locks against, the height of this index by default
+        @param time: block timestamp to check the locks against, the timestamp of this index by default
+        """
+        return self._outputs_get(self._coin_outputs_by_address, address, False, height, time)
+
+    def coin_outputs_locked_get(self, address, height=None, time=None):
+        """
+        The unspent coin outputs of the given address which are still locked at the given block height/time.
+
+        @param address: the unlock hash of the owning condition, as an UnlockHash or str
+        @param height: block height to check the locks against, the height of this index by default
+        @param time: block timestamp to check the locks against, the timestamp of this index by default
+        """
+        return self._outputs_get(self._coin_outputs_by_address, address, True, height, time)
+
+    def blockstake_outputs_get(self, address):
+        """
+        All unspent blockstake outputs of the given address, locked or not.
+
+        @param address: the unlock hash of the owning condition, as an UnlockHash or str
+        """
+        return self._outputs_get(self._blockstake_outputs_by_address, address, None, None, None)
+
+    def blockstake_outputs_spendable_get(self, address, height=None, time=None):
+        """
+        The unspent blockstake outputs of the given address which are unlocked at the given block height/time.
+
+        @param address: the unlock hash of the owning condition, as an UnlockHash or str
+        @param height: block height to check the locks against, the height of this index by default
+        @param time: block timestamp to check the locks against, the timestamp of this index by default
+        """
+        return self._outputs_get(self._blockstake_outputs_by_address, address, False, height, time)
+
+    def blockstake_outputs_locked_get(self, address, height=None, time=None):
+        """
+        The unspent blockstake outputs of the given address which are still locked at the given block height/time.
+
+        @param address: the unlock hash of the owning condition, as an UnlockHash or str
+        @param height: block height to check the locks against, the height of this index by default
+        @param time: block timestamp to check the locks against, the timestamp of this index by default
+        """
+        return self._outputs_get(self._blockstake_outputs_by_address, address, True, height, time)
+
+    def coin_balance_get(self, address, height=None, time=None):
+        """
+        The coin balance of the given address, as an UnspentBalance of Currency values.
+
+        @param address: the unlock hash of the owning condition, as an UnlockHash or str
+        @param height: block height to check the locks against, the height of this index by default
+        @param time: block timestamp to check the locks against, the timestamp of this index by default
+        """
+        (spendable, locked) = self._balance_get(self._coin_outputs_by_address, address, height, time)
+        spendable = Currency.sum(spendable)
+        locked = Currency.sum(locked)
+        return UnspentBalance(spendable, locked, spendable + locked)
+
+    def blockstake_balance_get(self, address, height=None, time=None):
+        """
+        The blockstake balance of the given address, as an UnspentBalance of Blockstake values.
+
+        @param address: the unlock hash of the owning condition, as an UnlockHash or str
+        @param height: block height to check the locks against, the height of this index by default
+        @param time: block timestamp to check the locks against, the timestamp of this index by default
+        """
+        (spendable, locked) = self._balance_get(self._blockstake_outputs_by_address, address, height, time)
+        spendable = sum(int(value) for value in spendable)
+        locked = sum(int(value) for value in locked)
+        return UnspentBalance(Blockstake(value=spendable), Blockstake(value=locked), Blockstake(value=spendable + locked))
+
+    @staticmethod
+    def _id_key(id):
+        """
+        The key of an output ID, as used by the index.
+        """
+        # explorer IDs are str, checked first as checking for a (abstract) BinaryData is slower
+        if isinstance(id, str):
+            return bytes.fromhex(id)
+        if isinstance(id, (bytes, bytearray, memoryview)):
+            return bytes(id)
+        if isinstance(id, BinaryData):
+            return bytes(id.value)
+        raise TypeError("output ID has to be a Hash, str or bytes, not {}".format(type(id)))
+
+    def _output_add(self, outputs, outputs_by_address, id, output):
+        key = UTXOIndex._id_key(id)
+        # assigned when added, such that the outputs returned by queries know their ID,
+        # set in place as each output owns its ID (which is a lot cheaper than assigning a new Hash)
+        output.id.value = key
+        condition = output.condition
+        lock = None
+        if isinstance(condition, ConditionLockTime):
+            lock = condition.lock
+            if lock.value == 0:
+                lock = None
+        address = str(condition.unlockhash)
+        entry = (output, address, lock)
+        previous = outputs.get(key, None)
+        if previous is not None:
+            outputs_by_address[previous[1]].pop(key, None)
+        outputs[key] = entry
+        address_outputs = outputs_by_address.get(address, None)
+        if address_outputs is None:
+            outputs_by_address[address] = {key: entry}
+        else:
+            address_outputs[key] = entry
+
+    def _output_remove(self, outputs, outputs_by_address, id):
+        key = UTXOIndex._id_key(id)
+        entry = outputs.pop(key, None)
+        if entry is None:
+            return
+        address_outputs = outputs_by_address[entry[1]]
+        del address_outputs[key]
+        if not address_outputs:
+            del outputs_by_address[entry[1]]
+
+    def _output_get(self, outputs, id):
+        key = UTXOIndex._id_key(id)
+        entry = outputs.get(key, None)
+        if entry is None:
+            return None
+        return entry[0]
+
+    def _outputs_get(self, outputs_by_address, address, locked, height, time):
+        """
+        The unspent outputs of an address, all of them if locked is None,
+        otherwise only the locked (True) or unlocked (False) ones.
+        """
+        address_outputs = outputs_by_address.get(str(address), None)
+        if not address_outputs:
+            return []
+        if locked is None:
+            return [output for (output, _, _) in address_outputs.values()]
+        height = self._height if height is None else height
+        time = self._timestamp if time is None else time
+        return [
+            output for (output, _, lock) in address_outputs.values()
+            if (lock is not None and lock.locked_check(height, time)) == locked]
+
+    def _balance_get(self, outputs_by_address, address, height, time):
+        """
+        The values of the unspent outputs of an address, as a pair of (spendable, locked) lists.
+        """
+        spendable = []
+        locked = []
+        address_outputs = outputs_by_address.get(str(address), None)
+        if address_outputs:
+            height = self._height if height is None else height
+            time = self._timestamp if time is None else time
+            for (output, _, lock) in address_outputs.values():
+                if lock is not None and lock.locked_check(height, time):
+                    locked.append(output.value)
+                else:
+                    spendable.append(output.value)
+        return (spendable, locked)
+
+
+def _miner_payout_ids_compute(block, count):
+    """
+    Compute the IDs of the miner payouts of an explorer block,
+    as the hash of the block ID and the (uint64) index of the payout.
+    """
+    blockid = block.get('blockid', None)
+    if not blockid:
+        raise ValueError("explorer block defines miner payouts, but neither their IDs nor its block ID")
+    blockid = bytes.fromhex(blockid)
+    return [blake2_hash(blockid + index.to_bytes(8, byteorder='little')) for index in range(count)]